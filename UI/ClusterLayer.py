@@ -0,0 +1,106 @@
+import math
+
+from PyQt5.QtCore import QPointF, QRectF, Qt
+from PyQt5.QtGui import QBrush, QColor, QFont, QPen
+from PyQt5.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem
+
+from UI.Enums import ObjectType
+
+CLUSTER_CELL_PX = 24  # размер ячейки кластеризации на экране
+POINT_RADIUS_PX = 3
+
+TYPE_COLORS = {
+    ObjectType.AIR_PLANE: QColor(255, 150, 0),
+    ObjectType.HELICOPTER: QColor(255, 150, 0),
+    ObjectType.MISSILE: QColor(0, 0, 255),
+    ObjectType.MISSILE_LAUNCHER: QColor(60, 60, 60),
+    ObjectType.RADAR: QColor(0, 160, 0),
+}
+DEFAULT_COLOR = QColor(120, 120, 120)
+
+
+class ClusterLayer(QGraphicsItem):
+    """
+    Упрощенное отображение объектов карты при малом масштабе: один элемент
+    рисует все объекты точками, а объекты, попавшие в одну ячейку экрана
+    CLUSTER_CELL_PX x CLUSTER_CELL_PX, - одним кружком с их количеством.
+
+    Сетка кластеров строится по всем объектам и хранится до изменения масштаба
+    или объектов (invalidate()): перерисовки при прокрутке и отрисовка по частям
+    области только выбирают готовые кластеры в option.exposedRect
+    """
+
+    def __init__(self, items, extent, parent=None):
+        """
+        :param items: объекты карты {id: MapObject} (словарь читается при пересчете сетки)
+        :param extent: слой покрывает квадрат [-extent, extent] сцены
+        """
+        super().__init__(parent)
+        self.items = items
+        self._bounds = QRectF(-extent, -extent, 2 * extent, 2 * extent)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+        self.setZValue(8)
+        self._version = 0  # номер изменения объектов карты
+        self._grid = None  # (размер ячейки, номер изменения, [x, y, количество, тип] по кластерам)
+
+    def invalidate(self):
+        """Объекты карты добавлены, сдвинуты или удалены: сетка пересчитывается при следующей отрисовке"""
+        self._version += 1
+        if self.isVisible():
+            self.update()
+
+    def _clusters(self, cell_size):
+        """Кластеры всех объектов для ячейки cell_size (в координатах сцены)"""
+        if self._grid is not None and self._grid[0] == cell_size and self._grid[1] == self._version:
+            return self._grid[2]
+        cells = {}
+        for obj in self.items.values():
+            rect = obj.pixmap().rect()
+            center = obj.pos() + QPointF(rect.width() / 2, rect.height() / 2)
+            key = (math.floor(center.x() / cell_size), math.floor(center.y() / cell_size))
+            cell = cells.get(key)
+            if cell is None:
+                cells[key] = [center.x(), center.y(), 1, obj.obj_type]
+            else:
+                cell[0] += center.x()
+                cell[1] += center.y()
+                cell[2] += 1
+        clusters = [(sum_x / count, sum_y / count, count, obj_type) for sum_x, sum_y, count, obj_type in cells.values()]
+        self._grid = (cell_size, self._version, clusters)
+        return clusters
+
+    def boundingRect(self):
+        return self._bounds
+
+    def paint(self, painter, option: QStyleOptionGraphicsItem, widget=None):
+        to_device = painter.worldTransform()
+        # Ячейки привязаны к координатам сцены, поэтому при прокрутке кластеры не перескакивают
+        # и сетка зависит только от масштаба. Кружок кластера меньше ячейки: берутся и кластеры
+        # в ячейке от края области
+        cell_size = CLUSTER_CELL_PX / max(abs(to_device.m11()), 1e-9)
+        region = option.exposedRect.adjusted(-cell_size, -cell_size, cell_size, cell_size)
+        clusters = [cluster for cluster in self._clusters(cell_size)
+                    if region.contains(QPointF(cluster[0], cluster[1]))]
+
+        painter.save()
+        painter.resetTransform()
+        font = QFont(painter.font())
+        font.setPixelSize(11)
+        painter.setFont(font)
+        for x, y, count, obj_type in clusters:
+            center = to_device.map(QPointF(x, y))
+            color = TYPE_COLORS.get(obj_type, DEFAULT_COLOR)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QBrush(color))
+            if count == 1:
+                painter.drawEllipse(center, POINT_RADIUS_PX, POINT_RADIUS_PX)
+                continue
+            radius = min(POINT_RADIUS_PX + 2 * math.sqrt(count), CLUSTER_CELL_PX / 2 + 4)
+            color = QColor(color)
+            color.setAlpha(160)
+            painter.setBrush(QBrush(color))
+            painter.drawEllipse(center, radius, radius)
+            painter.setPen(QPen(Qt.white))
+            painter.drawText(QRectF(center.x() - radius, center.y() - radius, 2 * radius, 2 * radius),
+                             Qt.AlignCenter, str(count))
+        painter.restore()
@@ -1,3 +1,4 @@
+import math
 import sys
 import yaml
 import os
@@ -7,12 +8,23 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout
                              QDialog, QDialogButtonBox, QFormLayout, QGraphicsView,
                              QGraphicsScene, QGraphicsPixmapItem, QGraphicsTextItem,
                              QMessageBox, QSlider, QToolBar, QStatusBar, QLineEdit)
-from PyQt5.QtCore import Qt, QPointF, QSize, pyqtSignal
-from PyQt5.QtGui import QColor, QPen, QBrush, QPainter, QPixmap, QIcon, QCursor, QTransform
+from PyQt5.QtCore import Qt, QPointF, QSize, QLineF, QRectF, QTimer, pyqtSignal
+from PyQt5.QtGui import QColor, QPen, QBrush, QPainter, QPixmap, QIcon, QCursor, QTransform, QFont
+
+GRID_MIN_PIXELS = 60  # минимальное расстояние между линиями сетки на экране
+GRID_STEP_MULTIPLIERS = (2, 2.5, 2)  # шаг сетки растет по ряду 1-2-5-10
+
+
+def _cosmetic_pen(color, width):
+    """Перо постоянной толщины в пикселях при любом масштабе"""
+    pen = QPen(color, width)
+    pen.setCosmetic(True)
+    return pen
 
 
 class MapGraphicsView(QGraphicsView):
     zoomChanged = pyqtSignal(float)
+    viewportChanged = pyqtSignal()  # масштаб или видимая область изменились
 
     def __init__(self, scene=None, parent=None):
         super().__init__(scene, parent)
@@ -27,6 +39,119 @@ class MapGraphicsView(QGraphicsView):
         self.min_scale = 0.001
         self.max_scale = 1.0
 
+        # Сетка рисуется в фоне, а не элементами сцены: только видимые линии,
+        # шаг зависит от масштаба, отрисованный фон кэшируется и при прокрутке сдвигается
+        self.grid_step = 2000
+        self.grid_extent = 3_000_000
+        self.y_inverted = True
+        self.grid_pen = _cosmetic_pen(QColor(200, 200, 200, 100), 1)
+        self.axis_pen = _cosmetic_pen(QColor(100, 100, 255, 150), 2)
+        self.setCacheMode(QGraphicsView.CacheBackground)
+        self.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
+
+        # Масштабирование под курсором еще и прокручивает вид: сигнал выдается один раз за цикл событий
+        self._viewport_timer = QTimer(self)
+        self._viewport_timer.setSingleShot(True)
+        self._viewport_timer.setInterval(0)
+        self._viewport_timer.timeout.connect(self.viewportChanged.emit)
+
+    def current_scale(self):
+        return abs(self.transform().m11())
+
+    def visible_scene_rect(self):
+        return self.mapToScene(self.viewport().rect()).boundingRect()
+
+    def scale(self, sx, sy):
+        super().scale(sx, sy)
+        self._viewport_timer.start()
+
+    def scrollContentsBy(self, dx, dy):
+        super().scrollContentsBy(dx, dy)
+        self._viewport_timer.start()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._viewport_timer.start()
+
+    def set_grid(self, step, extent, y_inverted=True):
+        """
+        Параметры координатной сетки
+
+        :param step: минимальный шаг сетки, м
+        :param extent: сетка рисуется в квадрате [-extent, extent]
+        :param y_inverted: ось Y сцены направлена вниз (подписи по Y со сменой знака)
+        """
+        self.grid_step = step
+        self.grid_extent = extent
+        self.y_inverted = y_inverted
+        self.resetCachedContent()
+        self.viewport().update()
+
+    def grid_step_for_scale(self, scale):
+        """Шаг сетки, при котором линии на экране не ближе GRID_MIN_PIXELS"""
+        step = self.grid_step
+        i = 0
+        while step * scale < GRID_MIN_PIXELS:
+            step *= GRID_STEP_MULTIPLIERS[i % len(GRID_STEP_MULTIPLIERS)]
+            i += 1
+        return step
+
+    def drawBackground(self, painter, rect):
+        super().drawBackground(painter, rect)
+        extent = self.grid_extent
+        visible = rect.intersected(QRectF(-extent, -extent, 2 * extent, 2 * extent))
+        if visible.isEmpty():
+            return
+
+        scale = abs(self.transform().m11())
+        step = self.grid_step_for_scale(scale)
+        xs = self._grid_values(visible.left(), visible.right(), step)
+        ys = self._grid_values(visible.top(), visible.bottom(), step)
+
+        painter.setPen(self.grid_pen)
+        painter.drawLines([QLineF(x, visible.top(), x, visible.bottom()) for x in xs if x != 0] +
+                          [QLineF(visible.left(), y, visible.right(), y) for y in ys if y != 0])
+
+        # Оси координат
+        painter.setPen(self.axis_pen)
+        if visible.top() <= 0 <= visible.bottom():
+            painter.drawLine(QLineF(visible.left(), 0, visible.right(), 0))
+        if visible.left() <= 0 <= visible.right():
+            painter.drawLine(QLineF(0, visible.top(), 0, visible.bottom()))
+
+        # Подписи рисуются в пикселях экрана, поэтому не зависят от масштаба.
+        # Перебираются и линии чуть за границей области: их подписи могут заходить в нее
+        margin = GRID_MIN_PIXELS / scale
+        xs = self._grid_values(max(visible.left() - margin, -extent), visible.right(), step)
+        ys = self._grid_values(visible.top(), min(visible.bottom() + margin, extent), step)
+        to_device = painter.worldTransform()
+        painter.save()
+        painter.resetTransform()
+        font = QFont(self.font())
+        font.setPixelSize(12)
+        painter.setFont(font)
+        painter.setPen(QColor(80, 80, 80))
+        if visible.top() <= 0 <= visible.bottom():
+            for x in xs:
+                if x != 0:
+                    painter.drawText(to_device.map(QPointF(x, 0)) + QPointF(3, 14), f"{x / 1000:g}км")
+            if visible.right() >= extent:
+                painter.drawText(to_device.map(QPointF(extent, 0)) + QPointF(-16, -6), "X")
+        if visible.left() <= 0 <= visible.right():
+            for y in ys:
+                if y != 0:
+                    value = -y / 1000 if self.y_inverted else y / 1000
+                    painter.drawText(to_device.map(QPointF(0, y)) + QPointF(4, -3), f"{value:g}км")
+            if visible.top() <= -extent:
+                painter.drawText(to_device.map(QPointF(0, -extent)) + QPointF(6, 16), "Y")
+        painter.restore()
+
+    @staticmethod
+    def _grid_values(start, end, step):
+        first = math.ceil(start / step)
+        last = math.floor(end / step)
+        return [i * step for i in range(first, last + 1)]
+
     def wheelEvent(self, event):
         zoom_factor = 1.2
         if event.angleDelta().y() < 0:
@@ -8,6 +8,8 @@ class MapObject(QGraphicsPixmapItem):
         self.obj_type = obj_type
         self.obj_id = obj_id
         self.trajectory = None  # Ссылка на линию траектории
+        self.label = None  # Подпись с id (дочерний элемент)
+        self.radar_range = None  # Зона действия радара (дочерний элемент)
         self.setTransformationMode(Qt.SmoothTransformation)
         self.setCursor(Qt.ArrowCursor)
         self.last_position = None
@@ -0,0 +1,99 @@
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+from modules.Replay import Replay
+
+PLAYBACK_SPEEDS = [0.5, 1, 2, 5, 10, 20, 50]  # множители времени моделирования к реальному
+FRAME_INTERVAL_MS = 40  # период обновления экрана при воспроизведении (~25 кадров/с)
+
+
+class PlaybackController:
+    """
+    Воспроизведение записи по часам, а не по шагам: позиция определяется временем
+    моделирования, прошедшим с начала воспроизведения (реальное время x скорость).
+    На каждом тике выдается только кадр, соответствующий текущему времени, поэтому
+    при высокой скорости или медленной отрисовке промежуточные шаги пропускаются,
+    а длительность просмотра не зависит от шага моделирования
+    """
+
+    def __init__(self, replay: Replay, speed: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        :param replay: курсор записи
+        :param speed: множитель скорости (1 - реальное время)
+        :param clock: источник реального времени в секундах
+        """
+        if speed <= 0:
+            raise ValueError(f"Скорость воспроизведения должна быть положительной: {speed}")
+        self.replay = replay
+        self.clock = clock
+        self._speed = float(speed)
+        self._playing = False
+        self._base_wall = 0.0  # реальное время привязки часов, с
+        self._base_time = 0  # время моделирования в момент привязки, мс
+        self.skipped = 0  # сколько шагов пропущено с начала воспроизведения
+
+    @property
+    def playing(self) -> bool:
+        return self._playing
+
+    @property
+    def speed(self) -> float:
+        return self._speed
+
+    @speed.setter
+    def speed(self, value: float) -> None:
+        if value <= 0:
+            raise ValueError(f"Скорость воспроизведения должна быть положительной: {value}")
+        if self._playing:
+            # Часы перепривязываются, чтобы смена скорости не вызывала скачка позиции
+            self._base_time = self.current_time()
+            self._base_wall = self.clock()
+        self._speed = float(value)
+
+    def play(self) -> None:
+        """Запускает часы от текущей позиции курсора"""
+        if len(self.replay) == 0:
+            return
+        self._rebase()
+        self._playing = True
+
+    def pause(self) -> None:
+        self._playing = False
+
+    def seek(self, step: int) -> np.ndarray:
+        """Перемотка к шагу step; при воспроизведении часы продолжают идти от него"""
+        frame = self.replay.seek(step)
+        self._rebase()
+        return frame
+
+    def current_time(self) -> int:
+        """Время моделирования по часам воспроизведения, мс"""
+        if not self._playing:
+            return self.replay.time or 0
+        return self._base_time + int((self.clock() - self._base_wall) * 1000 * self._speed)
+
+    def tick(self) -> Optional[np.ndarray]:
+        """
+        Сдвигает курсор к шагу, соответствующему текущему времени часов
+
+        :return: кадр нового шага или None, если позиция не изменилась
+        """
+        if not self._playing:
+            return None
+        target = min(self.replay.run.step_of(self.current_time()), len(self.replay) - 1)
+        if target <= self.replay.position:
+            if self.replay.at_end:
+                self._playing = False
+            return None
+        self.skipped += target - self.replay.position - 1
+        frame = self.replay.seek(target)
+        if self.replay.at_end:
+            self._playing = False
+        return frame
+
+    def _rebase(self) -> None:
+        self._base_wall = self.clock()
+        self._base_time = self.replay.time or 0
@@ -1,29 +1,34 @@
 import os
+import queue
 import numpy as np
 import yaml
 from PyQt5.QtCore import Qt, QSize, QTimer, QPointF
-from PyQt5.QtGui import QColor, QPen, QPainter, QPixmap, QIcon, QBrush
+from PyQt5.QtGui import QColor, QPen, QPainter, QPixmap, QIcon
 from PyQt5.QtWidgets import (QMainWindow, QVBoxLayout, QHBoxLayout,
                              QWidget, QLabel, QPushButton, QListWidget, QComboBox,
-                             QDialog, QGraphicsScene, QGraphicsTextItem,
-                             QMessageBox, QSlider, QStatusBar, QGraphicsEllipseItem, QFileDialog, QGroupBox,
+                             QDialog, QGraphicsScene,
+                             QMessageBox, QSlider, QStatusBar, QFileDialog, QGroupBox,
                              QFormLayout, QSpinBox)
 
 from UI.Enums import ObjectType
 from UI.MapGraphicsView import MapGraphicsView
 from UI.MapObject import MapObject
 from UI.ObjectDialog import ObjectDialog
-from main import run_simulation_from_config
+from UI.PlaybackController import PlaybackController, PLAYBACK_SPEEDS, FRAME_INTERVAL_MS
+from UI.SimulationWorker import SimulationWorker
+from UI.TrackItem import TrackItem
+from UI.SceneModel import SceneModel
 from modules.Manager import Manager
-from modules.Messages import CPPDrawerObjectsMessage
-from modules.constants import MessageType
+from modules.Replay import Replay
+
+TRACK_MIN_DISTANCE = 20  # прореживание точек траектории, м
+TRACK_MAX_POINTS = None  # None - траектория хранится целиком
 
 
 class PolygonEditor(QMainWindow):
     def __init__(self):
         super().__init__()
         self.manager = Manager()
-        self.scene_objects = {}  # {obj_id: MapObject}
 
         self.y_inverted = True
         self.y_coeff = -1 if self.y_inverted else 1
@@ -75,6 +80,10 @@ class PolygonEditor(QMainWindow):
             ObjectType.RADAR: 5
         }
         self.default_config_path = "simulation_config.yaml"
+        self.record_path = os.path.join("runs", "last_run.rec")
+        self.replay = None
+        self.playback = None
+        self.worker = None
         self.init_ui()
 
     def convert_coordinates(self, x, y):
@@ -180,6 +189,7 @@ class PolygonEditor(QMainWindow):
 
         left_layout.addLayout(btn_layout1)
         left_layout.addLayout(btn_layout2)
+        left_layout.addWidget(self.init_replay_ui())
 
         # Масштабирование
         zoom_layout = QHBoxLayout()
@@ -215,10 +225,13 @@ class PolygonEditor(QMainWindow):
         self.scene = QGraphicsScene()
         scene_rect = -self.scene_size, -self.scene_size, 2 * self.scene_size, 2 * self.scene_size
         self.scene.setSceneRect(*scene_rect)
+        self.scene_model = SceneModel(self.scene, self.icons, self.convert_coordinates, self.scene_size)
+        self.scene_objects = self.scene_model.items  # {str(obj_id): MapObject}
 
         self.view = MapGraphicsView(self.scene, self)
         self.view.setMinimumSize(800, 800)
         self.view.zoomChanged.connect(self.update_zoom_slider)
+        self.view.viewportChanged.connect(self.update_lod)
 
         right_layout.addWidget(self.view)
 
@@ -282,124 +295,17 @@ class PolygonEditor(QMainWindow):
             self.update_objects_list()
 
     def draw_grid(self):
-        """Рисует сетку с увеличенными размерами"""
-        # Оси координат
-        pen = QPen(QColor(100, 100, 255, 150), 2)
-        self.scene.addLine(-self.scene_size, 0, self.scene_size, 0, pen)  # Ось X
-        self.scene.addLine(0, self.scene_size, 0, -self.scene_size, pen)  # Ось Y
-
-        # Подписи осей
-        font = self.font()
-        font.setPointSize(200)
-
-        # Подпись оси X
-        x_label = self.scene.addText("X")
-        x_label.setFont(font)
-        x_label.setPos(self.scene_size - 2000, 50)
-
-        # Подпись оси Y
-        y_label = self.scene.addText("Y")
-        y_label.setFont(font)
-        y_label.setPos(-300, -self.scene_size + 2000)
-
-        # Сетка с увеличенным шагом
-        pen = QPen(QColor(200, 200, 200, 100), 1)
-        for i in range(-self.scene_size, self.scene_size + 1, self.grid_step):
-            if i != 0:
-                # Вертикальные линии
-                self.scene.addLine(i, -self.scene_size, i, self.scene_size, pen)
-                # Горизонтальные линии
-                self.scene.addLine(-self.scene_size, i, self.scene_size, i, pen)
-
-        # Подписи координат
-        font.setPointSize(100)
-        for i in range(-self.scene_size, self.scene_size + 1, self.grid_step):
-            if i != 0:
-                # Подписи по оси X
-                x_text = self.scene.addText(f"{i / 1000:.0f}км")
-                x_text.setFont(font)
-                x_text.setPos(i - 50, 50)
-
-                # Подписи по оси Y
-                y_text = self.scene.addText(f"{-i / 1000:.0f}км" if self.y_inverted else f"{i / 1000:.0f}км")
-                y_text.setFont(font)
-                y_text.setPos(-50, i - 100)
+        """Настраивает координатную сетку: она рисуется фоном вида, а не элементами сцены"""
+        self.view.set_grid(self.grid_step, self.scene_size, self.y_inverted)
 
     def update_scene(self):
-        """Обновляет сцену на основе текущей конфигурации"""
-        # Полностью очищаем сцену перед обновлением
-        self.clear_scene_completely()
-        self.draw_grid()
-
-        # Рисуем объекты заново
-        for target in self.config["air_environment"]["targets"]:
-            self.draw_map_object(target["position"], target["type"], target.get("id", ""))
-
-        for launcher in self.config["missile_launchers"]:
-            self.draw_map_object(launcher["position"], "MISSILE_LAUNCHER", launcher.get("id", ""))
-            for missile in launcher.get("missiles", []):
-                self.draw_map_object(launcher["position"], "MISSILE", missile["id"])
-
-        for radar in self.config["radars"]:
-            self.draw_map_object(radar["position"], "RADAR", radar.get("id", ""))
-
-    def draw_map_object(self, position, obj_type, obj_id):
-        enum_type = ObjectType[obj_type] if isinstance(obj_type, str) else obj_type
-        icon = self.icons.get(enum_type, self.icons[ObjectType.AIR_PLANE])
-
-        # Преобразуем координаты для отображения
-        x, y = self.convert_coordinates(position[0], position[1])
-
-        # Создаем или получаем объект
-        if str(obj_id) in self.scene_objects:
-            obj = self.scene_objects[str(obj_id)]
-            obj.setPos(x - icon.width()/2, y - icon.height()/2)
-        else:
-            obj = MapObject(icon, enum_type, obj_id)
-            obj.setPos(x - icon.width()/2, y - icon.height()/2)
-            self.scene.addItem(obj)
-            self.scene_objects[str(obj_id)] = obj
-            obj.trajectory_points = []
-
-        # Для движущихся объектов добавляем точку траектории
-        if enum_type in [ObjectType.AIR_PLANE, ObjectType.HELICOPTER, ObjectType.MISSILE]:
-            point = self.scene.addEllipse(
-                x - 2, y - 2, 4, 4,
-                QPen(Qt.NoPen),
-                QBrush(QColor(255, 165, 0, 200))
-            )
-            point.setZValue(-1)
-            obj.trajectory_points.append(point)
-
-            if len(obj.trajectory_points) > 50:
-                old_point = obj.trajectory_points.pop(0)
-                self.scene.removeItem(old_point)
-
-        # Для радара рисуем зону действия
-        elif enum_type == ObjectType.RADAR:
-            radar_config = None
-            for radar in self.config["radars"]:
-                if str(radar["id"]) == str(obj_id):
-                    radar_config = radar
-                    break
-
-            if radar_config:
-                radius = radar_config.get("max_distance", 10000)
-                if hasattr(obj, 'radar_range'):
-                    self.scene.removeItem(obj.radar_range)
-
-                radar_range = self.scene.addEllipse(
-                    x - radius,
-                    y - radius,
-                    radius * 2,
-                    radius * 2,
-                    QPen(QColor(0, 200, 0, 80)),
-                    QBrush(QColor(0, 200, 0, 30))
-                )
-                radar_range.setZValue(-2)
-                obj.radar_range = radar_range
+        """Обновляет сцену по текущей конфигурации: меняются только отличающиеся объекты"""
+        self.scene_model.sync(self.config)
+        self.scene_model.refresh_lod()
 
-        self.scene_objects[str(obj_id)] = obj
+    def update_lod(self):
+        """Уровень детализации карты по текущему масштабу и видимой области"""
+        self.scene_model.apply_lod(self.view.current_scale(), self.view.visible_scene_rect())
 
     def update_objects_list(self):
         self.objects_list.clear()
@@ -605,166 +511,299 @@ class PolygonEditor(QMainWindow):
 
         # Сохраняем конфиг перед запуском
         self.save_config(source = True)
+        if self.worker is not None:
+            # Предыдущий прогон еще закрывает запись (кнопка запуска в это время недоступна)
+            return
+        self.stop_replay()
+
+        # Моделирование идет в фоновом потоке и пишется в файл, кадры отрисовываются
+        # по мере расчета; после завершения запись доступна для перемотки
+        self.worker = SimulationWorker('simulation_config.yaml', record_path=self.record_path)
+        self.worker.start()
+
+        self.clear_replay_trails()
+        self.scene_model.forget_positions()
+        self.replay_slider.setEnabled(False)
+        self.replay_play_btn.setEnabled(False)
+        self.replay_stop_btn.setEnabled(True)
+        self.run_btn.setEnabled(False)
+        self.live_timer.start(FRAME_INTERVAL_MS)
+        self.status_bar.showMessage("Моделирование запущено")
+
+    def cancel_simulation(self):
+        """
+        Просит фоновое моделирование остановиться, не дожидаясь потока: он завершает
+        текущий шаг, закрывает запись и кладет в очередь признак конца, который разбирает live_tick
+        """
+        if self.worker is None or self.worker.cancelled:
+            return
+        self.worker.cancel()
+        self.replay_stop_btn.setEnabled(False)
+        self.status_bar.showMessage("Остановка моделирования...")
+
+    def closeEvent(self, event):
+        if self.worker is not None:
+            # Окно закрывается: поток-демон не должен оборваться, не закрыв запись
+            self.worker.cancel()
+            self.worker.join(timeout=5)
+        self.stop_replay()
+        super().closeEvent(event)
+
+    def live_tick(self):
+        """
+        Отрисовка кадров фонового моделирования. Если расчет обогнал отрисовку,
+        из накопившихся кадров рисуется только последний; после отмены кадры
+        только вынимаются из очереди до признака конца
+        """
+        latest = None
+        finished = False
+        while not finished:
+            try:
+                frame = self.worker.frames.get_nowait()
+            except queue.Empty:
+                break
+            finished = frame is None
+            latest = frame if frame is not None else latest
+
+        if latest is not None and not self.worker.cancelled:
+            self.draw_frame(latest.records)
+            self.status_bar.showMessage(f"Моделирование: шаг {latest.step + 1} Время: {latest.time}")
+        if not finished:
+            return
 
-        # Запускаем моделирование
-        self.manager = run_simulation_from_config('simulation_config.yaml')
-
-        time_steps = sorted(self.manager.messages.keys())
+        # Моделирование закончено: дальше работаем с записью
+        worker = self.worker
+        self.worker = None
+        self.live_timer.stop()
+        self.replay_stop_btn.setEnabled(False)
+        self.run_btn.setEnabled(True)
+        if worker.error is not None:
+            QMessageBox.critical(self, "Ошибка", f"Ошибка моделирования:\n{str(worker.error)}")
+            return
+        if worker.cancelled:
+            self.status_bar.showMessage(f"Моделирование остановлено: {worker.steps_done} шагов")
+            return
+        self.open_replay(self.record_path, play=False)
+        QMessageBox.information(self, "Моделирование", "Моделирование завершено")
+
+    def init_replay_ui(self):
+        """Инициализирует панель воспроизведения записанного прогона"""
+        self.replay_group = QGroupBox("Воспроизведение")
+        layout = QVBoxLayout()
+
+        buttons_layout = QHBoxLayout()
+        self.replay_play_btn = QPushButton("Пауза")
+        self.replay_play_btn.clicked.connect(self.toggle_replay)
+        self.replay_play_btn.setEnabled(False)
+
+        self.replay_stop_btn = QPushButton("Стоп")
+        self.replay_stop_btn.setIcon(QIcon.fromTheme("media-playback-stop"))
+        self.replay_stop_btn.clicked.connect(self.cancel_simulation)
+        self.replay_stop_btn.setEnabled(False)
+
+        self.replay_open_btn = QPushButton("Открыть запись")
+        self.replay_open_btn.setIcon(QIcon.fromTheme("document-open"))
+        self.replay_open_btn.clicked.connect(self.open_replay_file)
+
+        # Скорость - множитель времени моделирования к реальному времени
+        self.replay_speed_combo = QComboBox()
+        for speed in PLAYBACK_SPEEDS:
+            self.replay_speed_combo.addItem(f"x{speed:g}", speed)
+        self.replay_speed_combo.setCurrentIndex(PLAYBACK_SPEEDS.index(10))
+        self.replay_speed_combo.currentIndexChanged.connect(self.update_replay_speed)
+
+        buttons_layout.addWidget(self.replay_play_btn)
+        buttons_layout.addWidget(self.replay_stop_btn)
+        buttons_layout.addWidget(self.replay_speed_combo)
+        buttons_layout.addWidget(self.replay_open_btn)
+
+        # Ползунок шагов: перемотка к любому шагу записи
+        self.replay_slider = QSlider(Qt.Horizontal)
+        self.replay_slider.setRange(0, 0)
+        self.replay_slider.setEnabled(False)
+        self.replay_slider.valueChanged.connect(self.seek_replay)
+
+        layout.addLayout(buttons_layout)
+        layout.addWidget(self.replay_slider)
+
+        self.replay_timer = QTimer()
+        self.replay_timer.timeout.connect(self.replay_tick)
+        # Кадры фонового моделирования - отдельный таймер: остановка воспроизведения его не затрагивает
+        self.live_timer = QTimer()
+        self.live_timer.timeout.connect(self.live_tick)
+
+        self.replay_group.setLayout(layout)
+        return self.replay_group
+
+    def open_replay_file(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Выберите запись моделирования",
+            os.path.dirname(os.path.abspath(self.record_path)),
+            "Records (*.rec);;All Files (*)"
+        )
+        if not file_path:
+            return
 
-        # Собираем все ID ракет из конфигурации
-        missile_ids = set()
-        for launcher in self.config["missile_launchers"]:
-            for missile in launcher.get("missiles", []):
-                missile_ids.add(str(missile["id"]))
+        try:
+            self.cancel_simulation()
+            self.stop_replay()
+            self.open_replay(file_path)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось открыть запись:\n{str(e)}")
+
+    def open_replay(self, path, play=True):
+        """
+        Открывает запись. При play=True воспроизведение начинается с первого шага,
+        иначе курсор встает на последний шаг (сцена уже отрисована по ходу моделирования)
+        """
+        self.replay = Replay(path)
+        self.playback = PlaybackController(self.replay, speed=self.replay_speed_combo.currentData())
+        self.scene_model.forget_positions()
+        if len(self.replay) == 0:
+            QMessageBox.warning(self, "Воспроизведение", "Запись не содержит шагов")
+            return
 
-        #print(f"Known missile IDs: {missile_ids}")  # Отладочный вывод
+        self.replay_slider.blockSignals(True)
+        self.replay_slider.setRange(0, len(self.replay) - 1)
+        self.replay_slider.setValue(0)
+        self.replay_slider.blockSignals(False)
+        self.replay_slider.setEnabled(True)
+        self.replay_play_btn.setEnabled(True)
+
+        if not play:
+            self.replay.seek(len(self.replay) - 1)
+            self.update_replay_position()
+            self.replay_play_btn.setText("Пуск")
+            return
 
-        # Инициализация таймера
-        self.simulation_timer = QTimer()
-        self.current_step = 0
-        self.max_step = len(time_steps)
+        self.clear_replay_trails()
+        self.draw_replay_frame(self.playback.seek(0))
+        self.start_playback()
 
-        def update_simulation():
-            if self.current_step >= self.max_step:
-                self.simulation_timer.stop()
-                QMessageBox.information(self, "Моделирование", "Моделирование завершено")
-                return
+    def stop_replay(self):
+        self.replay_timer.stop()
+        self.playback = None
+        if self.replay is not None:
+            self.replay.close()
+            self.replay = None
 
-            current_time = time_steps[self.current_step]
-            messages = self.manager.give_messages_by_type(
-                msg_type=MessageType.DRAW_OBJECTS,
-                step_time=current_time
-            )
+    def start_playback(self):
+        self.playback.play()
+        self.replay_timer.start(FRAME_INTERVAL_MS)
+        self.replay_play_btn.setText("Пауза")
 
-            # Обрабатываем все сообщения для текущего времени
-            for msg in messages:
-                if not isinstance(msg, CPPDrawerObjectsMessage):
-                    continue
-
-                obj_id = str(msg.obj_id)
-                x, y, _ = msg.coordinates
-                x, y = self.convert_coordinates(x, y)
-
-                # Если это ракета (по ID) и её нет на сцене - создаем
-                if obj_id in missile_ids and obj_id not in self.scene_objects:
-                    missile_type = ObjectType.MISSILE
-                    icon = self.icons.get(missile_type)
-                    if icon:
-                        obj = MapObject(icon, missile_type, obj_id)
-                        obj.setPos(x - icon.width() / 2, y - icon.height() / 2)
-                        self.scene.addItem(obj)
-                        self.scene_objects[obj_id] = obj
-                        obj.trajectory_points = []
-                        #print(f"Created missile {obj_id} at ({x}, {y})")
-
-                obj_type = None
-
-                # Обновляем позицию для всех объектов (включая ракеты)
-                if obj_id in self.scene_objects:
-                    obj = self.scene_objects[obj_id]
-                    obj_type = self.scene_objects[obj_id].obj_type
-
-                    # Для самолетов и вертолетов меняем иконку в зависимости от видимости
-                    if obj_type in [ObjectType.AIR_PLANE, ObjectType.HELICOPTER]:
-                        if msg.is_visible_by_radar:
-                            # Используем красную иконку
-                            if obj_type == ObjectType.AIR_PLANE:
-                                new_icon = self.icons[ObjectType.AIR_PLANE_RED]
-                            else:
-                                new_icon = self.icons[ObjectType.HELICOPTER_RED]
-                        else:
-                            # Используем обычную иконку
-                            new_icon = self.icons[obj_type]
-
-                        obj.setPixmap(new_icon)
-
-                    new_x = x - obj.pixmap().width() / 2
-                    new_y = y - obj.pixmap().height() / 2
-                    obj.setPos(new_x, new_y)
-
-                    #print(f"Object {obj_id} visible: {obj.isVisible()} at ({new_x}, {new_y})")
-
-                    # Для ВСЕХ движущихся объектов (включая ракеты) добавляем траекторию
-                    if obj.obj_type in [ObjectType.AIR_PLANE, ObjectType.HELICOPTER, ObjectType.MISSILE]:
-                        # Создаем новую точку
-                        point_size = 6
-                        point = self.scene.addEllipse(
-                            x - point_size / 2,
-                            y - point_size / 2,
-                            point_size,
-                            point_size,
-                            QPen(Qt.NoPen),
-                            QBrush(QColor(255, 100, 0, 220))
-                        )
-                        point.setZValue(10)
-
-                        # Инициализация структур данных для траектории
-                        if not hasattr(obj, 'trajectory_points'):
-                            obj.trajectory_points = []  # Будет хранить только точки
-                            obj.trajectory_lines = []  # Будет хранить линии
-                            obj.last_position = (x, y)  # Добавляем запись последней позиции
-
-                        # Сохраняем текущую позицию
-                        current_pos = (x, y)
-
-                        # Если есть предыдущая точка - рисуем линию
-                        if hasattr(obj, 'last_position'):
-                            if obj.obj_type == ObjectType.MISSILE:
-                                color = QPen(QColor(0, 0, 255, 180), 10)
-                            else:
-                                color = QPen(QColor(255, 150, 0, 180), 10)
-
-                            if obj.last_position != None:
-                                prev_x, prev_y = obj.last_position
-                                line = self.scene.addLine(
-                                    prev_x, prev_y, x, y,
-                                    color)
-                                line.setZValue(9)
-
-                            # Добавляем точку и обновляем последнюю позицию
-                            obj.last_position = current_pos
-
-            self.status_bar.showMessage(
-                f"Шаг: {self.current_step + 1}/{self.max_step} Время: {current_time}"
-            )
-            self.current_step += 1
+    def update_replay_speed(self, index):
+        if self.playback is not None:
+            self.playback.speed = self.replay_speed_combo.currentData()
 
-        # Настраиваем таймер (обновление каждые 500 мс)
-        self.simulation_timer.timeout.connect(update_simulation)
-        self.simulation_timer.start(500)
+    def toggle_replay(self):
+        if self.replay is None:
+            return
+        if self.playback.playing:
+            self.playback.pause()
+            self.replay_timer.stop()
+            self.replay_play_btn.setText("Пуск")
+        else:
+            if self.replay.at_end:
+                self.seek_replay(0)
+            self.start_playback()
+
+    def replay_tick(self):
+        # Кадр выбирается по часам воспроизведения: отставшая отрисовка пропускает шаги
+        frame = self.playback.tick()
+        if frame is not None:
+            self.draw_replay_frame(frame)
+        if not self.playback.playing:
+            self.replay_timer.stop()
+            self.replay_play_btn.setText("Пуск")
+            QMessageBox.information(self, "Моделирование", "Моделирование завершено")
+
+    def seek_replay(self, step):
+        """Перемотка к шагу step: траектории начинаются заново с этого шага"""
+        if self.replay is None:
+            return
+        self.clear_replay_trails()
+        self.draw_replay_frame(self.playback.seek(step))
+
+    def draw_replay_frame(self, frame):
+        """Отрисовывает шаг записи и обновляет ползунок"""
+        self.draw_frame(frame)
+        self.update_replay_position()
+
+    def update_replay_position(self):
+        self.replay_slider.blockSignals(True)
+        self.replay_slider.setValue(self.replay.position)
+        self.replay_slider.blockSignals(False)
+        self.status_bar.showMessage(
+            f"Шаг: {self.replay.position + 1}/{len(self.replay)} Время: {self.replay.time}"
+        )
 
-        QMessageBox.information(self, "Моделирование", "Моделирование запущено")
+    def clear_replay_trails(self):
+        """Удаляет со сцены траектории, нарисованные при воспроизведении"""
+        for obj in self.scene_objects.values():
+            if not isinstance(obj, MapObject) or obj.trajectory is None:
+                continue
+            self.scene.removeItem(obj.trajectory)
+            obj.trajectory = None
+
+    def draw_frame(self, frame):
+        """Отрисовывает объекты одного шага (записи modules.Recorder)"""
+        for record in frame:
+            obj_id = str(int(record['id']))
+            x, y, _ = record['pos']
+            x, y = self.convert_coordinates(x, y)
+
+            # Если это ракета и её нет на сцене - создаем
+            if Replay.is_missile(record) and obj_id not in self.scene_objects:
+                self.scene_model.add(obj_id, ObjectType.MISSILE, x, y)
+
+            # Обновляем позицию для всех объектов (включая ракеты)
+            if obj_id not in self.scene_objects:
+                continue
+            obj = self.scene_objects[obj_id]
+            obj_type = obj.obj_type
+
+            # Для самолетов и вертолетов меняем иконку в зависимости от видимости
+            if obj_type in [ObjectType.AIR_PLANE, ObjectType.HELICOPTER]:
+                if record['visible']:
+                    # Используем красную иконку
+                    if obj_type == ObjectType.AIR_PLANE:
+                        new_icon = self.icons[ObjectType.AIR_PLANE_RED]
+                    else:
+                        new_icon = self.icons[ObjectType.HELICOPTER_RED]
+                else:
+                    # Используем обычную иконку
+                    new_icon = self.icons[obj_type]
+
+                obj.setPixmap(new_icon)
+
+            new_x = x - obj.pixmap().width() / 2
+            new_y = y - obj.pixmap().height() / 2
+            obj.setPos(new_x, new_y)
+
+            # Для ВСЕХ движущихся объектов (включая ракеты) продлеваем траекторию:
+            # одна ломаная на объект вместо точки и линии на каждом шаге
+            if obj_type in [ObjectType.AIR_PLANE, ObjectType.HELICOPTER, ObjectType.MISSILE]:
+                if obj.trajectory is None:
+                    if obj_type == ObjectType.MISSILE:
+                        color = QPen(QColor(0, 0, 255, 180), 10)
+                    else:
+                        color = QPen(QColor(255, 150, 0, 180), 10)
+                    obj.trajectory = TrackItem(color, min_distance=TRACK_MIN_DISTANCE, max_points=TRACK_MAX_POINTS)
+                    obj.trajectory.setZValue(9)
+                    self.scene.addItem(obj.trajectory)
+                obj.trajectory.add_point(x, y)
+
+        # Объекты сдвинулись: подписи и кластеры пересчитываются по видимой области
+        self.scene_model.refresh_lod()
 
     def initialize_scene_objects(self):
-        """Инициализирует словарь scene_objects на основе текущей сцены"""
+        """Инициализирует словарь scene_objects на основе текущей сцены (подписи - дочерние элементы объектов)"""
         self.scene_objects.clear()
-        label_positions = {}
-
-        for item in self.scene.items():
-            if isinstance(item, QGraphicsTextItem):
-                label_positions[(item.x(), item.y())] = item
-
         for item in self.scene.items():
             if isinstance(item, MapObject):
-                obj_center_x = item.x() + item.pixmap().width() / 2
-                expected_label_y = item.y() - 30
-                expected_label_x = obj_center_x
-
-                label = None
-                for (x, y), lbl in label_positions.items():
-                    if (abs(x - expected_label_x) < 50 and
-                            abs(y - expected_label_y) < 50 and
-                            str(item.obj_id) in lbl.toPlainText()):
-                        label = lbl
-                        break
-
-                self.scene_objects[item.obj_id] = {
-                    'object': item,
-                    'label': label
-                }
-
-                if label is not None:
-                    label.setParentItem(item)
+                self.scene_objects[str(item.obj_id)] = item
 
     def is_id_unique(self, obj_id, obj_type=None):
         # Проверяем ID во всех типах объектов
@@ -789,7 +828,7 @@ class PolygonEditor(QMainWindow):
         self.scene.clear()
 
         # Очищаем словарь объектов
-        self.scene_objects.clear()
+        self.scene_model.reset()
 
         # Восстанавливаем стандартные настройки сцены
         self.scene.setSceneRect(-15000, -15000, 30000, 30000)
@@ -807,9 +846,11 @@ class PolygonEditor(QMainWindow):
         msg_box.exec()
 
         if msg_box.clickedButton() == button_yes:
-            # Останавливаем таймер симуляции, если он активен
-            if hasattr(self, 'simulation_timer') and self.simulation_timer.isActive():
-                self.simulation_timer.stop()
+            # Останавливаем моделирование и воспроизведение, если они идут
+            self.cancel_simulation()
+            self.stop_replay()
+            self.replay_slider.setEnabled(False)
+            self.replay_play_btn.setEnabled(False)
 
             # Полностью очищаем сцену
             self.clear_scene_completely()
@@ -0,0 +1,194 @@
+from PyQt5.QtGui import QColor, QPen, QBrush, QTransform
+from PyQt5.QtWidgets import QGraphicsEllipseItem, QGraphicsItem, QGraphicsSimpleTextItem
+
+from UI.ClusterLayer import ClusterLayer
+from UI.Enums import ObjectType
+from UI.MapObject import MapObject
+
+# Уровни детализации по масштабу вида
+ICON_MIN_SCALE = 0.02  # ниже - объекты рисуются точками и кластерами
+LABEL_MIN_SCALE = 0.04  # ниже - подписи скрыты
+
+
+class SceneModel:
+    """
+    Объекты карты по id. Сцена не перестраивается целиком: sync() сравнивает
+    конфигурацию с тем, что уже нарисовано, и добавляет, перемещает
+    или удаляет только изменившиеся элементы. Подпись и зона действия радара -
+    дочерние элементы MapObject и двигаются вместе с ним.
+
+    Детализация зависит от масштаба (apply_lod): при малом масштабе иконки скрыты
+    и объекты рисует ClusterLayer, подписи показываются только при крупном масштабе
+    и только у объектов в видимой области
+    """
+
+    def __init__(self, scene, icons, convert_coordinates, extent):
+        """
+        :param scene: QGraphicsScene карты
+        :param icons: иконки по ObjectType
+        :param convert_coordinates: преобразование координат полигона в координаты сцены
+        :param extent: размер карты (радиус от центра) для слоя кластеров
+        """
+        self.scene = scene
+        self.icons = icons
+        self.convert_coordinates = convert_coordinates
+        self.extent = extent
+        self.items = {}  # {str(id): MapObject}
+        self._state = {}  # {str(id): (тип, x, y, радиус зоны)} - из последнего sync()
+
+        self.show_icons = True
+        self._labelled = set()  # id объектов с показанной подписью
+        self._lod = None  # (масштаб, видимая область) последнего apply_lod()
+        self.cluster_layer = None
+        self._create_cluster_layer()
+
+    def _create_cluster_layer(self):
+        self.cluster_layer = ClusterLayer(self.items, self.extent)
+        self.cluster_layer.setVisible(not self.show_icons)
+        self.scene.addItem(self.cluster_layer)
+
+    @staticmethod
+    def config_objects(config):
+        """Объекты конфигурации: {str(id): (ObjectType, координаты, радиус зоны радара)}"""
+        objects = {}
+        for target in config["air_environment"]["targets"]:
+            objects[str(target.get("id", ""))] = (ObjectType[target["type"]], target["position"], None)
+
+        for launcher in config["missile_launchers"]:
+            objects[str(launcher.get("id", ""))] = (ObjectType.MISSILE_LAUNCHER, launcher["position"], None)
+            for missile in launcher.get("missiles", []):
+                objects[str(missile["id"])] = (ObjectType.MISSILE, launcher["position"], None)
+
+        for radar in config["radars"]:
+            objects[str(radar.get("id", ""))] = (ObjectType.RADAR, radar["position"],
+                                                 radar.get("max_distance", 10000))
+        return objects
+
+    def sync(self, config):
+        """Приводит сцену к конфигурации, изменяя только отличающиеся объекты"""
+        desired = {}
+        for obj_id, (obj_type, position, radius) in self.config_objects(config).items():
+            x, y = self.convert_coordinates(position[0], position[1])
+            desired[obj_id] = (obj_type, x, y, radius)
+
+        for obj_id in [obj_id for obj_id in self.items if obj_id not in desired]:
+            self.remove(obj_id)
+
+        for obj_id, state in desired.items():
+            if self._state.get(obj_id) == state:
+                continue
+            obj_type, x, y, radius = state
+            obj = self.items.get(obj_id)
+            if obj is None or obj.obj_type != obj_type:
+                self.remove(obj_id)
+                self.add(obj_id, obj_type, x, y)
+            else:
+                # Иконка могла смениться при воспроизведении (цель, видимая радаром)
+                obj.setPixmap(self.icons.get(obj_type, self.icons[ObjectType.AIR_PLANE]))
+                self.move(obj_id, x, y)
+            if obj_type == ObjectType.RADAR:
+                self.set_radar_range(obj_id, radius)
+            self._state[obj_id] = state
+
+    def add(self, obj_id, obj_type, x, y):
+        """Создает объект карты с подписью в точке (x, y) сцены"""
+        obj_id = str(obj_id)
+        icon = self.icons.get(obj_type, self.icons[ObjectType.AIR_PLANE])
+        obj = MapObject(icon, obj_type, obj_id)
+        obj.setPos(x - icon.width() / 2, y - icon.height() / 2)
+
+        # Подпись не масштабируется вместе с картой и стоит над иконкой
+        label = QGraphicsSimpleTextItem(obj_id, obj)
+        label.setFlag(QGraphicsItem.ItemIgnoresTransformations)
+        label.setPos(icon.width() / 2, 0)
+        bounds = label.boundingRect()
+        label.setTransform(QTransform.fromTranslate(-bounds.width() / 2, -bounds.height() - 2))
+        label.setVisible(False)  # подписи включает apply_lod для видимых объектов
+        obj.label = label
+        obj.setVisible(self.show_icons)
+
+        self.scene.addItem(obj)
+        self.items[obj_id] = obj
+        return obj
+
+    def move(self, obj_id, x, y):
+        obj = self.items[str(obj_id)]
+        obj.setPos(x - obj.pixmap().width() / 2, y - obj.pixmap().height() / 2)
+
+    def remove(self, obj_id):
+        obj_id = str(obj_id)
+        obj = self.items.pop(obj_id, None)
+        self._state.pop(obj_id, None)
+        self._labelled.discard(obj_id)
+        if obj is None:
+            return
+        if obj.trajectory is not None:
+            self.scene.removeItem(obj.trajectory)
+        self.scene.removeItem(obj)
+
+    def set_radar_range(self, obj_id, radius):
+        """Зона действия радара: круг вокруг центра иконки, под ней"""
+        obj = self.items[str(obj_id)]
+        if obj.radar_range is not None:
+            self.scene.removeItem(obj.radar_range)
+            obj.radar_range = None
+        if radius is None:
+            return
+        center_x, center_y = obj.pixmap().width() / 2, obj.pixmap().height() / 2
+        radar_range = QGraphicsEllipseItem(center_x - radius, center_y - radius, radius * 2, radius * 2, obj)
+        radar_range.setPen(QPen(QColor(0, 200, 0, 80)))
+        radar_range.setBrush(QBrush(QColor(0, 200, 0, 30)))
+        radar_range.setFlag(QGraphicsItem.ItemStacksBehindParent)
+        obj.radar_range = radar_range
+
+    def forget_positions(self):
+        """
+        Забывает нарисованные координаты: следующий sync() вернет все объекты
+        на позиции из конфигурации (после воспроизведения они сдвинуты)
+        """
+        self._state.clear()
+
+    def apply_lod(self, scale, visible_rect):
+        """
+        Применяет уровень детализации для масштаба scale
+
+        :param scale: масштаб вида (пикселей на метр)
+        :param visible_rect: видимая область в координатах сцены
+        """
+        self._lod = (scale, visible_rect)
+        show_icons = scale >= ICON_MIN_SCALE
+        if show_icons != self.show_icons:
+            # Переключение уровня - единственный проход по всем объектам
+            self.show_icons = show_icons
+            for obj in self.items.values():
+                obj.setVisible(show_icons)
+            self.cluster_layer.setVisible(not show_icons)
+
+        # Подписи обновляются только у объектов в видимой области (поиск по индексу сцены)
+        labelled = set()
+        if show_icons and scale >= LABEL_MIN_SCALE:
+            labelled = {str(item.obj_id) for item in self.scene.items(visible_rect)
+                        if isinstance(item, MapObject)}
+        for obj_id in self._labelled - labelled:
+            obj = self.items.get(obj_id)
+            if obj is not None:
+                obj.label.setVisible(False)
+        for obj_id in labelled - self._labelled:
+            obj = self.items.get(obj_id)
+            if obj is not None and obj.label is not None:
+                obj.label.setVisible(True)
+        self._labelled = labelled
+
+    def refresh_lod(self):
+        """Повторяет apply_lod после перемещения или добавления объектов"""
+        if self._lod is not None:
+            self.apply_lod(*self._lod)
+        # Кластеры пересчитываются и при показанных иконках: слой включится уже с новыми объектами
+        self.cluster_layer.invalidate()
+
+    def reset(self):
+        """Сбрасывает модель после очистки сцены (элементы уже удалены)"""
+        self.items.clear()
+        self._state.clear()
+        self._labelled.clear()
+        self._create_cluster_layer()
@@ -0,0 +1,102 @@
+import logging
+import queue
+import threading
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from main import prepare_simulation_from_config
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.1  # с, период проверки отмены при заполненной очереди
+
+
+class Frame(NamedTuple):
+    """Кадр одного шага моделирования (записи в формате modules.Recorder.RECORD_DTYPE)"""
+    step: int
+    time: int
+    records: np.ndarray
+
+
+class SimulationWorker(threading.Thread):
+    """
+    Фоновое моделирование: шаги менеджера выполняются в отдельном потоке,
+    кадры каждого шага передаются интерфейсу через ограниченную очередь.
+    Если интерфейс не успевает их забирать, поток ждет (обратное давление),
+    поэтому память не растет. После последнего кадра (и после отмены) в очередь кладется None
+    """
+
+    def __init__(self, config_path: str, record_path: str, history_steps: int = 2,
+                 max_frames: int = 64, use_cache: bool = True) -> None:
+        """
+        :param config_path: путь к YAML-конфигу сценария
+        :param record_path: файл записи прогона (по нему потом работает перемотка)
+        :param history_steps: сколько последних шагов сообщений хранить в менеджере
+        :param max_frames: размер очереди кадров
+        :param use_cache: использовать кэш скомпилированных сценариев
+        """
+        super().__init__(name='simulation-worker', daemon=True)
+        self.config_path = config_path
+        self.record_path = record_path
+        self.history_steps = history_steps
+        self.use_cache = use_cache
+        self.frames: "queue.Queue[Optional[Frame]]" = queue.Queue(maxsize=max_frames)
+        self.error: Optional[BaseException] = None
+        self.steps_done = 0
+        self._cancel = threading.Event()
+
+    def cancel(self) -> None:
+        """Просит поток остановиться после текущего шага"""
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def run(self) -> None:
+        try:
+            manager, recorder, end_time = prepare_simulation_from_config(
+                self.config_path, use_cache=self.use_cache,
+                record_path=self.record_path, history_steps=self.history_steps
+            )
+            try:
+                while manager.time.get_time() < end_time and not self.cancelled:
+                    current_time = manager.time.get_time()
+                    manager.step()
+                    if recorder.last_frame is not None:
+                        # Буфер записи переиспользуется, в очередь уходит копия кадра
+                        frame = Frame(self.steps_done, current_time, recorder.last_frame.copy())
+                        if not self._put(frame):
+                            break
+                    self.steps_done += 1
+            finally:
+                recorder.close()
+        except Exception as e:  # noqa: BLE001 - ошибка моделирования передается интерфейсу
+            logger.exception("Ошибка фонового моделирования")
+            self.error = e
+        finally:
+            self._put_end()
+        logger.info("Фоновое моделирование завершено: %d шагов%s",
+                    self.steps_done, " (отменено)" if self.cancelled else "")
+
+    def _put(self, item: Optional[Frame]) -> bool:
+        """Кладет кадр в очередь, ожидая места; False, если моделирование отменено"""
+        while not self.cancelled:
+            try:
+                self.frames.put(item, timeout=POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _put_end(self) -> None:
+        """Кладет признак конца None; после отмены недоставленные кадры отбрасываются, чтобы освободить место"""
+        if self._put(None):
+            return
+        while True:
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                break
+        self.frames.put_nowait(None)
@@ -0,0 +1,124 @@
+from PyQt5.QtCore import QPointF, QRectF
+from PyQt5.QtGui import QPolygonF
+from PyQt5.QtWidgets import QGraphicsItem
+
+
+CHUNK_POINTS = 64  # точек в одном куске ломаной
+
+
+def _overlaps(rect, other):
+    """Пересечение прямоугольников, включая вырожденные (отрезок по горизонтали или вертикали)"""
+    return (rect.left() <= other.right() and other.left() <= rect.right()
+            and rect.top() <= other.bottom() and other.top() <= rect.bottom())
+
+
+def _extend(rect, x, y):
+    """Прямоугольник rect, расширенный до точки (x, y)"""
+    left, top = min(rect.left(), x), min(rect.top(), y)
+    right, bottom = max(rect.right(), x), max(rect.bottom(), y)
+    return QRectF(left, top, right - left, bottom - top)
+
+
+class TrackItem(QGraphicsItem):
+    """
+    Траектория объекта одним графическим элементом: ломаная, которая дополняется
+    точками по мере воспроизведения (вместо отдельных точки и линии на каждый шаг).
+    Добавление точки стоит O(1): границы элемента расширяются инкрементально,
+    перерисовывается только новый отрезок. Точки ближе min_distance к последней
+    сохраненной прореживаются, при max_points хранится только хвост траектории.
+
+    Ломаная хранится кусками до CHUNK_POINTS точек со своими границами: paint рисует
+    только куски, попадающие в option.exposedRect, поэтому перерисовка нового отрезка
+    или видимой части длинной траектории не проходит по всем ее точкам
+    """
+
+    def __init__(self, pen, min_distance=0.0, max_points=None, parent=None):
+        """
+        :param pen: перо линии траектории
+        :param min_distance: минимальное расстояние между сохраняемыми точками (в координатах сцены)
+        :param max_points: максимальное число точек (None - без ограничения)
+        """
+        super().__init__(parent)
+        # Без этого флага option.exposedRect в paint не заполняется
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+        self.pen = pen
+        self.min_distance = min_distance
+        self.max_points = max_points
+        # При ограничении длины хвост превышает max_points не больше чем на кусок (~четверть)
+        self._chunk_points = CHUNK_POINTS if max_points is None else max(2, min(CHUNK_POINTS, max_points // 4))
+        self._chunks = []  # [ломаная QPolygonF, ее границы QRectF]
+        self._count = 0
+        self._bounds = QRectF()
+
+    def __len__(self):
+        return self._count
+
+    def add_point(self, x, y):
+        """Добавляет точку в конец траектории"""
+        point = QPointF(x, y)
+        if self._count:
+            chunk = self._chunks[-1]
+            last = chunk[0].at(chunk[0].size() - 1)
+            if (x - last.x()) ** 2 + (y - last.y()) ** 2 < self.min_distance ** 2:
+                return
+            if chunk[0].size() >= self._chunk_points:
+                # Новый кусок начинается с последней точки предыдущего, ломаная не разрывается
+                chunk = [QPolygonF([last]), QRectF(last, last)]
+                self._chunks.append(chunk)
+            chunk[0].append(point)
+            chunk[1] = _extend(chunk[1], x, y)
+        else:
+            self._chunks.append([QPolygonF([point]), QRectF(point, point)])
+        self._count += 1
+
+        if self.max_points is not None and self._drop_head():
+            return
+
+        if self._count == 1:
+            self.prepareGeometryChange()
+            self._bounds = QRectF(point, point)
+        elif not (self._bounds.left() <= x <= self._bounds.right() and self._bounds.top() <= y <= self._bounds.bottom()):
+            self.prepareGeometryChange()
+            self._bounds = _extend(self._bounds, x, y)
+        else:
+            # Точка внутри границ: перерисовывается только новый отрезок
+            segment = QRectF(last, point).normalized()
+            self.update(self._pad(segment))
+
+    def _drop_head(self):
+        """
+        Обрезает начало траектории целыми кусками, пока остается не меньше max_points точек;
+        границы пересчитываются раз на кусок, а не на каждом шаге
+        """
+        dropped = False
+        while len(self._chunks) > 1 and self._count - self._chunks[0][0].size() + 1 >= self.max_points:
+            self._count -= self._chunks.pop(0)[0].size() - 1
+            dropped = True
+        if dropped:
+            self.prepareGeometryChange()
+            self._bounds = QRectF(self._chunks[0][1])
+            for _, bounds in self._chunks[1:]:
+                self._bounds = self._bounds.united(bounds)
+        return dropped
+
+    def clear(self):
+        self.prepareGeometryChange()
+        self._chunks = []
+        self._count = 0
+        self._bounds = QRectF()
+
+    def _pad(self, rect):
+        half_width = self.pen.widthF() / 2
+        return rect.adjusted(-half_width, -half_width, half_width, half_width)
+
+    def boundingRect(self):
+        return self._pad(self._bounds)
+
+    def paint(self, painter, option, widget=None):
+        if self._count < 2:
+            return
+        painter.setPen(self.pen)
+        exposed = option.exposedRect
+        for polygon, bounds in self._chunks:
+            if polygon.size() > 1 and _overlaps(self._pad(bounds), exposed):
+                painter.drawPolyline(polygon)
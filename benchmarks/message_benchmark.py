@@ -0,0 +1,118 @@
+"""
+Микробенчмарк сообщений: память и время создания на одно сообщение для частых типов
+(MissilePosMessage, CPPDrawerObjectsMessage, FoundObjectsMessage).
+
+Сравниваются два варианта:
+    dict   - тот же класс без __slots__ (как были устроены сообщения раньше),
+    slots  - текущие классы modules.Messages
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.message_benchmark
+    python -m benchmarks.message_benchmark --count 200000
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.scenario_benchmark import _git_commit
+from modules.Messages import CPPDrawerObjectsMessage, FoundObjectsMessage, MissilePosMessage
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(REPO_ROOT, 'benchmarks', 'message_results.jsonl')
+COORDINATES = np.zeros(3)
+
+
+def _dict_variant(cls: type) -> type:
+    """Подкласс со словарем экземпляра: без __slots__ у наследника атрибуты хранятся в __dict__"""
+    return type(cls.__name__ + 'Dict', (cls,), {})
+
+
+MESSAGES: Dict[str, Callable[[type], Callable[[], Any]]] = {
+    'MissilePosMessage': lambda cls: (lambda: cls(sender_id=1001)),
+    'CPPDrawerObjectsMessage': lambda cls: (lambda: cls(sender_id=0, obj_id=100, target_type='AIR_PLANE',
+                                                        coordinates=COORDINATES, is_visible_by_radar=True,
+                                                        time=0, receiver_id=-2)),
+    'FoundObjectsMessage': lambda cls: (lambda: cls(sender_id=2, visible_objects=[], time=0, receiver_id=0)),
+}
+CLASSES = {
+    'MissilePosMessage': MissilePosMessage,
+    'CPPDrawerObjectsMessage': CPPDrawerObjectsMessage,
+    'FoundObjectsMessage': FoundObjectsMessage,
+}
+
+
+def measure_memory(make: Callable[[], Any], count: int) -> float:
+    """Байт на сообщение при удержании count сообщений"""
+    gc.collect()
+    tracemalloc.start()
+    messages = [make() for _ in range(count)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Сам список ссылок к сообщению не относится
+    list_size = sys.getsizeof(messages)
+    del messages
+    return (current - list_size) / count
+
+
+def measure_time(make: Callable[[], Any], count: int, repeats: int = 5) -> float:
+    """Наносекунд на создание сообщения (лучший из repeats прогонов)"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(count):
+            make()
+        best = min(best, time.perf_counter() - start)
+    return best / count * 1e9
+
+
+def run(count: int) -> List[Dict[str, Any]]:
+    results = []
+    for name, factory in MESSAGES.items():
+        cls = CLASSES[name]
+        result: Dict[str, Any] = {'message': name}
+        for variant, make_cls in (('dict', _dict_variant(cls)), ('slots', cls)):
+            make = factory(make_cls)
+            result[f'{variant}_bytes'] = round(measure_memory(make, count), 1)
+            result[f'{variant}_ns'] = round(measure_time(make, count), 1)
+        results.append(result)
+    return results
+
+
+def _print_report(results: List[Dict[str, Any]]) -> None:
+    print(f"{'message':<26}{'dict, B':>10}{'slots, B':>10}{'dict, ns':>10}{'slots, ns':>11}")
+    for result in results:
+        print(f"{result['message']:<26}{result['dict_bytes']:>10.1f}{result['slots_bytes']:>10.1f}"
+              f"{result['dict_ns']:>10.1f}{result['slots_ns']:>11.1f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Бенчмарк памяти и времени создания сообщений')
+    parser.add_argument('--count', type=int, default=100_000, help='сообщений на измерение')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='файл JSON Lines с результатами')
+    args = parser.parse_args(argv)
+
+    results = run(args.count)
+    record = {
+        'commit': _git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'count': args.count,
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'a', encoding='utf-8') as file:
+        file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    _print_report(results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Бенчмарк конвейера моделирования на синтетических сценариях.
+
+Каждый сценарий прогоняется через настоящий Manager (create_objects_from_config ->
+run_simulation) в отдельном процессе, чтобы пиковое потребление памяти (RSS)
+не смешивалось между сценариями. Результаты дописываются в файл JSON Lines,
+одна запись на запуск, с хешем коммита - так регрессии видны между коммитами.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.scenario_benchmark                    # быстрый набор
+    python -m benchmarks.scenario_benchmark --suite full       # вплоть до 10k целей
+    python -m benchmarks.scenario_benchmark --scenarios t100_r4_l5 --steps 20
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from scenario_generator import generate_scenario
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(REPO_ROOT, 'benchmarks', 'results.jsonl')
+
+# name: (целей, радаров, ПУ, шагов по умолчанию)
+SCENARIOS = {
+    't10_r1_l1': (10, 1, 1, 200),
+    't100_r4_l5': (100, 4, 5, 100),
+    't1k_r16_l20': (1_000, 16, 20, 20),
+    't10k_r32_l50': (10_000, 32, 50, 5),
+}
+
+SUITES = {
+    'quick': ['t10_r1_l1', 't100_r4_l5'],
+    'full': list(SCENARIOS),
+}
+
+TIME_STEP = 200  # мс
+MISSILES_PER_LAUNCHER = 4
+
+
+def synthetic_config(n_targets: int, n_radars: int, n_launchers: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    Конфигурация сценария в формате create_objects_from_config: смешанный налет
+    (строй, колонна, рой), эшелонированное радиолокационное поле и батареи ПУ
+
+    :param n_targets: количество целей
+    :param n_radars: количество радаров
+    :param n_launchers: количество пусковых установок
+    :param seed: зерно генератора сценария
+    """
+    return generate_scenario(
+        n_targets, pattern='mixed', n_radars=n_radars, n_launchers=n_launchers,
+        missiles_per_launcher=MISSILES_PER_LAUNCHER, time_step=TIME_STEP, seed=seed
+    )
+
+
+def _instrument_modules(manager, module_time: Dict[str, float]) -> None:
+    """Оборачивает step() каждого модуля менеджера счетчиком времени по имени класса"""
+    for module in manager.modules:
+        name = module.__class__.__name__
+        step = module.step
+
+        def timed_step(step=step, name=name):
+            start = time.perf_counter()
+            try:
+                step()
+            finally:
+                module_time[name] += time.perf_counter() - start
+
+        module.step = timed_step
+
+
+def run_scenario(name: str, steps: Optional[int] = None, seed: int = 0, workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Прогоняет один сценарий в текущем процессе и возвращает метрики
+
+    :param name: имя сценария из SCENARIOS
+    :param steps: количество шагов моделирования (по умолчанию - из SCENARIOS)
+    :param seed: зерно генератора сценария и шумов радара
+    :param workers: потоки для параллельных фаз шага (Manager.workers)
+    """
+    from main import create_objects_from_config
+
+    n_targets, n_radars, n_launchers, default_steps = SCENARIOS[name]
+    steps = steps or default_steps
+    np.random.seed(seed)
+
+    start = time.perf_counter()
+    config = synthetic_config(n_targets, n_radars, n_launchers, seed)
+    manager, _ = create_objects_from_config(config)
+    manager.workers = workers
+    setup_time = time.perf_counter() - start
+
+    module_time: Dict[str, float] = defaultdict(float)
+    _instrument_modules(manager, module_time)
+
+    start = time.perf_counter()
+    try:
+        manager.run_simulation(steps * manager.time.get_dt())
+    finally:
+        manager.close()
+    run_time = time.perf_counter() - start
+
+    return {
+        'scenario': name,
+        'targets': n_targets,
+        'radars': n_radars,
+        'launchers': n_launchers,
+        'steps': steps,
+        'workers': workers,
+        'setup_s': round(setup_time, 6),
+        'run_s': round(run_time, 6),
+        'steps_per_s': round(steps / run_time, 3) if run_time > 0 else None,
+        'module_s': {key: round(value, 6) for key, value in sorted(module_time.items())},
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'status': 'ok',
+    }
+
+
+def _scenario_worker(name: str, steps: Optional[int], seed: int, workers: Optional[int], log_level: int,
+                     out_queue) -> None:
+    logging.basicConfig(level=log_level)
+    try:
+        out_queue.put(run_scenario(name, steps, seed, workers))
+    except Exception as e:  # noqa: BLE001 - ошибка сценария попадает в отчет, а не роняет набор
+        out_queue.put({'scenario': name, 'status': 'error', 'error': repr(e)})
+
+
+def run_isolated(name: str, steps: Optional[int], seed: int, timeout: float, log_level: int,
+                 workers: Optional[int] = None) -> Dict[str, Any]:
+    """Запускает сценарий в чистом дочернем процессе (spawn) с ограничением по времени"""
+    ctx = multiprocessing.get_context('spawn')
+    out_queue = ctx.Queue()
+    process = ctx.Process(target=_scenario_worker, args=(name, steps, seed, workers, log_level, out_queue))
+    process.start()
+    try:
+        result = out_queue.get(timeout=timeout)
+    except Exception:  # noqa: BLE001 - queue.Empty по таймауту
+        process.terminate()
+        result = {'scenario': name, 'status': 'timeout', 'timeout_s': timeout}
+    process.join()
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _previous_results(path: str) -> Dict[str, Dict[str, Any]]:
+    """Последний успешный результат каждого сценария из файла результатов"""
+    previous = {}
+    if not os.path.exists(path):
+        return previous
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            for result in record.get('results', []):
+                if result.get('status') == 'ok':
+                    previous[result['scenario']] = dict(result, commit=record.get('commit'))
+    return previous
+
+
+def _print_report(results: List[Dict[str, Any]], previous: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'scenario':<16}{'steps/s':>12}{'peak RSS, MB':>14}{'vs prev':>10}  modules")
+    for result in results:
+        if result['status'] != 'ok':
+            print(f"{result['scenario']:<16}{result['status']:>12}")
+            continue
+        delta = ''
+        before = previous.get(result['scenario'])
+        if before and before.get('steps_per_s') and before.get('steps') == result['steps'] \
+                and before.get('workers') == result.get('workers'):
+            delta = f"{(result['steps_per_s'] / before['steps_per_s'] - 1) * 100:+.1f}%"
+        modules = ', '.join(f"{key}={value:.3f}s" for key, value in result['module_s'].items())
+        print(f"{result['scenario']:<16}{result['steps_per_s']:>12.2f}"
+              f"{result['peak_rss_kb'] / 1024:>14.1f}{delta:>10}  {modules}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Бенчмарк моделирования ЗРК на синтетических сценариях')
+    parser.add_argument('--suite', choices=sorted(SUITES), default='quick')
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), help='явный список сценариев')
+    parser.add_argument('--steps', type=int, help='количество шагов для каждого сценария')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, help='потоки для параллельных фаз шага (Manager.workers)')
+    parser.add_argument('--timeout', type=float, default=600.0, help='ограничение на сценарий, секунд')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='файл JSON Lines с результатами')
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args(argv)
+
+    names = args.scenarios or SUITES[args.suite]
+    previous = _previous_results(args.output)
+    log_level = getattr(logging, args.log_level.upper())
+
+    results = [run_isolated(name, args.steps, args.seed, args.timeout, log_level, args.workers) for name in names]
+    record = {
+        'commit': _git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'seed': args.seed,
+        'results': results,
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'a', encoding='utf-8') as file:
+        file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    _print_report(results, previous)
+    return 0 if all(result['status'] == 'ok' for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,40 +1,70 @@
+import os
+import atexit
+import queue
 import yaml
 import numpy as np
-from typing import Dict, List, Any, Tuple
+from typing import Dict, Any, Optional, Tuple
 import logging
+import logging.handlers
 
 from modules.Manager import Manager
 from modules.AirEnv import AirEnv
 from modules.Radar import SectorRadar
-from modules.utils import Target, TargetType
+from modules.utils import TargetTable
 from modules.AirObject import Trajectory
 from modules.CCP import CombatControlPoint
 from modules.MissileLauncher import MissileLauncher
 from modules.Missile import Missile
+from modules.Recorder import Recorder, RecordedRun
+from modules.Analytics import run_summary, format_table
+from modules.Checkpoint import Checkpointer
+from modules.EventLog import EventLog
+from modules.SharedAirspace import RadarProcessPool
 from modules.Timer import Timer
-from modules.BaseModel import BaseModel
-from modules.constants import MessageType
+from scenario_cache import YamlLoader, load_scenario
 
 # создаём логгер для данного модуля
 logger = logging.getLogger(__name__)
 
-def setup_logging():
-    logging.basicConfig(
-        filename='logs/app.log',
-        filemode='w',
-        encoding='utf-8',
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+def setup_logging(level: int = logging.INFO, use_queue: bool = False, log_path: str = 'logs/app.log'):
+    """
+    Настройка логирования в файл
+
+    :param level: уровень логирования (при logging.WARNING и выше трассировка шагов не строится)
+    :param use_queue: писать в файл из отдельного потока через очередь, не блокируя шаг симуляции
+    :param log_path: путь к файлу лога
+    """
+    os.makedirs(os.path.dirname(log_path) or '.', exist_ok=True)
+    file_handler = logging.FileHandler(log_path, mode='w', encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    if not use_queue:
+        logging.basicConfig(level=level, handlers=[file_handler])
+        return None
+
+    # Модули пишут только в очередь, запись на диск выполняет поток QueueListener
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    logging.basicConfig(level=level, handlers=[logging.handlers.QueueHandler(log_queue)])
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
 
 def load_config(config_path: str) -> Dict[str, Any]:
-    """Загрузка конфигурации из YAML файла"""
-    with open(config_path, 'r') as file:
-        return yaml.safe_load(file)
+    """Загрузка конфигурации из YAML файла (C-загрузчиком libyaml, если он доступен)"""
+    with open(config_path, 'rb') as file:
+        return yaml.load(file, Loader=YamlLoader)
+
+def create_objects_from_config(config: Dict[str, Any],
+                               manager_class: type = Manager) -> Tuple[Manager, Dict[int, object]]:
+    """Создание объектов из конфигурации
 
-def create_objects_from_config(config: Dict[str, Any]) -> Tuple[Manager, Dict[int, object]]:
-    """Создание объектов из конфигурации"""
-    manager = Manager()
+    :param manager_class: класс менеджера (например, modules.AsyncManager.AsyncManager)
+    """
+    manager = manager_class()
     objects_by_id = {}
 
     # Настройка таймера
@@ -125,51 +155,101 @@ def create_objects_from_config(config: Dict[str, Any]) -> Tuple[Manager, Dict[in
         objects_by_id[ccp_config['id']] = ccp
 
     # Добавление целей в воздушную обстановку
-    for target_config in air_env_config.get('targets', []):
-        target_type = getattr(TargetType, target_config['type'])
-        target_id = target_config['id']
-        pos = np.array(target_config['position'])
-        velocity = np.array(target_config['velocity'])
-
-        target_trajectory = Trajectory(
-            velocity=velocity,
-            start_pos=pos,
-            start_time=0.0
-        )
-
-        target = Target(
-            manager=manager,
-            id=target_id,
-            pos=pos,
-            trajectory=target_trajectory,
-            type=target_type
-        )
-        air_env.add_target(target)
+    targets = air_env_config.get('targets') or []
+    if not isinstance(targets, TargetTable):
+        targets = TargetTable.from_records(targets)
+    air_env.add_targets(
+        ids=targets.ids,
+        types=targets.types,
+        positions=targets.positions,
+        velocities=targets.velocities
+    )
 
     return manager, objects_by_id
 
-def run_simulation_from_config(config_path: str):
-    """Запуск симуляции из конфиг-файла"""
-    config = load_config(config_path)
-    manager, objects = create_objects_from_config(config)
+def prepare_simulation_from_config(config_path: str, use_cache: bool = True, record_path: Optional[str] = None,
+                                   history_steps: Optional[int] = None, workers: Optional[int] = None,
+                                   radar_processes: Optional[int] = None,
+                                   manager_class: type = Manager) -> Tuple[Manager, Optional[Recorder], int]:
+    """
+    Создание объектов моделирования из конфиг-файла без запуска
+
+    :param config_path: путь к YAML-конфигу сценария
+    :param use_cache: использовать кэш скомпилированных сценариев (см. scenario_cache)
+    :param record_path: файл для записи хода моделирования (см. modules.Recorder)
+    :param history_steps: сколько последних шагов сообщений хранить в менеджере (None - все)
+    :param workers: число потоков для параллельных фаз шага (см. Manager.step), None - последовательно
+    :param radar_processes: число процессов для обнаружения МФР (см. modules.SharedAirspace), None - в текущем процессе
+    :param manager_class: класс менеджера (например, modules.AsyncManager.AsyncManager)
+    :return: менеджер, модуль записи (None без record_path) и время завершения симуляции
+    """
+    config = load_scenario(config_path, use_cache=use_cache)
+    manager, objects = create_objects_from_config(config, manager_class=manager_class)
+    manager.history_steps = history_steps
+    manager.workers = workers
+    if radar_processes:
+        manager.prepare_pool = RadarProcessPool(radar_processes)
+
+    recorder = None
+    if record_path is not None:
+        recorder = Recorder(manager, record_path)
+        manager.add_module(recorder)
 
     logger.info("Созданные объекты:")
     for obj_id, obj in objects.items():
         if isinstance(obj, MissileLauncher):
-            logger.info(f"Пусковая установка (ID: {obj_id}), ракет: {obj.get_missile_count()}")
+            logger.info("Пусковая установка (ID: %s), ракет: %d", obj_id, obj.get_missile_count())
         elif isinstance(obj, SectorRadar):
-            logger.info(f"Радар (ID: {obj_id}), режим: {obj.scan_mode}")
+            logger.info("Радар (ID: %s), режим: %s", obj_id, obj.scan_mode)
         elif isinstance(obj, CombatControlPoint):
-            logger.info(f"Пункт боевого управления (ID: {obj_id})")
+            logger.info("Пункт боевого управления (ID: %s)", obj_id)
         elif isinstance(obj, AirEnv):
-            logger.info(f"Воздушная обстановка (ID: {obj_id})")
+            logger.info("Воздушная обстановка (ID: %s)", obj_id)
 
-    simulation_time = config['simulation']['duration']
-    logger.info(f"Запуск симуляции на {simulation_time} секунд...")
-    manager.run_simulation(simulation_time)
+    return manager, recorder, config['simulation']['duration']
+
+
+def run_simulation_from_config(config_path: str, use_cache: bool = True, record_path: Optional[str] = None,
+                               history_steps: Optional[int] = None, checkpoint_dir: Optional[str] = None,
+                               checkpoint_every: int = 100, workers: Optional[int] = None,
+                               radar_processes: Optional[int] = None, event_log_path: Optional[str] = None):
+    """
+    Запуск симуляции из конфиг-файла
+
+    :param config_path: путь к YAML-конфигу сценария
+    :param use_cache: использовать кэш скомпилированных сценариев (см. scenario_cache)
+    :param record_path: файл для записи хода моделирования (см. modules.Recorder)
+    :param history_steps: сколько последних шагов сообщений хранить в менеджере (None - все)
+    :param checkpoint_dir: каталог контрольных точек (см. modules.Checkpoint), None - не сохранять
+    :param checkpoint_every: период контрольных точек в шагах
+    :param workers: число потоков для параллельных фаз шага (см. Manager.step), None - последовательно
+    :param radar_processes: число процессов для обнаружения МФР (см. modules.SharedAirspace), None - в текущем процессе
+    :param event_log_path: файл двоичного журнала сообщений (см. modules.EventLog), None - без журнала
+    """
+    manager, recorder, simulation_time = prepare_simulation_from_config(
+        config_path, use_cache=use_cache, record_path=record_path, history_steps=history_steps, workers=workers,
+        radar_processes=radar_processes
+    )
+    if event_log_path is not None:
+        manager.event_log = EventLog(event_log_path)
+    logger.info("Запуск симуляции на %s секунд...", simulation_time)
+    try:
+        if checkpoint_dir is not None:
+            Checkpointer(manager, checkpoint_dir, checkpoint_every).run_simulation(simulation_time)
+        else:
+            manager.run_simulation(simulation_time)
+    finally:
+        manager.close()
+        if recorder is not None:
+            recorder.close()
+        if manager.event_log is not None:
+            manager.event_log.close()
 
     total_messages = sum(len(messages) for messages in manager.messages.values())
-    logger.info(f"Итого сообщений: {total_messages}")
+    logger.info("Итого сообщений: %d", total_messages)
+    if record_path is not None:
+        with RecordedRun(record_path) as run:
+            logger.info("Итоги боевой работы (modules.Analytics):\n%s", format_table(run_summary(run)))
 
     return manager
 
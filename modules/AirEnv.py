@@ -5,7 +5,8 @@ from .constants import *
 from .BaseModel import BaseModel
 from .AirObject import AirObject
 from .Messages import ActiveObjectsMessage
-from .utils import Target
+from .TargetStore import TargetStore, ActiveObjects
+from .utils import Target, to_seconds
 
 class AirEnv(BaseModel):
     """
@@ -22,6 +23,7 @@ class AirEnv(BaseModel):
         """
         super().__init__(manager, id, pos)
         self.__objects: List[AirObject] = []
+        self.__store = TargetStore(manager)
 
     def step(self) -> None:
         """
@@ -38,6 +40,7 @@ class AirEnv(BaseModel):
         for idx, objects in enumerate(self.__objects[:]):
             if objects is not None and objects.id in objects_to_remove:
                 self.__objects[idx] = None
+        self.__store.remove(objects_to_remove)
 
         for msg in self._manager.give_messages_by_type(MessageType.NEW_MISSILE, step_time=current_time - dt):
             self.__objects.append(msg.missile)
@@ -46,10 +49,15 @@ class AirEnv(BaseModel):
             if object is None:
                 continue
             object.step()
+        self.__store.step(to_seconds(current_time))
 
         self._manager.add_message(ActiveObjectsMessage(
             sender_id=self.id,
-            active_objects=[object for object in self.__objects if object is not None],
+            active_objects=ActiveObjects(
+                self.__store,
+                self.__store.active_rows(),
+                [object for object in self.__objects if object is not None]
+            ),
         ))
 
     def add_target(self, target: Target) -> None:
@@ -59,3 +67,19 @@ class AirEnv(BaseModel):
         :param target: объект класса Target для добавления
         """
         self.__objects.append(target)
+
+    def add_targets(self, ids, types, positions, velocities, start_times=None) -> None:
+        """
+        Добавляет пачку воздушных целей в компактное хранилище
+
+        :param ids: id целей, shape (N,)
+        :param types: коды типов (индексы utils.TARGET_TYPES) или значения TargetType, shape (N,)
+        :param positions: координаты целей в момент появления, shape (N, 3)
+        :param velocities: векторы скорости, shape (N, 3)
+        :param start_times: время появления целей в секундах, скаляр или shape (N,) (по умолчанию 0)
+        """
+        self.__store.add(ids, types, positions, velocities, start_times)
+
+    @property
+    def target_store(self) -> TargetStore:
+        return self.__store
@@ -32,8 +32,9 @@ class AirObject(BaseModel):
     def __init__(self, manager, id: int, pos: np.ndarray, trajectory: Trajectory, prev_pos: np.ndarray = None):
         super().__init__(manager, id, pos)
         self.trajectory = trajectory
-        self.velocity = trajectory.velocity / np.linalg.norm(trajectory.velocity)
-        self.speed_mod = np.linalg.norm(trajectory.velocity)
+        speed = np.linalg.norm(trajectory.velocity)
+        self.velocity = trajectory.velocity / speed if speed > 0 else np.zeros_like(trajectory.velocity)
+        self.speed_mod = speed
         self.prev_pos = prev_pos
 
     def step(self):
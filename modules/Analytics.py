@@ -0,0 +1,274 @@
+"""
+Анализ результатов боевой работы по записям моделирования (modules.Recorder).
+
+Все показатели считаются векторно по столбцам записи, без цикла по шагам и объектам:
+    - по целям: задержка обнаружения, время от обнаружения до пуска, поражение, прорыв;
+    - по ЗУР: время полета, промах (минимальное расстояние до цели за полет), попадание;
+    - по ПУ: число пусков, попаданий и загрузка (доля израсходованных ЗУР);
+    - по прогону: сводная строка для сравнения прогонов серии;
+    - по вариантам расстановки: средние показатели групп прогонов (compare_layouts).
+
+Таблицы - структурированные массивы NumPy; время - в мс, как в записи,
+отсутствующие значения (цель не обнаружена, ЗУР не подорвалась) - NaN
+"""
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .Recorder import RecordedRun, MISSILE_TYPE_CODE, STATUS_DESTROYED, STATUS_DETONATED
+
+logger = logging.getLogger(__name__)
+
+TARGET_DTYPE = np.dtype([
+    ('id', np.int64),
+    ('type', np.uint8),  # индекс в TYPE_NAMES записи
+    ('first_seen', np.float64),  # первое появление в ВО
+    ('first_detected', np.float64),  # первое обнаружение МФР
+    ('detection_latency', np.float64),  # first_detected - first_seen
+    ('first_launch', np.float64),  # первый пуск ЗУР по цели
+    ('detection_to_launch', np.float64),  # first_launch - first_detected
+    ('destroyed', np.float64),  # время поражения
+    ('missiles', np.int64),  # пущено ЗУР по цели
+    ('leaker', np.bool_),  # цель не поражена до конца записи
+])
+
+MISSILE_DTYPE = np.dtype([
+    ('id', np.int64),
+    ('launcher_id', np.int64),
+    ('target_id', np.int64),
+    ('launch', np.float64),
+    ('detonated', np.float64),
+    ('time_of_flight', np.float64),  # detonated - launch
+    ('miss_distance', np.float64),  # минимальное расстояние до цели за полет, м
+    ('hit', np.bool_),  # цель поражена при подрыве
+])
+
+LAUNCHER_DTYPE = np.dtype([
+    ('id', np.int64),
+    ('launches', np.int64),
+    ('hits', np.int64),
+    ('hit_rate', np.float64),
+    ('utilisation', np.float64),  # launches / capacity (NaN без capacities)
+])
+
+SUMMARY_DTYPE = np.dtype([
+    ('targets', np.int64),
+    ('detected', np.int64),
+    ('destroyed', np.int64),
+    ('leakers', np.int64),
+    ('leak_rate', np.float64),
+    ('launches', np.int64),
+    ('hits', np.int64),
+    ('hit_rate', np.float64),
+    ('detection_latency', np.float64),  # средние по целям и ЗУР
+    ('detection_to_launch', np.float64),
+    ('time_of_flight', np.float64),
+    ('miss_distance', np.float64),
+    ('duration', np.float64),  # длительность записи, мс
+])
+
+LAYOUT_COLUMNS = ('leak_rate', 'hit_rate', 'detection_latency', 'detection_to_launch', 'time_of_flight',
+                  'miss_distance')
+
+
+def _lookup(sorted_values: np.ndarray, keys: np.ndarray):
+    """Позиции keys в отсортированном массиве и признак, что значение найдено"""
+    pos = np.searchsorted(sorted_values, keys)
+    found = pos < len(sorted_values)
+    found[found] = sorted_values[pos[found]] == keys[found]
+    return pos, found
+
+
+def _first_times(ids: np.ndarray, times: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """Для каждого keys - минимальное время среди записей с этим id (NaN, если записей нет)"""
+    result = np.full(len(keys), np.nan)
+    order = np.lexsort((times, ids))
+    unique_ids, starts = np.unique(ids[order], return_index=True)
+    pos, found = _lookup(unique_ids, keys)
+    result[found] = times[order][starts][pos[found]]
+    return result
+
+
+def _launch_columns(run: RecordedRun) -> Dict[str, np.ndarray]:
+    launches = run.launches
+    return {name: np.fromiter((launch[name] for launch in launches), dtype=np.int64, count=len(launches))
+            for name in ('time', 'launcher_id', 'missile_id', 'target_id')}
+
+
+def target_table(run: RecordedRun) -> np.ndarray:
+    """Показатели по целям прогона (TARGET_DTYPE), по возрастанию id"""
+    records = run.records
+    targets = records[records['type'] != MISSILE_TYPE_CODE]
+    ids, starts = np.unique(targets['id'], return_index=True)
+    table = np.zeros(len(ids), dtype=TARGET_DTYPE)
+    table['id'] = ids
+    table['type'] = targets['type'][starts]
+
+    times = targets['time']
+    table['first_seen'] = _first_times(targets['id'], times, ids)
+    visible = targets['visible']
+    table['first_detected'] = _first_times(targets['id'][visible], times[visible], ids)
+    destroyed = targets['status'] == STATUS_DESTROYED
+    table['destroyed'] = _first_times(targets['id'][destroyed], times[destroyed], ids)
+
+    launches = _launch_columns(run)
+    table['first_launch'] = _first_times(launches['target_id'], launches['time'], ids)
+    launched_ids, counts = np.unique(launches['target_id'], return_counts=True)
+    pos, found = _lookup(launched_ids, ids)
+    table['missiles'][found] = counts[pos[found]]
+
+    table['detection_latency'] = table['first_detected'] - table['first_seen']
+    table['detection_to_launch'] = table['first_launch'] - table['first_detected']
+    table['leaker'] = np.isnan(table['destroyed'])
+    return table
+
+
+def missile_table(run: RecordedRun) -> np.ndarray:
+    """Показатели по пущенным ЗУР прогона (MISSILE_DTYPE), в порядке пусков"""
+    records = run.records
+    launches = _launch_columns(run)
+    table = np.zeros(len(launches['time']), dtype=MISSILE_DTYPE)
+    table['id'] = launches['missile_id']
+    table['launcher_id'] = launches['launcher_id']
+    table['target_id'] = launches['target_id']
+    table['launch'] = launches['time']
+    table['miss_distance'] = np.nan
+    if len(table) == 0:
+        table['detonated'] = np.nan
+        table['time_of_flight'] = np.nan
+        return table
+
+    missiles = records[records['type'] == MISSILE_TYPE_CODE]
+    detonated = missiles['status'] == STATUS_DETONATED
+    table['detonated'] = _first_times(missiles['id'][detonated], missiles['time'][detonated], table['id'])
+    table['time_of_flight'] = table['detonated'] - table['launch']
+
+    # Промах: записи ЗУР и ее цели на одних и тех же шагах соединяются по ключу (время, id)
+    targets = records[records['type'] != MISSILE_TYPE_CODE]
+    span = int(records['id'].max()) + 1
+    target_keys = targets['time'] * span + targets['id']
+    order = np.argsort(target_keys, kind='stable')
+    pos, matched = _lookup(target_keys[order], missiles['time'] * span + missiles['target_id'])
+    matched &= missiles['target_id'] >= 0
+    # Строка таблицы для каждой записи ЗУР (ЗУР без пуска в записи не учитываются)
+    by_id = np.argsort(table['id'], kind='stable')
+    row, launched = _lookup(table['id'][by_id], missiles['id'])
+    matched &= launched
+    distance = np.linalg.norm(missiles['pos'][matched] - targets['pos'][order[pos[matched]]], axis=1)
+    closest = np.full(len(table), np.inf)
+    np.minimum.at(closest, by_id[row[matched]], distance)
+    table['miss_distance'] = np.where(np.isfinite(closest), closest, np.nan)
+
+    # Попадание: цель поражена на шаге подрыва ЗУР
+    destroyed = targets['status'] == STATUS_DESTROYED
+    destroyed_at = _first_times(targets['id'][destroyed], targets['time'][destroyed], table['target_id'])
+    table['hit'] = table['detonated'] == destroyed_at
+    return table
+
+
+def launcher_table(missiles: np.ndarray, capacities: Optional[Dict[int, int]] = None) -> np.ndarray:
+    """
+    Показатели по ПУ (LAUNCHER_DTYPE) по таблице ЗУР
+
+    :param missiles: результат missile_table()
+    :param capacities: начальное число ЗУР на ПУ (для загрузки), например из конфига сценария
+    """
+    ids, inverse = np.unique(missiles['launcher_id'], return_inverse=True)
+    if capacities:
+        ids = np.union1d(ids, np.fromiter(capacities, dtype=np.int64, count=len(capacities)))
+        inverse = np.searchsorted(ids, missiles['launcher_id'])
+    table = np.zeros(len(ids), dtype=LAUNCHER_DTYPE)
+    table['id'] = ids
+    table['launches'] = np.bincount(inverse, minlength=len(ids))
+    table['hits'] = np.bincount(inverse, weights=missiles['hit'], minlength=len(ids)).astype(np.int64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        table['hit_rate'] = table['hits'] / table['launches']
+        capacity = np.array([capacities.get(int(i), 0) if capacities else 0 for i in ids], dtype=np.float64)
+        table['utilisation'] = np.where(capacity > 0, table['launches'] / capacity, np.nan)
+    return table
+
+
+def _nanmean(values: np.ndarray) -> float:
+    values = values[np.isfinite(values)]
+    return float(values.mean()) if len(values) else np.nan
+
+
+def run_summary(run: RecordedRun) -> np.ndarray:
+    """Сводная строка прогона (массив SUMMARY_DTYPE из одного элемента)"""
+    targets = target_table(run)
+    missiles = missile_table(run)
+    summary = np.zeros(1, dtype=SUMMARY_DTYPE)
+    summary['targets'] = len(targets)
+    summary['detected'] = np.count_nonzero(np.isfinite(targets['first_detected']))
+    summary['destroyed'] = np.count_nonzero(~targets['leaker'])
+    summary['leakers'] = np.count_nonzero(targets['leaker'])
+    summary['leak_rate'] = summary['leakers'] / len(targets) if len(targets) else np.nan
+    summary['launches'] = len(missiles)
+    summary['hits'] = np.count_nonzero(missiles['hit'])
+    summary['hit_rate'] = summary['hits'] / len(missiles) if len(missiles) else np.nan
+    summary['detection_latency'] = _nanmean(targets['detection_latency'])
+    summary['detection_to_launch'] = _nanmean(targets['detection_to_launch'])
+    summary['time_of_flight'] = _nanmean(missiles['time_of_flight'])
+    summary['miss_distance'] = _nanmean(missiles['miss_distance'])
+    times = run.times()
+    summary['duration'] = float(times[-1] - times[0]) if len(times) else 0.0
+    return summary
+
+
+def _summarize_path(path: str) -> np.ndarray:
+    with RecordedRun(path) as run:
+        return run_summary(run)
+
+
+def analyze_runs(paths: Sequence[str], processes: Optional[int] = None) -> np.ndarray:
+    """
+    Сводные строки серии прогонов (SUMMARY_DTYPE), в порядке paths
+
+    :param paths: файлы записей
+    :param processes: число процессов (None - в текущем процессе)
+    """
+    if not paths:
+        return np.empty(0, dtype=SUMMARY_DTYPE)
+    if processes and processes > 1:
+        with ProcessPoolExecutor(processes) as executor:
+            summaries = list(executor.map(_summarize_path, paths, chunksize=max(1, len(paths) // (4 * processes))))
+    else:
+        summaries = [_summarize_path(path) for path in paths]
+    return np.concatenate(summaries)
+
+
+def compare_layouts(summaries: np.ndarray, layouts: Sequence[str]) -> np.ndarray:
+    """
+    Средние показатели по вариантам расстановки МФР и ПУ
+
+    :param summaries: результат analyze_runs()
+    :param layouts: вариант расстановки каждого прогона
+    :return: структурированный массив: layout, runs и средние LAYOUT_COLUMNS (без учета NaN)
+    """
+    if len(layouts) != len(summaries):
+        raise ValueError("Число вариантов расстановки не совпадает с числом прогонов")
+    names, inverse = np.unique(np.asarray(layouts, dtype=str), return_inverse=True)
+    dtype = np.dtype([('layout', names.dtype), ('runs', np.int64)] + [(column, np.float64) for column in LAYOUT_COLUMNS])
+    table = np.zeros(len(names), dtype=dtype)
+    table['layout'] = names
+    table['runs'] = np.bincount(inverse, minlength=len(names))
+    for column in LAYOUT_COLUMNS:
+        values = summaries[column]
+        finite = np.isfinite(values)
+        total = np.bincount(inverse[finite], weights=values[finite], minlength=len(names))
+        count = np.bincount(inverse[finite], minlength=len(names))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            table[column] = total / count
+    return table
+
+
+def format_table(table: np.ndarray) -> str:
+    """Текстовая таблица для вывода в лог или консоль"""
+    names: List[str] = list(table.dtype.names)
+    rows = [[f"{value:.1f}" if isinstance(value, float) else str(value) for value in row.tolist()] for row in table]
+    widths = [max([len(name)] + [len(row[i]) for row in rows]) for i, name in enumerate(names)]
+    lines = ['  '.join(name.rjust(width) for name, width in zip(names, widths))]
+    lines.extend('  '.join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows)
+    return '\n'.join(lines)
@@ -0,0 +1,135 @@
+"""
+Асинхронный режим шины сообщений: менеджер для работы внутри цикла asyncio.
+
+Модули могут объявлять step() как корутину (async def) и ожидать внешние данные
+(воспроизводимый поток датчиков, заглушка пульта оператора) без блокировки цикла,
+а потребители сообщений (запись, внешние интерфейсы) получают сообщения шага
+из асинхронных очередей подписок по типу сообщения и получателю.
+
+Детерминированность по шагам сохраняется:
+    - входы (add_input) опрашиваются параллельно, но их сообщения добавляются
+      в порядке регистрации входов, а не в порядке завершения ввода-вывода;
+    - step() модулей (в том числе корутины) выполняются по фазам в том же порядке,
+      что и в Manager.step;
+    - сообщения шага доставляются подписчикам после всех модулей в порядке хранения,
+      а подписки с barrier=True должны обработать их (Queue.task_done) до перехода
+      к следующему шагу - это барьер шага
+"""
+import asyncio
+import inspect
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .BaseMessage import BaseMessage
+from .Manager import Manager
+from .constants import MessageType
+
+logger = logging.getLogger(__name__)
+
+Input = Callable[[int], Awaitable[Iterable[BaseMessage]]]  # сообщения внешнего входа для шага с указанным временем
+SubscriptionKey = Tuple[MessageType, Optional[int]]
+
+
+class AsyncManager(Manager):
+    """Менеджер с асинхронными подписками, входами и барьером шага (см. описание модуля)"""
+
+    def __init__(self, history_steps: Optional[int] = None, workers: Optional[int] = None):
+        super().__init__(history_steps=history_steps, workers=workers)
+        self.inputs: List[Input] = []
+        self._subscriptions: Dict[SubscriptionKey, List[asyncio.Queue]] = {}
+        self._barrier_queues: List[asyncio.Queue] = []
+
+    def __getstate__(self):
+        # Очереди и входы привязаны к циклу событий и в контрольные точки не попадают
+        state = super().__getstate__()
+        state['inputs'] = []
+        state['_subscriptions'] = {}
+        state['_barrier_queues'] = []
+        return state
+
+    def add_input(self, source: Input) -> None:
+        """
+        Регистрирует внешний вход: корутина source(step_time) вызывается в начале каждого шага
+        и возвращает сообщения, которые добавляются в шаг до step() модулей
+        """
+        self.inputs.append(source)
+
+    def subscribe(self, msg_type: MessageType, receiver_id: Optional[int] = None,
+                  barrier: bool = False, maxsize: int = 0) -> asyncio.Queue:
+        """
+        Подписка на сообщения шага
+
+        :param msg_type: тип сообщений
+        :param receiver_id: ID получателя (None - сообщения любого получателя)
+        :param barrier: шаг не завершается, пока подписчик не обработает все сообщения
+            (вызовет task_done() для каждого)
+        :param maxsize: размер очереди (0 - без ограничения); при заполнении шаг ждет подписчика
+        :return: очередь, в которую после каждого шага попадают сообщения
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self._subscriptions.setdefault((msg_type, receiver_id), []).append(queue)
+        if barrier:
+            self._barrier_queues.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """Отменяет подписку, созданную subscribe()"""
+        for queues in self._subscriptions.values():
+            if queue in queues:
+                queues.remove(queue)
+        if queue in self._barrier_queues:
+            self._barrier_queues.remove(queue)
+
+    async def wait_for(self, msg_type: MessageType, receiver_id: Optional[int] = None) -> BaseMessage:
+        """Ожидает первое сообщение указанного типа (и получателя) из следующих шагов"""
+        queue = self.subscribe(msg_type, receiver_id)
+        try:
+            return await queue.get()
+        finally:
+            self.unsubscribe(queue)
+
+    async def step_async(self) -> None:
+        """Асинхронный аналог Manager.step (см. описание модуля)"""
+        current_time = self.time.get_time()
+        logger.info("Текущее время: %s", current_time)
+
+        if self.inputs:
+            batches = await asyncio.gather(*(source(current_time) for source in self.inputs))
+            for batch in batches:
+                for msg in batch:
+                    self.add_message(msg)
+
+        for phase in self.phases():
+            self._prepare_phase(phase)
+            for module in phase:
+                result = module.step()
+                if inspect.isawaitable(result):
+                    await result
+
+        # Доставка до вытеснения истории: подписчики получают сообщения шага, пока шаг в окне
+        await self._deliver(current_time)
+        for queue in list(self._barrier_queues):
+            await queue.join()
+
+        self._finish_step(current_time)
+
+    async def _deliver(self, step_time: int) -> None:
+        if not any(self._subscriptions.values()):
+            return
+        for msg in self.give_messages(step_time):
+            keys = [(msg.type, None)] if msg.receiver_id is None else [(msg.type, msg.receiver_id), (msg.type, None)]
+            for key in keys:
+                for queue in list(self._subscriptions.get(key, ())):
+                    await queue.put(msg)
+
+    async def run_simulation_async(self, end_time: int) -> None:
+        """Асинхронный аналог Manager.run_simulation"""
+        while self.time.get_time() < end_time:
+            await self.step_async()
+
+    def step(self) -> None:
+        """Синхронный шаг возможен, только если нет модулей-корутин, входов и подписок"""
+        if (self.inputs or any(self._subscriptions.values())
+                or any(inspect.iscoroutinefunction(module.step) for module in self.modules)):
+            raise ValueError("Менеджер с входами и подписками выполняется через step_async()")
+        super().step()
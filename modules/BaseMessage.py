@@ -8,16 +8,21 @@ class BaseMessage(metaclass=ABCMeta):
     :param type: тип сообщения
     :param sender_ID: ID модуля отправителя
     :param receiver_ID: ID модуля получателя
+
+    Сообщения создаются миллионами за прогон, поэтому поля хранятся в __slots__
+    (без словаря экземпляра); наследники тоже объявляют __slots__
     """
+    __slots__ = ('relevance', 'send_time', 'type', 'sender_id', 'receiver_id')
+
     def __init__(self, type: MessageType, sender_id: int, receiver_id: int = None, send_time: int = None, relevance: int = 1) -> None:
         self.relevance = relevance
         self.send_time = send_time
         self.type = type
         self.sender_id = sender_id
         self.receiver_id = receiver_id
-    
+
     def __repr__(self) -> str:
         """
         Возвращает строковое представление сообщения для отладки
         """
-        return f"{self.__class__.__name__}: send_time={self.send_time}, type={self.type}, sender_id={self.sender_id}, receiver_id={self.receiver_id}, relevance={self.relevance}"
\ No newline at end of file
+        return f"{self.__class__.__name__}: send_time={self.send_time}, type={self.type}, sender_id={self.sender_id}, receiver_id={self.receiver_id}, relevance={self.relevance}"
@@ -0,0 +1,149 @@
+"""
+Ветвление моделирования "что если": текущее состояние менеджера разветвляется
+на несколько вариантов, в каждом из которых перед продолжением изменяется команда
+или параметр. Общая часть прогона уже посчитана и не повторяется.
+
+Каждая ветка - дочерний процесс os.fork(): состояние не копируется, а разделяется
+с родителем средствами ОС (копирование при записи), ветки идут параллельно, итог
+ветки возвращается родителю через канал в виде pickle. Состояние родителя не меняется.
+Без os.fork (Windows) ветки выполняются последовательно на копиях из modules.Checkpoint
+"""
+import logging
+import os
+import pickle
+import traceback
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+import numpy as np
+
+from .AirEnv import AirEnv
+from .Checkpoint import dump_state, load_state
+from .Manager import Manager
+from .Messages import CPPLaunchMissileRequestMessage
+from .MissileLauncher import MissileLauncher
+from .constants import CCP_ID
+
+logger = logging.getLogger(__name__)
+
+Branch = Callable[[Manager], None]  # изменение состояния в начале ветки
+Outcome = Callable[[Manager], Any]  # итог ветки после моделирования (должен сериализоваться pickle)
+
+
+class BranchResult(NamedTuple):
+    """Итог ветки: результат outcome или текст ошибки"""
+    name: str
+    outcome: Any
+    error: Optional[str] = None
+
+
+def summarize(manager: Manager) -> Dict[str, Any]:
+    """Итог ветки по умолчанию: время, оставшиеся цели и ракеты на ПУ"""
+    summary: Dict[str, Any] = {'time': manager.time.get_time(), 'targets_left': None, 'missiles_left': {}}
+    for module in manager.modules:
+        if isinstance(module, AirEnv):
+            summary['targets_left'] = len(module.target_store.active_rows())
+        elif isinstance(module, MissileLauncher):
+            summary['missiles_left'][module.id] = module.get_missile_count()
+    return summary
+
+
+def launch_order(launcher_id: int, target_id: int, radar_id: Optional[int] = None) -> Branch:
+    """
+    Изменение для ветки: команда ПБУ на пуск ЗУР с ПУ launcher_id по цели target_id
+    (выполняется на следующем шаге, как и команды ПБУ)
+    """
+    def apply(manager: Manager) -> None:
+        air_env = next((module for module in manager.modules if isinstance(module, AirEnv)), None)
+        row = air_env.target_store.row_of(target_id) if air_env is not None else None
+        if row is None:
+            raise ValueError(f"Цель с ID {target_id} не найдена в ВО")
+        target = air_env.target_store.view(row)
+        manager.add_message(CPPLaunchMissileRequestMessage(
+            sender_id=CCP_ID,
+            receiver_id=launcher_id,
+            target=target,
+            target_position=target.pos.copy(),
+            radar_id=radar_id,
+        ))
+    return apply
+
+
+def run_branches(manager: Manager, branches: Dict[str, Branch], end_time: int,
+                 outcome: Outcome = summarize, max_workers: Optional[int] = None) -> Dict[str, BranchResult]:
+    """
+    Продолжает моделирование до end_time в нескольких вариантах
+
+    :param manager: менеджер на текущем шаге (не изменяется)
+    :param branches: изменения по именам веток
+    :param end_time: время завершения моделирования веток
+    :param outcome: итог ветки, вычисляется в ветке после моделирования
+    :param max_workers: сколько веток выполнять одновременно (по умолчанию - число процессоров)
+    :return: итоги по именам веток
+    """
+    if not hasattr(os, 'fork'):
+        return _run_sequential(manager, branches, end_time, outcome)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    results: Dict[str, BranchResult] = {}
+    names = list(branches)
+    for start in range(0, len(names), max_workers):
+        running = [(name, *_fork_branch(manager, branches[name], end_time, outcome))
+                   for name in names[start:start + max_workers]]
+        for name, pid, read_fd in running:
+            with os.fdopen(read_fd, 'rb') as pipe:
+                payload = pipe.read()
+            _, status = os.waitpid(pid, 0)
+            if not payload:
+                results[name] = BranchResult(name, None, f"Процесс ветки завершился без результата (статус {status})")
+                continue
+            ok, value = pickle.loads(payload)
+            results[name] = BranchResult(name, value, None) if ok else BranchResult(name, None, value)
+            if not ok:
+                logger.error("Ошибка в ветке %s:\n%s", name, value)
+    return results
+
+
+def _fork_branch(manager: Manager, branch: Branch, end_time: int, outcome: Outcome):
+    """Запускает ветку в дочернем процессе; возвращает pid и дескриптор канала с итогом"""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid:
+        os.close(write_fd)
+        return pid, read_fd
+
+    # Дочерний процесс: transient-модули и журнал (открытые файлы записи) принадлежат родителю
+    os.close(read_fd)
+    try:
+        manager.modules = [module for module in manager.modules if not getattr(module, 'transient', False)]
+        manager.event_log = None
+        branch(manager)
+        manager.run_simulation(end_time)
+        payload = pickle.dumps((True, outcome(manager)), protocol=pickle.HIGHEST_PROTOCOL)
+    except BaseException:  # noqa: BLE001 - ошибка передается родителю
+        payload = pickle.dumps((False, traceback.format_exc()))
+    try:
+        with os.fdopen(write_fd, 'wb') as pipe:
+            pipe.write(payload)
+    finally:
+        os._exit(0)
+
+
+def _run_sequential(manager: Manager, branches: Dict[str, Branch], end_time: int,
+                    outcome: Outcome) -> Dict[str, BranchResult]:
+    """Ветки на копиях состояния в текущем процессе"""
+    state = dump_state(manager)
+    rng_state = np.random.get_state()
+    results: Dict[str, BranchResult] = {}
+    try:
+        for name, branch in branches.items():
+            copy = load_state(state)
+            try:
+                branch(copy)
+                copy.run_simulation(end_time)
+                results[name] = BranchResult(name, outcome(copy), None)
+            except Exception:  # noqa: BLE001 - ошибка одной ветки не прерывает остальные
+                logger.exception("Ошибка в ветке %s", name)
+                results[name] = BranchResult(name, None, traceback.format_exc())
+    finally:
+        np.random.set_state(rng_state)
+    return results
@@ -3,6 +3,8 @@ from modules.Messages import *
 from modules.Missile import Missile
 from modules.constants import *
 from modules.utils import to_seconds
+from modules.TargetStore import object_rows
+from modules.Tracks import TrackCache, TARGET_TRACK, MISSILE_TRACK
 import logging
 
 OLD_TARGET = "старая цель"
@@ -15,27 +17,31 @@ logger = logging.getLogger(__name__)
 class TargetCCP:
     """ Класс для хранения основных параметров сопровождаемых целей	"""
 
-    def __init__(self, target: Target, time: int, following) -> None:
+    def __init__(self, target: Target, time: int, following, pos: np.ndarray = None) -> None:
         """
         :param target: цель
         :param time: время, в которое произошло посл изменение класса
+        :param pos: измеренные МФР координаты цели (по умолчанию - координаты объекта)
         """
         # self.target = copy.deepcopy(target)
         self.target = target
         self.upd_time = time
         self.following = following
+        self.pos = target.pos if pos is None else pos
         self.missile_id = None
 
-    def upd_target_ccp(self, target: Target, time: int, upd_follow) -> None:
+    def upd_target_ccp(self, target: Target, time: int, upd_follow, pos: np.ndarray = None) -> None:
         """
         Функция для обновления координаты цели
         :param target: updated target
         :param time: время, когда вызвали функцию
+        :param pos: измеренные МФР координаты цели (по умолчанию - координаты объекта)
         """
         # self.target = copy.deepcopy(target)
         self.target = target
         self.upd_time = time
         self.following = upd_follow
+        self.pos = target.pos if pos is None else pos
 
     def upd_missile_id(self, missile_id: int) -> None:
         self.missile_id = missile_id
@@ -84,20 +90,24 @@ class CombatControlPoint(BaseModel):
         self.missile_launcher_launched = {}
         self.missile_launcher_capacity = {}
         self.initialized = False
+        self.tracks = TrackCache()  # завязка трасс и фильтры Калмана для наведения
+        self._retargets = []  # перенацеливания ЗУР шага, отправляются после обновления фильтров
 
     def add_target(self, target_ccp: TargetCCP):
         """
         Добавление новой цели в список целей ПБУ
         """
         self._target_dict[target_ccp.target.id] = target_ccp
-        logger.info(f"В ПБУ добавлена цель с id: {target_ccp.target.id}")
+        self.tracks.touch(TARGET_TRACK, target_ccp.target.id)
+        self.tracks.start(TARGET_TRACK, target_ccp.target.id, target_ccp.pos)
+        logger.info("В ПБУ добавлена цель с id: %s", target_ccp.target.id)
 
     def delete_target(self, target_id):
         """
         :param target_id: id цели
         """
         self._target_dict.pop(target_id, None)
-        logger.info(f"В ПБУ удалена цель с id: {target_id}")
+        logger.info("В ПБУ удалена цель с id: %s", target_id)
 
     def add_missile(self, missile_ccp: MissileCCP):
         """
@@ -105,7 +115,7 @@ class CombatControlPoint(BaseModel):
         """
         self._missile_dict[missile_ccp.missile.id] = missile_ccp
         self._target_dict[missile_ccp.missile.target.id].upd_missile_id(missile_ccp.missile.id)
-        logger.info(f"В ПБУ добавлена ракета с id: {missile_ccp.missile.id}")
+        logger.info("В ПБУ добавлена ракета с id: %s", missile_ccp.missile.id)
 
     def delete_missile(self, missile_id: int, self_detonation: bool):
         """
@@ -114,10 +124,10 @@ class CombatControlPoint(BaseModel):
         """
         if not self_detonation:
             target_id = self._missile_dict[missile_id].missile.target.id
-            logger.info(f"ЗУР с id: {missile_id}, сбил цель с id {target_id}")
+            logger.info("ЗУР с id: %s, сбил цель с id %s", missile_id, target_id)
             self.delete_target(target_id)
         self._missile_dict.pop(missile_id, None)
-        logger.info(f"В ПБУ удалена ракета с id: {missile_id}")
+        logger.info("В ПБУ удалена ракета с id: %s", missile_id)
 
     def send_request_msg_to_ml_capacity(self):
         """
@@ -134,26 +144,26 @@ class CombatControlPoint(BaseModel):
             )
 
             self._manager.add_message(req_count_msg)  # ПБУ запрашивает у ПУ количество ЗУР
-            logger.info(f"ПБУ запрашивает у ПУ с id {key} количество ЗУР")
+            logger.info("ПБУ запрашивает у ПУ с id %s количество ЗУР", key)
 
     def get_current_missile_launcher_capacity(self):
         """
         ПБУ получает от ПУ сообщения о кол-ве ЗУР
         """
-        msg_missile_capacity = self._manager.give_messages_by_type(MessageType.MISSILE_COUNT_RESPONSE)
+        msg_missile_capacity = self._manager.give_messages_by_type(MessageType.MISSILE_COUNT_RESPONSE, self.id)
         if len(msg_missile_capacity) > 0:
             for msg in msg_missile_capacity:
                 self.missile_launcher_capacity[msg.sender_id] = msg.count
-                logger.info(f"ПБУ получил от ПУ {msg.sender_id} сообщение о том, что у него в наличии {msg.count} ЗУР")
+                logger.info("ПБУ получил от ПУ %s сообщение о том, что у него в наличии %s ЗУР", msg.sender_id, msg.count)
 
     def check_if_missile_get_hit(self):
         """
         ПБУ получает сообщения от МФР об уничтожении ЗУР
         """
-        msg_hit_missiles = self._manager.give_messages_by_type(MessageType.DESTROYED_MISSILE)
+        msg_hit_missiles = self._manager.give_messages_by_type(MessageType.DESTROYED_MISSILE, self.id)
 
         if len(msg_hit_missiles) != 0:
-            logger.info(f"ПБУ получил {len(msg_hit_missiles)} сообщений от МФР об уничтожении ЗУР")
+            logger.info("ПБУ получил %d сообщений от МФР об уничтожении ЗУР", len(msg_hit_missiles))
             for msg in msg_hit_missiles:
                 if msg.missile_id in self._missile_dict:
                     self.delete_missile(msg.missile_id, msg.self_detonation)
@@ -162,65 +172,41 @@ class CombatControlPoint(BaseModel):
         """
         ПБУ получает от ПУ сообщения о запуске ЗУР
         """
-        msg_launched_missiles = self._manager.give_messages_by_type(MessageType.LAUNCHED_MISSILE)
+        msg_launched_missiles = self._manager.give_messages_by_type(MessageType.LAUNCHED_MISSILE, self.id)
         if len(msg_launched_missiles) > 0:
             for msg in msg_launched_missiles:
-                logger.info(f"ПБУ получил от ПУ запуске ЗУР c id:{msg.missile.id}")
+                logger.info("ПБУ получил от ПУ запуске ЗУР c id:%s", msg.missile.id)
                 self.add_missile(MissileCCP(msg.missile, to_seconds(self._manager.time.get_time())))
 
-    def link_object(self, detected_object):
+    def link_object(self, detected_object, detected_pos=None):
         """
         ПБУ соотносит объекты
-        """
-
-        def calc_range(detected_obj, obj_to_link_pos, obj_to_link_upd_time):
-            """ Метода расчета min/max расстояния до возможного объекта"""
-
-            velocity = detected_obj.speed_mod
-            cur_time = to_seconds(self._manager.time.get_time())
-            sim_step = to_seconds(self._manager.time.get_dt())
-            coord_diff = np.linalg.norm(obj_to_link_pos - detected_obj.pos)
-            d_t = cur_time - obj_to_link_upd_time
-
-            return max(0, velocity * (d_t - POSSIBLE_TARGET_RADIUS * sim_step)), max(0, velocity * (
-                    d_t + POSSIBLE_TARGET_RADIUS * sim_step)), coord_diff
-
-        curr_diff = float('inf')
-        matched_object_id = None
-        classification = NEW_TARGET
-
-        # Проверка на старую цель
-        for target_id, target_ccp in self._target_dict.items():
-            if target_ccp.upd_time == to_seconds(self._manager.time.get_time()):
-                continue
 
-            min_range, max_range, pos_diff = calc_range(detected_object, target_ccp.target.prev_pos,
-                                                        target_ccp.upd_time)
-
-            if pos_diff < curr_diff and min_range <= pos_diff <= max_range:
-                curr_diff = pos_diff
-                classification = OLD_TARGET
-                matched_object_id = target_id
-
-        # Проверка на старую ЗУР
-        for missile_id, missile_ccp in self._missile_dict.items():
-            if missile_ccp.upd_time == to_seconds(self._manager.time.get_time()):
-                continue
-
-            obj_prev_pos = missile_ccp.missile.prev_pos
-            if obj_prev_pos is None:
-                obj_prev_pos = missile_ccp.missile.pos
-            min_range, max_range, pos_diff = calc_range(detected_object, obj_prev_pos, missile_ccp.upd_time)
-
-            if pos_diff < curr_diff and min_range <= pos_diff <= max_range:
-                curr_diff = pos_diff
-                classification = OLD_ROCKET
-                matched_object_id = missile_id
+        :param detected_object: обнаруженный объект
+        :param detected_pos: измеренные МФР координаты (по умолчанию - координаты объекта)
+        """
+        if detected_pos is None:
+            detected_pos = detected_object.pos
+
+        # Прогноз трасс считается один раз за шаг (в step) и общий для всех обнаружений шага
+        cur_time = to_seconds(self._manager.time.get_time())
+        if self.tracks.time != cur_time:
+            self.tracks.advance(cur_time, self._target_dict, self._missile_dict)
+        kind, matched_object_id = self.tracks.associate(detected_pos, detected_object.speed_mod,
+                                                        to_seconds(self._manager.time.get_dt()))
+        if kind == TARGET_TRACK:
+            classification = OLD_TARGET
+        elif kind == MISSILE_TRACK:
+            classification = OLD_ROCKET
+        else:
+            classification = NEW_TARGET
         return classification, matched_object_id
 
-    def send_update_msg_to_radar(self, target, missile_id, radar_id):
+    def send_update_msg_to_radar(self, target, missile_id, radar_id, estimate=None):
         """
         ПБУ отправляет сообщение на обновление координат цели
+
+        :param estimate: оценка трассы цели фильтром (Tracks.TrackState) или None
         """
 
         msg2radar = CPPUpdateTargetRadarMessage(
@@ -228,11 +214,20 @@ class CombatControlPoint(BaseModel):
             sender_id=self.id,
             receiver_id=radar_id,
             target=target,
-            missile_id=missile_id
+            missile_id=missile_id,
+            estimate=estimate
         )
         self._manager.add_message(msg2radar)
-        logger.info(
-            f"ПБУ сообщает МФР {radar_id}, что у ЗУР с id:{missile_id}, новые координаты ее цели:{target.pos()}")
+        logger.info("ПБУ сообщает МФР %s, что у ЗУР с id:%s, новые координаты ее цели:%s",
+                    radar_id, missile_id, target.pos if estimate is None else estimate.pos)
+
+    def send_retargets(self):
+        """
+        ПБУ перенаправляет ЗУР по оценкам трасс целей после обновления фильтров шага
+        """
+        for target, track_id, missile_id, radar_id in self._retargets:
+            self.send_update_msg_to_radar(target, missile_id, radar_id, self.tracks.state(TARGET_TRACK, track_id))
+        self._retargets.clear()
 
     def send_objects_to_GUI(self, all, visible):
         """
@@ -251,7 +246,7 @@ class CombatControlPoint(BaseModel):
                     is_visible_by_radar = True
                 )
                 self._manager.add_message(msg2drawer)
-                logger.info(f"ПБУ отправил {'ЗУР', obj_id} на отрисовку GUI")
+                logger.info("ПБУ отправил %s на отрисовку GUI", ('ЗУР', obj_id))
 
         for key, target in self._target_dict.items():
             obj_id = self._target_dict[key].target.id
@@ -267,7 +262,7 @@ class CombatControlPoint(BaseModel):
                     is_visible_by_radar=True
                 )
                 self._manager.add_message(msg2drawer)
-                logger.info(f"ПБУ отправил {obj_type, obj_id} на отрисовку GUI")
+                logger.info("ПБУ отправил %s на отрисовку GUI", (obj_type, obj_id))
 
         for (id, type, coord) in all:
             if id not in visible:
@@ -281,20 +276,24 @@ class CombatControlPoint(BaseModel):
                     is_visible_by_radar = False
                 )
                 self._manager.add_message(msg2drawer)
-                logger.info(f"ПБУ отправил {type, id} на отрисовку GUI")
+                logger.info("ПБУ отправил %s на отрисовку GUI", (type, id))
 
 
-    def try_to_launch_missile(self, obj, radar_id):
+    def try_to_launch_missile(self, obj, radar_id, pos=None):
         """
         Проверка есть ли ЗУР для цели, и запуск, если есть
+
+        :param pos: измеренные МФР координаты цели (по умолчанию - координаты объекта)
         """
+        if pos is None:
+            pos = obj.pos
         min_dist = float('inf')
         curr_ml_id = None
         # ищем ближайший ПУ со свободными ЗУР
         for ml_id in self.missile_launcher_coords.keys():
             if self.missile_launcher_launched[ml_id] < self.missile_launcher_capacity[ml_id]:
                 sd_pos = self.missile_launcher_coords[ml_id]
-                dist = (np.sum((sd_pos - obj.pos) ** 2)) ** 0.5
+                dist = (np.sum((sd_pos - pos) ** 2)) ** 0.5
                 if dist < min_dist:
                     curr_ml_id = ml_id
                     min_dist = dist
@@ -308,61 +307,58 @@ class CombatControlPoint(BaseModel):
                 sender_id=self.id,
                 receiver_id=curr_ml_id,
                 target=obj,
-                target_position=obj.pos,
+                target_position=pos,
                 radar_id=radar_id
             )
             self._manager.add_message(launch_msg)
-            logger.info(
-                f"ПБУ отправляет сообщение ПУ с id {curr_ml_id} на запуск ЗУР по цели с координатами:{obj.pos}")
+            logger.info("ПБУ отправляет сообщение ПУ с id %s на запуск ЗУР по цели с координатами:%s",
+                        curr_ml_id, pos)
             return True
         else:
-            logger.info(f"У ПУ для неё нет свободных ЗУР")
+            logger.info("У ПУ для неё нет свободных ЗУР")
             return False
 
-    def new_target(self, obj, radar_id):
+    def new_target(self, obj, radar_id, pos=None):
         """
         Обработка случая, когда видимый объект является новой целью
         """
         logger.info("ПБУ определил этот объект как новую цель")
-        if self.try_to_launch_missile(obj, radar_id):
-            self.add_target(TargetCCP(obj, to_seconds(self._manager.time.get_time()), True))
+        if self.try_to_launch_missile(obj, radar_id, pos):
+            self.add_target(TargetCCP(obj, to_seconds(self._manager.time.get_time()), True, pos))
         else:
-            self.add_target(TargetCCP(obj, to_seconds(self._manager.time.get_time()), False))
+            self.add_target(TargetCCP(obj, to_seconds(self._manager.time.get_time()), False, pos))
 
-    def old_target(self, obj, old_obj_id, radar_id):
+    def old_target(self, obj, old_obj_id, radar_id, pos=None):
         """
         Обработка случая, когда видимый объект является старой целью
         """
         logger.info("ПБУ определил этот объект как старую цель")
         is_following = self._target_dict[old_obj_id].following
+        self.tracks.touch(TARGET_TRACK, old_obj_id)
+        self.tracks.measure(TARGET_TRACK, old_obj_id, pos if pos is not None else obj.pos)
 
         if not is_following:
             logger.info("Цель не преследуется ЗУР, пробуем запустить ЗУР по ней")
-            if self.try_to_launch_missile(obj, radar_id):
-                self._target_dict[old_obj_id].upd_target_ccp(obj, to_seconds(self._manager.time.get_time()), True)
+            if self.try_to_launch_missile(obj, radar_id, pos):
+                self._target_dict[old_obj_id].upd_target_ccp(obj, to_seconds(self._manager.time.get_time()), True, pos)
             else:
-                self._target_dict[old_obj_id].upd_target_ccp(obj, to_seconds(self._manager.time.get_time()), False)
+                self._target_dict[old_obj_id].upd_target_ccp(obj, to_seconds(self._manager.time.get_time()), False, pos)
 
         else:
             logger.info("Цель уже преследуется ЗУР, обновляем её и перенаправляем ЗУР")
-            self._target_dict[old_obj_id].upd_target_ccp(obj, to_seconds(self._manager.time.get_time()), is_following)
+            self._target_dict[old_obj_id].upd_target_ccp(obj, to_seconds(self._manager.time.get_time()), is_following,
+                                                         pos)
             curr_missile_id = self._target_dict[old_obj_id].missile_id
-            msg2radar = CPPUpdateTargetRadarMessage(
-                time=self._manager.time.get_time(),
-                sender_id=self.id,
-                receiver_id=radar_id,
-                target=obj,
-                missile_id=curr_missile_id,
-            )
-            self._manager.add_message(msg2radar)
-            logger.info(
-                f"ПБУ сообщает МФР {radar_id}, что у ЗУР с id:{curr_missile_id}, новые координаты ее цели:{obj.pos}")
+            # ЗУР наводится по оценке фильтра, а не по зашумленному измерению (см. send_retargets)
+            self._retargets.append((obj, old_obj_id, curr_missile_id, radar_id))
 
-    def old_rocket(self, obj, old_obj_id):
+    def old_rocket(self, obj, old_obj_id, pos=None):
         """
         Обработка случая, когда видимый объект является старой ЗУР
         """
-        logger.info(f"ПБУ определил этот объект как старую ЗУР с id:{self._missile_dict[old_obj_id].missile.id}")
+        logger.info("ПБУ определил этот объект как старую ЗУР с id:%s", old_obj_id)
+        self.tracks.touch(MISSILE_TRACK, old_obj_id)
+        self.tracks.measure(MISSILE_TRACK, old_obj_id, pos if pos is not None else obj.pos)
         self._missile_dict[old_obj_id].upd_missile_ccp(obj, to_seconds(self._manager.time.get_time()))
 
     def step(self) -> None:
@@ -386,46 +382,47 @@ class CombatControlPoint(BaseModel):
         self.get_current_missile_launcher_capacity()
         self.check_if_missile_get_hit()
         self.check_if_missiles_launched()
+        self.tracks.advance(to_seconds(self._manager.time.get_time()), self._target_dict, self._missile_dict)
 
         to_visualize = []
-        to_visual_proc_id = []
-        msg_from_radar_all = self._manager.give_messages_by_type(MessageType.ALL_OBJECTS)
-        logger.info(f"ПБУ получил сообщения о всех объектах от {len(msg_from_radar_all)} радаров/радара")
+        to_visual_proc_id = set()
+        msg_from_radar_all = self._manager.give_messages_by_type(MessageType.ALL_OBJECTS, self.id)
+        logger.info("ПБУ получил сообщения о всех объектах от %d радаров/радара", len(msg_from_radar_all))
         if len(msg_from_radar_all) != 0:
             for msg in msg_from_radar_all:
-                objects = msg.objects
-                for obj in objects:
-                    if obj.id not in to_visual_proc_id:
-                        if isinstance(obj, Target):
-                            type = obj.type
-                        else:
-                            type = 'ЗУР'
-                        to_visualize.append([obj.id, type, obj.pos])
-                        to_visual_proc_id.append(obj.id)
+                # id, тип и координаты без создания объектов целей из хранилища ВО
+                for obj_id, type, pos in object_rows(msg.objects):
+                    if obj_id not in to_visual_proc_id:
+                        to_visualize.append([obj_id, type, pos])
+                        to_visual_proc_id.add(obj_id)
         # print("CCP check", len(to_visualize), to_visualize)
 
 
 
-        msg_from_radar = self._manager.give_messages_by_type(MessageType.FOUND_OBJECTS)
-        logger.info(f"ПБУ получил сообщения от {len(msg_from_radar)} радаров/радара")
+        msg_from_radar = self._manager.give_messages_by_type(MessageType.FOUND_OBJECTS, self.id)
+        logger.info("ПБУ получил сообщения от %d радаров/радара", len(msg_from_radar))
 
         processed_objects = []
         if len(msg_from_radar) != 0:
             for msg in msg_from_radar:
                 radar_id = msg.sender_id
 
-                objects = msg.visible_objects
-                for obj in objects:
+                # Решения принимаются по измеренным МФР координатам, объекты ВО хранятся как есть
+                for obj, pos in msg.measurements():
                     if obj.id not in processed_objects:
                         processed_objects.append(obj.id)
-                        logger.info(f"ПБУ получил {obj} от МФР с id {msg.sender_id}")
+                        logger.info("ПБУ получил %s от МФР с id %s", obj, msg.sender_id)
                         # Завязываем трассу (определяем что это за объект)
-                        obj_type, old_obj_id = self.link_object(obj)
+                        obj_type, old_obj_id = self.link_object(obj, pos)
                         if obj_type == NEW_TARGET:
-                            self.new_target(obj, radar_id)
+                            self.new_target(obj, radar_id, pos)
                         elif obj_type == OLD_TARGET:
-                            self.old_target(obj, old_obj_id, radar_id)
+                            self.old_target(obj, old_obj_id, radar_id, pos)
                         elif obj_type == OLD_ROCKET:
-                            self.old_rocket(obj, old_obj_id)
+                            self.old_rocket(obj, old_obj_id, pos)
+
+        # Измерения шага применяются к фильтрам одним пакетным обновлением
+        self.tracks.update()
+        self.send_retargets()
 
         self.send_objects_to_GUI(to_visualize, processed_objects)
@@ -0,0 +1,128 @@
+"""
+Контрольные точки моделирования: полное состояние менеджера (таймер, модули,
+ЗУР в полете, трассы ПБУ, положение лучей МФР, сохраненные сообщения) вместе
+с состоянием генератора случайных чисел NumPy. Формат - заголовок с версией
+и сжатый pickle, поэтому продолжение с контрольной точки дает те же результаты
+бит в бит, что и непрерывный прогон. Каждая загрузка создает независимую копию
+состояния - от одной точки можно запускать несколько вариантов ("что если").
+
+Модули с атрибутом transient = True (например, modules.Recorder с открытыми файлами)
+не являются состоянием моделирования и в контрольную точку не попадают
+"""
+import logging
+import os
+import pickle
+import struct
+import tempfile
+import zlib
+from typing import Optional
+
+import numpy as np
+
+from .Manager import Manager
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_MAGIC = b'ZRKCKPT\0'
+CHECKPOINT_VERSION = 1
+HEADER = struct.Struct('<8sI')  # сигнатура, версия формата
+COMPRESS_LEVEL = 6
+
+
+def checkpoint_path(directory: str, time: int) -> str:
+    """Имя файла контрольной точки для времени моделирования time"""
+    return os.path.join(directory, f"checkpoint_{time:010d}.ckpt")
+
+
+def dump_state(manager: Manager) -> bytes:
+    """Состояние моделирования (без transient-модулей) и генератора случайных чисел в виде байтов"""
+    modules = manager.modules
+    manager.modules = [module for module in modules if not getattr(module, 'transient', False)]
+    try:
+        return pickle.dumps({'manager': manager, 'rng': np.random.get_state()},
+                            protocol=pickle.HIGHEST_PROTOCOL)
+    finally:
+        manager.modules = modules
+
+
+def load_state(payload: bytes) -> Manager:
+    """Обратное к dump_state: новый менеджер, генератор случайных чисел - на момент сохранения"""
+    state = pickle.loads(payload)
+    np.random.set_state(state['rng'])
+    return state['manager']
+
+
+def save_checkpoint(manager: Manager, path: str) -> None:
+    """
+    Атомарно сохраняет состояние моделирования между шагами
+
+    :param manager: менеджер моделирования
+    :param path: путь к файлу контрольной точки
+    """
+    payload = dump_state(manager)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION))
+            file.write(zlib.compress(payload, COMPRESS_LEVEL))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    logger.info("Контрольная точка t=%s сохранена в %s", manager.time.get_time(), path)
+
+
+def load_checkpoint(path: str) -> Manager:
+    """
+    Восстанавливает моделирование из контрольной точки.
+    Состояние генератора случайных чисел NumPy устанавливается на момент сохранения
+
+    :return: новый независимый менеджер
+    :raises ValueError: если файл не является контрольной точкой или другой версии формата
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    if len(data) < HEADER.size:
+        raise ValueError(f"Файл {path} не является контрольной точкой")
+    magic, version = HEADER.unpack_from(data)
+    if magic != CHECKPOINT_MAGIC:
+        raise ValueError(f"Файл {path} не является контрольной точкой")
+    if version != CHECKPOINT_VERSION:
+        raise ValueError(f"Неподдерживаемая версия контрольной точки: {version}")
+
+    manager = load_state(zlib.decompress(data[HEADER.size:]))
+    logger.info("Моделирование восстановлено из %s, t=%s", path, manager.time.get_time())
+    return manager
+
+
+class Checkpointer:
+    """Запуск моделирования с сохранением контрольной точки каждые every_steps шагов"""
+
+    def __init__(self, manager: Manager, directory: str, every_steps: int) -> None:
+        """
+        :param manager: менеджер моделирования
+        :param directory: каталог контрольных точек (см. checkpoint_path)
+        :param every_steps: период сохранения в шагах
+        """
+        if every_steps <= 0:
+            raise ValueError("Период контрольных точек должен быть положительным")
+        self.manager = manager
+        self.directory = directory
+        self.every_steps = every_steps
+        self.last_path: Optional[str] = None
+        self._steps = 0
+
+    def step(self) -> None:
+        """Шаг моделирования; контрольная точка пишется после шага, когда состояние согласовано"""
+        self.manager.step()
+        self._steps += 1
+        if self._steps % self.every_steps == 0:
+            self.last_path = checkpoint_path(self.directory, self.manager.time.get_time())
+            save_checkpoint(self.manager, self.last_path)
+
+    def run_simulation(self, end_time: int) -> None:
+        """Аналог Manager.run_simulation с контрольными точками"""
+        while self.manager.time.get_time() < end_time:
+            self.step()
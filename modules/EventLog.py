@@ -0,0 +1,311 @@
+"""
+Двоичный журнал сообщений менеджера (Manager.event_log).
+
+Журнал дописывается блоками: заголовок блока, массив заголовков событий
+(тип, шаг, отправитель, получатель, важность) в виде структурированных записей
+EVENT_DTYPE и упакованные поля сообщений. Поля извлекаются на шаге моделирования
+(объекты ВО заменяются их id и координатами), а упаковка, сжатие и запись
+выполняются фоновым потоком, поэтому журнал не замедляет моделирование
+в разы, как текстовая трассировка логгером.
+
+Формат файла:
+    FILE_HEADER (сигнатура, версия, флаг сжатия, длина таблицы типов),
+    таблица типов сообщений (JSON: значения MessageType по кодам),
+    блоки: BLOCK_HEADER (число событий, размер заголовков, размер полей)
+           + заголовки событий + поля (pickle списка кортежей), каждая часть сжата zlib при compress
+"""
+import json
+import logging
+import os
+import pickle
+import queue
+import struct
+import threading
+import zlib
+from enum import Enum
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .BaseMessage import BaseMessage
+from .TargetStore import ActiveObjects
+from .constants import MessageType
+
+logger = logging.getLogger(__name__)
+
+EVENT_LOG_MAGIC = b'ZRKEVLOG'
+EVENT_LOG_VERSION = 1
+FILE_HEADER = struct.Struct('<8sIBI')  # сигнатура, версия формата, сжатие, длина таблицы типов
+BLOCK_HEADER = struct.Struct('<III')  # событий, байт заголовков, байт полей (после сжатия)
+COMPRESS_LEVEL = 1  # журнал пишется на ходу: скорость важнее степени сжатия
+
+NO_RECEIVER = -1
+
+# Один заголовок - одно сообщение; type - индекс в таблице типов файла
+EVENT_DTYPE = np.dtype([
+    ('type', np.uint8),
+    ('step', np.int64),  # время шага, мс
+    ('sender', np.int64),
+    ('receiver', np.int64),  # NO_RECEIVER - без получателя
+    ('relevance', np.int16),
+])
+
+MESSAGE_TYPES = list(MessageType)
+TYPE_CODES = {msg_type: code for code, msg_type in enumerate(MESSAGE_TYPES)}
+
+
+class LoggedObject(NamedTuple):
+    """Объект ВО в поле сообщения: id и координаты на момент шага"""
+    id: int
+    pos: np.ndarray
+
+
+class LoggedObjects(NamedTuple):
+    """Список объектов ВО в поле сообщения"""
+    ids: np.ndarray
+    positions: np.ndarray
+
+
+class LoggedMessage:
+    """
+    Сообщение из журнала: поля заголовка как у BaseMessage,
+    поля конкретного сообщения доступны как атрибуты (см. fields)
+    """
+
+    __slots__ = ('type', 'send_time', 'sender_id', 'receiver_id', 'relevance', 'fields')
+
+    def __init__(self, type: MessageType, send_time: int, sender_id: int, receiver_id: Optional[int],
+                 relevance: int, fields: Dict[str, Any]) -> None:
+        self.type = type
+        self.send_time = send_time
+        self.sender_id = sender_id
+        self.receiver_id = receiver_id
+        self.relevance = relevance
+        self.fields = fields
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self.fields[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __repr__(self) -> str:
+        return (f"LoggedMessage: send_time={self.send_time}, type={self.type}, sender_id={self.sender_id}, "
+                f"receiver_id={self.receiver_id}, fields={sorted(self.fields)}")
+
+
+def _field_names(cls: type) -> Tuple[str, ...]:
+    """Поля сообщения из __slots__ классов-наследников BaseMessage"""
+    names: List[str] = []
+    for klass in reversed(cls.__mro__):
+        if issubclass(klass, BaseMessage) and klass is not BaseMessage:
+            names.extend(name for name in klass.__dict__.get('__slots__', ()) if name not in names)
+    return tuple(names)
+
+
+def _encode(value: Any, cache: Dict[int, Any]) -> Any:
+    """Значение поля без ссылок на изменяемые объекты моделирования"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.ndarray):
+        return value if not value.flags.writeable else value.copy()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, ActiveObjects):
+        # Один список ВО шага попадает в сообщения ВО и всех МФР - кодируется один раз
+        encoded = cache.get(id(value))
+        if encoded is None:
+            encoded = cache[id(value)] = LoggedObjects(value.ids, value.positions)
+        return encoded
+    if isinstance(value, tuple) and hasattr(value, '_fields'):
+        # NamedTuple (например, прогноз трассы Tracks.TrackState) - поле за полем
+        return type(value)(*(_encode(item, cache) for item in value))
+    if isinstance(value, (list, tuple)):
+        if value and all(hasattr(item, 'pos') and hasattr(item, 'id') for item in value):
+            return LoggedObjects(np.array([item.id for item in value], dtype=np.int64),
+                                 np.array([item.pos for item in value], dtype=np.float64).reshape(-1, 3))
+        return type(value)(_encode(item, cache) for item in value)
+    if hasattr(value, 'pos') and hasattr(value, 'id'):
+        return LoggedObject(value.id, np.array(value.pos, dtype=np.float64))
+    return repr(value)
+
+
+class EventLog:
+    """Запись двоичного журнала сообщений (подключается как Manager.event_log)"""
+
+    def __init__(self, path: str, compress: bool = True, block_events: int = 16384, max_pending: int = 8) -> None:
+        """
+        :param path: путь к файлу журнала
+        :param compress: сжимать блоки zlib
+        :param block_events: событий в блоке
+        :param max_pending: сколько блоков может ждать записи; при заполнении шаг ждет фоновый поток
+        """
+        if block_events <= 0:
+            raise ValueError("Размер блока журнала должен быть положительным")
+        self.path = path
+        self.compress = compress
+        self.block_events = block_events
+        self.events_count = 0
+        self._headers: List[Tuple[int, int, int, int, int]] = []
+        self._payloads: List[Tuple[Any, ...]] = []
+        self._fields: Dict[type, Tuple[str, ...]] = {}
+        self._error: Optional[BaseException] = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, 'wb')
+        type_table = json.dumps([msg_type.value for msg_type in MESSAGE_TYPES]).encode('utf-8')
+        self._file.write(FILE_HEADER.pack(EVENT_LOG_MAGIC, EVENT_LOG_VERSION, int(compress), len(type_table)))
+        self._file.write(type_table)
+
+        self._queue: queue.Queue = queue.Queue(max_pending)
+        self._writer = threading.Thread(target=self._write_blocks, name='event-log-writer', daemon=True)
+        self._writer.start()
+
+    def write_step(self, step_time: int, messages: List[BaseMessage]) -> None:
+        """Добавляет сообщения шага (вызывается менеджером в конце шага)"""
+        if self._error is not None:
+            raise RuntimeError(f"Ошибка записи журнала {self.path}") from self._error
+        cache: Dict[int, Any] = {}
+        headers = self._headers
+        payloads = self._payloads
+        for msg in messages:
+            cls = msg.__class__
+            names = self._fields.get(cls)
+            if names is None:
+                names = self._fields[cls] = _field_names(cls)
+            receiver = msg.receiver_id
+            headers.append((TYPE_CODES[msg.type], step_time, msg.sender_id,
+                            NO_RECEIVER if receiver is None else receiver, msg.relevance))
+            payloads.append((names, tuple(_encode(getattr(msg, name, None), cache) for name in names)))
+        self.events_count += len(messages)
+        if len(headers) >= self.block_events:
+            self.flush()
+
+    def flush(self) -> None:
+        """Передает накопленные события фоновому потоку"""
+        if self._headers:
+            self._queue.put((self._headers, self._payloads))
+            self._headers = []
+            self._payloads = []
+
+    def _write_blocks(self) -> None:
+        while True:
+            block = self._queue.get()
+            if block is None:
+                return
+            if self._error is not None:
+                continue
+            try:
+                headers, payloads = block
+                header_bytes = np.array(headers, dtype=EVENT_DTYPE).tobytes()
+                payload_bytes = pickle.dumps(payloads, protocol=pickle.HIGHEST_PROTOCOL)
+                if self.compress:
+                    header_bytes = zlib.compress(header_bytes, COMPRESS_LEVEL)
+                    payload_bytes = zlib.compress(payload_bytes, COMPRESS_LEVEL)
+                self._file.write(BLOCK_HEADER.pack(len(headers), len(header_bytes), len(payload_bytes)))
+                self._file.write(header_bytes)
+                self._file.write(payload_bytes)
+            except BaseException as error:  # noqa: BLE001 - передается в поток моделирования
+                logger.exception("Ошибка записи журнала %s", self.path)
+                self._error = error
+
+    def close(self) -> None:
+        """Дописывает оставшиеся события и закрывает файл"""
+        if self._file.closed:
+            return
+        self.flush()
+        self._queue.put(None)
+        self._writer.join()
+        self._file.close()
+        logger.info("Журнал сообщений %s: %d событий", self.path, self.events_count)
+        if self._error is not None:
+            raise RuntimeError(f"Ошибка записи журнала {self.path}") from self._error
+
+    def __enter__(self) -> "EventLog":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class EventLogReader:
+    """Потоковое чтение журнала: блоки читаются по одному, файл целиком в память не загружается"""
+
+    def __init__(self, path: str) -> None:
+        """
+        :raises ValueError: если файл не является журналом или другой версии формата
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            header = self._file.read(FILE_HEADER.size)
+            if len(header) < FILE_HEADER.size:
+                raise ValueError(f"Файл {path} не является журналом сообщений")
+            magic, version, compressed, table_size = FILE_HEADER.unpack(header)
+            if magic != EVENT_LOG_MAGIC:
+                raise ValueError(f"Файл {path} не является журналом сообщений")
+            if version != EVENT_LOG_VERSION:
+                raise ValueError(f"Неподдерживаемая версия журнала: {version}")
+        except ValueError:
+            self._file.close()
+            raise
+        self.compressed = bool(compressed)
+        self.type_values: List[str] = json.loads(self._file.read(table_size).decode('utf-8'))
+        self._data_offset = self._file.tell()
+
+    def _blocks(self, with_payloads: bool) -> Iterator[Tuple[np.ndarray, Optional[list]]]:
+        self._file.seek(self._data_offset)
+        while True:
+            header = self._file.read(BLOCK_HEADER.size)
+            if len(header) < BLOCK_HEADER.size:
+                return
+            count, header_size, payload_size = BLOCK_HEADER.unpack(header)
+            header_bytes = self._file.read(header_size)
+            if not with_payloads:
+                self._file.seek(payload_size, os.SEEK_CUR)
+                payloads = None
+            else:
+                payload_bytes = self._file.read(payload_size)
+                if self.compressed:
+                    payload_bytes = zlib.decompress(payload_bytes)
+                payloads = pickle.loads(payload_bytes)
+            if self.compressed:
+                header_bytes = zlib.decompress(header_bytes)
+            events = np.frombuffer(header_bytes, dtype=EVENT_DTYPE, count=count)
+            yield events, payloads
+
+    def record_blocks(self) -> Iterator[np.ndarray]:
+        """Заголовки событий по блокам (структурированные массивы EVENT_DTYPE, поля не распаковываются)"""
+        for events, _ in self._blocks(with_payloads=False):
+            yield events
+
+    def records(self) -> np.ndarray:
+        """Все заголовки событий одним массивом EVENT_DTYPE"""
+        blocks = list(self.record_blocks())
+        return np.concatenate(blocks) if blocks else np.empty(0, dtype=EVENT_DTYPE)
+
+    def message_type(self, code: int) -> MessageType:
+        return MessageType(self.type_values[code])
+
+    def messages(self) -> Iterator[LoggedMessage]:
+        """Сообщения журнала по порядку"""
+        types = [MessageType(value) for value in self.type_values]
+        for events, payloads in self._blocks(with_payloads=True):
+            for event, (names, values) in zip(events.tolist(), payloads):
+                code, step, sender, receiver, relevance = event
+                yield LoggedMessage(types[code], step, sender, None if receiver == NO_RECEIVER else receiver,
+                                    relevance, dict(zip(names, values)))
+
+    def __iter__(self) -> Iterator[LoggedMessage]:
+        return self.messages()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "EventLogReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
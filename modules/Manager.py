@@ -1,34 +1,102 @@
 import logging
-from typing import List, Optional, Dict
+import os
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from typing import Any, List, Optional, Dict, Tuple
 from .Timer import Timer
 from .BaseMessage import BaseMessage
 from .constants import MessageType
 
 logger = logging.getLogger(__name__)
 
+# Порядок фаз шага; модули других классов выполняются последними
+PRIORITY_MODULES = ['AirEnv', 'SectorRadar', 'MissileLauncher', 'CombatControlPoint']
+
+# Ключи маршрутов шага: (тип, получатель), (тип, ANY) и (ANY, получатель)
+ANY = '*'
+RouteKey = Tuple[Any, Any]
+
+
+def _insert_by_relevance(messages: List[BaseMessage], msg: BaseMessage) -> None:
+    """Вставка с сохранением порядка по убыванию важности (после сообщений той же важности)"""
+    if not messages or messages[-1].relevance >= msg.relevance:
+        messages.append(msg)
+    else:
+        messages.insert(bisect_right(messages, -msg.relevance, key=lambda m: -m.relevance), msg)
+
+
 class Manager:
     """Класс для управления обменом сообщениями между модулями и запуском симуляции"""
-    def __init__(self):
+    def __init__(self, history_steps: Optional[int] = None, workers: Optional[int] = None):
+        """
+        :param history_steps: сколько последних шагов сообщений хранить (None - все).
+            Модули читают сообщения текущего и предыдущего шагов, поэтому не меньше 2
+        :param workers: число потоков для параллельной подготовки модулей одной фазы
+            (см. step()); None - все модули выполняются последовательно
+
+        Атрибут prepare_pool - внешний исполнитель prepare() фазы с методом prepare(modules),
+        например пул процессов МФР modules.SharedAirspace.RadarProcessPool.
+        Атрибут event_log - журнал с методом write_step(время, сообщения), получает сообщения
+        каждого шага (например, двоичный журнал modules.EventLog.EventLog)
+        """
         self.time = Timer()
         self.messages: Dict[int, List[BaseMessage]] = {}  # Словарь: {время_шага: [сообщения]}
+        # Маршруты: {время_шага: {(тип, получатель): [сообщения]}} - входящие по подпискам
+        self._routes: Dict[int, Dict[RouteKey, List[BaseMessage]]] = {}
         self.modules: List = []  # Список модулей системы
+        self.history_steps = history_steps
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+        self.prepare_pool = None
+        self.event_log = None
+
+    def __getstate__(self):
+        # Пулы потоков и процессов не сохраняются в контрольных точках и создаются заново
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        state['_executor_pid'] = None
+        state['prepare_pool'] = None
+        state['event_log'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if '_routes' not in state:
+            # Контрольные точки до маршрутизации: маршруты восстанавливаются по сообщениям
+            self._routes = {}
+            for step_time, messages in state['messages'].items():
+                self.messages[step_time] = []
+                for msg in messages:
+                    self.add_message(msg, step_time)
+
+    @property
+    def history_steps(self) -> Optional[int]:
+        return self.__history_steps
+
+    @history_steps.setter
+    def history_steps(self, history_steps: Optional[int]) -> None:
+        if history_steps is not None and history_steps < 2:
+            raise ValueError("history_steps должно быть не меньше 2")
+        self.__history_steps = history_steps
         
     def add_module(self, module) -> None:
         """Добавление модуля в систему"""
         if module not in self.modules:
             self.modules.append(module)
-            logger.info(f"Модуль с ID {module.id if hasattr(module, 'id') else 'unknown'} добавлен в систему")
+            logger.info("Модуль с ID %s добавлен в систему", getattr(module, 'id', 'unknown'))
         else:
-            logger.warning(f"Модуль с ID {module.id if hasattr(module, 'id') else 'unknown'} уже существует в системе")
+            logger.warning("Модуль с ID %s уже существует в системе", getattr(module, 'id', 'unknown'))
 
     def remove_module(self, module_id: int) -> bool:
         """Удаление модуля из системы по ID"""
         for i, module in enumerate(self.modules):
             if hasattr(module, 'id') and module.id == module_id:
                 self.modules.pop(i)
-                logger.info(f"Модуль с ID {module_id} удален из системы")
+                logger.info("Модуль с ID %s удален из системы", module_id)
                 return True
-        logger.warning(f"Модуль с ID {module_id} не найден в системе")
+        logger.warning("Модуль с ID %s не найден в системе", module_id)
         return False
 
     def get_module_by_id(self, module_id: int):
@@ -47,15 +115,15 @@ class Manager:
         if step_time is None:
             step_time = self.time.get_time()
         
-        if step_time not in self.messages:
-            self.messages[step_time] = []
-        
         if msg.send_time is None:
             msg.send_time = step_time
 
-        self.messages[step_time].append(msg)
-        # Сортировка сообщений по важности (если требуется)
-        self.messages[step_time].sort(key=lambda x: -x.relevance)
+        # Сообщение сразу раскладывается по маршрутам (тип, получатель), поэтому выборка
+        # получателем не просматривает сообщения шага; порядок - по убыванию важности
+        _insert_by_relevance(self.messages.setdefault(step_time, []), msg)
+        routes = self._routes.setdefault(step_time, {})
+        for key in ((msg.type, msg.receiver_id), (msg.type, ANY), (ANY, msg.receiver_id)):
+            _insert_by_relevance(routes.setdefault(key, []), msg)
 
     def give_messages(self, step_time: Optional[int] = None) -> List[BaseMessage]:
         """Возвращает все сообщения для указанного шага (по умолчанию текущий шаг)
@@ -78,8 +146,7 @@ class Manager:
         if step_time is None:
             step_time = self.time.get_time()
         
-        messages_at_step = self.messages.get(step_time, [])
-        return [msg for msg in messages_at_step if msg.receiver_id == receiver_id]
+        return list(self._routes.get(step_time, {}).get((ANY, receiver_id), ()))
 
     def give_messages_by_type(
         self,
@@ -98,15 +165,8 @@ class Manager:
         if step_time is None:
             step_time = self.time.get_time()
         
-        messages_at_step = self.messages.get(step_time, [])
-        
-        result = []
-        for msg in messages_at_step:
-            if hasattr(msg, 'type') and msg.type == msg_type:
-                if receiver_id is None or msg.receiver_id == receiver_id:
-                    result.append(msg)
-        
-        return result
+        key = (msg_type, ANY if receiver_id is None else receiver_id)
+        return list(self._routes.get(step_time, {}).get(key, ()))
 
     def run_simulation(self, end_time: int) -> None:
         """Запуск симуляции на указанное количество времени
@@ -114,27 +174,89 @@ class Manager:
         :param end_time: время завершения симуляции
         """
         while self.time.get_time() < end_time:
-            current_time = self.time.get_time()
-            logger.info(f"Текущее время: {current_time}")
-            
-            # Обработка сообщений для текущего шага (если есть)
-            
-            # Сортируем модули в нужном порядке
-            priority_modules = ['AirEnv', 'SectorRadar', 'MissileLauncher', 'CombatControlPoint']
-            sorted_modules = sorted(self.modules, 
-                                key=lambda m: priority_modules.index(m.__class__.__name__) 
-                                if m.__class__.__name__ in priority_modules 
-                                else len(priority_modules))
-
-            # Вызываем step() в отсортированном порядке
-            for module in sorted_modules:
+            self.step()
+
+    def step(self) -> None:
+        """
+        Один шаг симуляции: step() всех модулей и переход к следующему моменту времени.
+
+        Модули выполняются фазами в порядке PRIORITY_MODULES. При workers модули фазы,
+        у которых есть prepare() (независимые расчеты без сообщений и случайных чисел,
+        например геометрия МФР), сначала готовятся параллельно в пуле потоков - векторные
+        операции NumPy отпускают GIL. Затем step() модулей вызывается последовательно
+        в исходном порядке, поэтому сообщения и результат не зависят от числа потоков
+        """
+        current_time = self.time.get_time()
+        logger.info("Текущее время: %s", current_time)
+
+        # Вызываем step() фаз в порядке приоритета
+        for phase in self.phases():
+            self._prepare_phase(phase)
+            for module in phase:
                 module.step()
-            
+
+        self._finish_step(current_time)
+
+    def phases(self) -> List[List]:
+        """Модули, сгруппированные по фазам шага в порядке PRIORITY_MODULES (остальные - последней фазой)"""
+        phase_of = lambda m: (PRIORITY_MODULES.index(m.__class__.__name__)
+                              if m.__class__.__name__ in PRIORITY_MODULES
+                              else len(PRIORITY_MODULES))
+        sorted_modules = sorted(self.modules, key=phase_of)
+        return [list(phase) for _, phase in groupby(sorted_modules, key=phase_of)]
+
+    def _finish_step(self, current_time: int) -> None:
+        """Завершение шага после всех модулей: трассировка, окно истории, переход времени"""
+        # Трассировка сообщений шага: строки собираются, только если уровень INFO включен
+        if logger.isEnabledFor(logging.INFO):
             current_messages = self.give_messages(current_time)
             if len(current_messages) > 0:
-                logger.info(f"Обработка {len(current_messages)} сообщений на шаге {current_time}")
+                logger.info("Обработка %d сообщений на шаге %s", len(current_messages), current_time)
                 for msg in current_messages:
-                    logger.info(f"  - {msg}")  # __repr__ будет вызван автоматически
-            
-            # Обновление времени после обработки всех модулей
-            self.time.update_time()
+                    logger.info("  - %r", msg)
+        
+        # Журнал - до вытеснения истории: сообщения шага должны попасть в журнал, пока шаг в окне
+        if self.event_log is not None:
+            self.event_log.write_step(current_time, self.give_messages(current_time))
+
+        if self.history_steps is not None:
+            self.evict_messages(current_time)
+
+        # Обновление времени после обработки всех модулей
+        self.time.update_time()
+
+    def _prepare_phase(self, phase: List) -> None:
+        """Параллельный вызов prepare() у модулей фазы"""
+        prepared = [module for module in phase if hasattr(module, 'prepare')]
+        pool = self.prepare_pool
+        # Процессы пула принадлежат создавшему его процессу (не ветке os.fork)
+        if pool is not None and prepared and pool.owner_pid == os.getpid():
+            pool.prepare(prepared)
+            return
+        if not self.workers or len(prepared) < 2:
+            return
+        # list() дожидается всех модулей и пробрасывает исключение первого упавшего
+        list(self._get_executor().map(lambda module: module.prepare(), prepared))
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # После os.fork (modules.Branching) потоки родителя недоступны - пул создается заново
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='manager-phase')
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def close(self) -> None:
+        """Останавливает пул потоков (если он создавался) и prepare_pool"""
+        if self._executor is not None and self._executor_pid == os.getpid():
+            self._executor.shutdown()
+        self._executor = None
+        if self.prepare_pool is not None and self.prepare_pool.owner_pid == os.getpid():
+            self.prepare_pool.close()
+        self.prepare_pool = None
+
+    def evict_messages(self, current_time: int) -> None:
+        """Удаляет сообщения шагов, вышедших за окно history_steps"""
+        oldest_time = current_time - (self.history_steps - 1) * self.time.get_dt()
+        for step_time in [step_time for step_time in self.messages if step_time < oldest_time]:
+            self._routes.pop(step_time, None)
+            del self.messages[step_time]
@@ -15,10 +15,15 @@ class LaunchMissileMessage(BaseMessage):
     """
     MissileLauncher -> Missile
     Сообщение с командой на запуск ракеты по указанной цели
+    (target_position - измеренные МФР координаты цели, по ним рассчитывается пуск)
     """
-    def __init__(self, sender_id: int, receiver_id: int = None, time: int = None, target: Target = None):
+    __slots__ = ('target', 'target_position')
+
+    def __init__(self, sender_id: int, receiver_id: int = None, time: int = None, target: Target = None,
+                 target_position: np.ndarray = None):
         super().__init__(type=MessageType.LAUNCH_MISSILE, send_time=time, sender_id=sender_id, receiver_id=receiver_id)
         self.target = target
+        self.target_position = target_position
     
     def __repr__(self) -> str:
         return super().__repr__()
@@ -29,6 +34,8 @@ class CPPLaunchMissileRequestMessage(BaseMessage):
     CCP -> MissileLauncher
     Сообщение на запуск ракеты по указанной цели
     """
+    __slots__ = ('target', 'target_position', 'radar_id')
+
     def __init__(self, sender_id: int, target: Target, target_position: np.ndarray, radar_id: int, time: int = None, receiver_id: int = None, relevance: int = 1):
         super().__init__(type=MessageType.LAUNCH_COMMAND, send_time=time, sender_id=sender_id, receiver_id=receiver_id, relevance=relevance)
         self.target = target
@@ -45,6 +52,8 @@ class LaunchedMissileMessage(BaseMessage):
     MissileLauncher -> CCP
     Сообщение об успешном запуске ракеты
     """
+    __slots__ = ('missile', 'target_id')
+
     def __init__(self, sender_id: int, missile: Missile, target_id: int, time: int = None, receiver_id: int = None):
         super().__init__(type=MessageType.LAUNCHED_MISSILE, send_time=time, sender_id=sender_id, receiver_id=receiver_id)
         self.missile = missile
@@ -60,6 +69,8 @@ class MissileCountRequestMessage(BaseMessage):
     CCP -> MissileLauncher
     Сообщение-запрос количества доступных ракет
     """
+    __slots__ = ()
+
     def __init__(self, sender_id: int, time: int = None, receiver_id: int = None, relevance: int = 3):
         super().__init__(type=MessageType.MISSILE_COUNT_REQUEST, send_time=time, sender_id=sender_id, receiver_id=receiver_id, relevance=relevance)
     
@@ -72,6 +83,8 @@ class MissileCountResponseMessage(BaseMessage):
     MissileLauncher -> CCP
     Сообщение с количеством доступных ракет
     """
+    __slots__ = ('count',)
+
     def __init__(self, sender_id: int, count: int, time: int = None, receiver_id: int = None):
         super().__init__(type=MessageType.MISSILE_COUNT_RESPONSE, send_time=time, sender_id=sender_id, receiver_id=receiver_id)
         self.count = count
@@ -86,6 +99,8 @@ class AllObjectsMessage(BaseMessage):
     Radar -> CCP
     Сообщение о всех видимых
     """
+    __slots__ = ('objects',)
+
     def __init__(self, sender_id: int, objects: List[AirObject], time: int = None, receiver_id: int = None):
         super().__init__(type=MessageType.ALL_OBJECTS, send_time=time, sender_id=sender_id, receiver_id=receiver_id)
         self.objects=objects
@@ -94,11 +109,22 @@ class AllObjectsMessage(BaseMessage):
 class FoundObjectsMessage(BaseMessage):
     """
     Radar -> CCP
-    Сообщение о найденных объектах радиолокатором
+    Сообщение о найденных объектах радиолокатором.
+    positions - измеренные на шаге координаты (с шумом МФР), объекты ВО ими не изменяются
     """
-    def __init__(self, sender_id: int, visible_objects: List[AirObject], time: int = None, receiver_id: int = None):
+    __slots__ = ('visible_objects', 'positions')
+
+    def __init__(self, sender_id: int, visible_objects: List[AirObject], time: int = None, receiver_id: int = None,
+                 positions: np.ndarray = None):
         super().__init__(type=MessageType.FOUND_OBJECTS, send_time=time, sender_id=sender_id, receiver_id=receiver_id)
         self.visible_objects = visible_objects
+        self.positions = positions
+
+    def measurements(self):
+        """Пары (объект, измеренные координаты); без измерений - текущие координаты объекта"""
+        if self.positions is None:
+            return ((obj, obj.pos) for obj in self.visible_objects)
+        return zip(self.visible_objects, self.positions)
     
     def __repr__(self) -> str:
         base_info = super().__repr__()
@@ -111,10 +137,17 @@ class CPPUpdateTargetRadarMessage(BaseMessage):
     CCP -> Radar
     Сообщение на обновление координат цели
     """
-    def __init__(self, sender_id: int, target: Target, missile_id: int, time: int = None, receiver_id: int = None):
+    __slots__ = ('target', 'missile_id', 'estimate')
+
+    def __init__(self, sender_id: int, target: Target, missile_id: int, time: int = None, receiver_id: int = None,
+                 estimate=None):
+        """
+        :param estimate: оценка трассы цели фильтром ПБУ (Tracks.TrackState) или None
+        """
         super().__init__(type=MessageType.CCP_UPDATE_TARGET, send_time=time, sender_id=sender_id, receiver_id=receiver_id)
         self.target = target
         self.missile_id = missile_id
+        self.estimate = estimate
     
     def __repr__(self) -> str:
         base_info = super().__repr__()
@@ -126,6 +159,8 @@ class ActiveObjectsMessage(BaseMessage):
     AirEnv -> Radar
     Сообщение об активных объектах
     """
+    __slots__ = ('active_objects',)
+
     def __init__(self, sender_id: int, active_objects: List[AirObject], time: int = None, receiver_id: int = None):
         super().__init__(type=MessageType.ACTIVE_OBJECTS, send_time=time, sender_id=sender_id, receiver_id=receiver_id)
         self.active_objects = active_objects
@@ -141,9 +176,16 @@ class UpdateTargetPosition(BaseMessage):
     Radar -> Missile
     Сообщение о новом положении цели
     """
-    def __init__(self, sender_id: int, upd_object: Target, time: int = None, receiver_id: int = None):
+    __slots__ = ('upd_object', 'estimate')
+
+    def __init__(self, sender_id: int, upd_object: Target, time: int = None, receiver_id: int = None,
+                 estimate=None):
+        """
+        :param estimate: оценка трассы цели фильтром ПБУ (Tracks.TrackState) или None
+        """
         super().__init__(type=MessageType.UPDATE_TARGET, send_time=time, sender_id=sender_id, receiver_id=receiver_id)
         self.upd_object = upd_object
+        self.estimate = estimate
     
     def __repr__(self) -> str:
         base_info = super().__repr__()
@@ -155,6 +197,8 @@ class DestroyedMissileId(BaseMessage):
     Radar -> CCP
     Сообщение с id уничтноженной ракеты
     """
+    __slots__ = ('missile_id', 'self_detonation')
+
     def __init__(self, sender_id: int, missile_id: int, time: int = None, receiver_id: int = None, self_detonation: bool = False):
         super().__init__(type=MessageType.DESTROYED_MISSILE, send_time=time, sender_id=sender_id, receiver_id=receiver_id)
         self.missile_id = missile_id,
@@ -170,6 +214,8 @@ class MissileDetonateMessage(BaseMessage):
     ЗУР -> ВО, РЛС
     Сообщение о подрыве ЗУР
     """
+    __slots__ = ('missile_id', 'target_id', 'self_detonation')
+
     def __init__(self, sender_id: int, target_id: int = None, self_detonation: bool = False):
         super().__init__(type=MessageType.MISSILE_DETONATE, sender_id=sender_id)
         self.missile_id = sender_id
@@ -184,8 +230,10 @@ class MissileDetonateMessage(BaseMessage):
 class MissilePosMessage(BaseMessage):
     """
     ЗУР -> ВО
-    Сообщение о текущем положении ЗУР
+    Сообщение о текущем положении ЗУР (отправляется каждый шаг)
     """
+    __slots__ = ('missile_id',)
+
     def __init__(self, sender_id: int):
         super().__init__(type=MessageType.MISSILE_POS, sender_id=sender_id)
         self.missile_id = sender_id
@@ -200,6 +248,8 @@ class MissileSuccessfulLaunchMessage(BaseMessage):
     ЗУР -> ПУ
     Сообщение об успешном запуске ракеты
     """
+    __slots__ = ('missile', 'launch_time', 'target_id')
+
     def __init__(self, sender_id: int, launch_time: float, target: AirObject, missile: Missile, receiver_id: int):
         super().__init__(type=MessageType.LAUNCH_SUCCESSFUL, sender_id=sender_id, receiver_id=receiver_id)
         self.missile = missile
@@ -216,6 +266,8 @@ class MissileLaunchCancelledMessage(BaseMessage):
     ЗУР -> ПУ
     Сообщение об отмене запуска ракеты
     """
+    __slots__ = ('missile', 'reason')
+
     def __init__(self, sender_id: int, reason: str, missile: Missile, receiver_id: int):
         super().__init__(type=MessageType.LAUNCH_CANCELLED, sender_id=sender_id, receiver_id=receiver_id)
         self.missile = missile
@@ -229,8 +281,10 @@ class MissileLaunchCancelledMessage(BaseMessage):
 class CPPDrawerObjectsMessage(BaseMessage):
     """
     CCP -> GUI
-    Сообщение на обновление координат цели
+    Сообщение на обновление координат цели (отправляется каждый шаг на объект)
     """
+    __slots__ = ('obj_id', 'target_type', 'coordinates', 'is_visible_by_radar')
+
     def __init__(self, sender_id: int, obj_id: int, target_type, coordinates: np.ndarray, is_visible_by_radar: bool, time: int = None, receiver_id: int = None):
         super().__init__(type=MessageType.DRAW_OBJECTS, send_time=time, sender_id=sender_id, receiver_id=receiver_id)
         self.obj_id = obj_id
@@ -247,6 +301,8 @@ class MissileToAirEnvMessage(BaseMessage):
     MissileLauncher -> AirEnv
     Сообщение об успешном запуске ракеты
     """
+    __slots__ = ('missile',)
+
     def __init__(self, sender_id: int, missile: Missile, time: int = None, receiver_id: int = None):
         super().__init__(type=MessageType.NEW_MISSILE, send_time=time, sender_id=sender_id, receiver_id=receiver_id)
         self.missile = missile
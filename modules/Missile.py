@@ -2,6 +2,7 @@ import numpy as np
 from typing import Optional, Tuple
 from .AirObject import AirObject, Trajectory
 from .constants import MessageType, MISSILE_VELOCITY_MODULE, MISSILE_DETONATE_RADIUS, MISSILE_DETONATE_PERIOD
+from .Tracks import MEASUREMENT_ERROR, TrackState
 from .utils import to_seconds
 
 
@@ -90,7 +91,6 @@ class Missile(AirObject):
             t = min(times)
 
         if t > self.detonate_period:
-            print('wtf')
             raise ValueError("Target is too far for this rocket (detonation_period over limited)")
 
         # Compute required interceptor velocity vector
@@ -101,19 +101,33 @@ class Missile(AirObject):
 
         return V, t
 
-    def _launch(self, target: AirObject, launcher_id):
+    def _launch(self, target: AirObject, launcher_id, target_position: Optional[np.ndarray] = None):
+        """
+        Пуск ЗУР по цели target
+
+        :param target: цель (объект ВО); по ней проверяется только дистанция подрыва
+        :param launcher_id: ID ПУ, которой отправляется результат пуска
+        :param target_position: измеренные МФР координаты цели; пуск рассчитывается по ним.
+            Скорость цели по одному измерению неизвестна - ЗУР идет в точку измерения,
+            курс уточняется оценками трассы ПБУ (UPDATE_TARGET)
+        """
         from .Messages import MissileSuccessfulLaunchMessage, MissileLaunchCancelledMessage
 
+        launch_time = to_seconds(self._manager.time.get_time())
+        aim = target
+        if target_position is not None:
+            aim = TrackState(id=target.id, pos=np.asarray(target_position, dtype=float), velocity=np.zeros(3),
+                             speed_mod=0.0, covariance=np.eye(3) * MEASUREMENT_ERROR ** 2, time=launch_time)
         try:
-            V, t = self._calculate_trajectory_params(target)
+            V, t = self._calculate_trajectory_params(aim)
             self.target = target
             new_trajectory = Trajectory(
                 velocity=tuple(V),
                 start_pos=tuple(self.pos),
-                start_time=to_seconds(self._manager.time.get_time())
+                start_time=launch_time
             )
             self._set_trajectory(new_trajectory)
-            self.launch_time = to_seconds(self._manager.time.get_time())
+            self.launch_time = launch_time
             msg = MissileSuccessfulLaunchMessage(
                 sender_id=self.id,
                 launch_time=self.launch_time,
@@ -157,7 +171,7 @@ class Missile(AirObject):
                 step_time=current_time
             )
             if messages:
-                self._launch(messages[-1].target, messages[-1].sender_id)
+                self._launch(messages[-1].target, messages[-1].sender_id, messages[-1].target_position)
 
         elif self.status == 'active':
             update_msgs = self._manager.give_messages_by_type(
@@ -165,14 +179,22 @@ class Missile(AirObject):
                 self.id,
                 step_time=current_time - dt
             )
+            # Новая траектория начинается из положения ЗУР на предыдущем шаге (self.pos еще не обновлен);
+            # со временем старта текущего шага ЗУР на этом шаге осталась бы на месте
+            solve_time = to_seconds(current_time - dt)
             for msg in update_msgs:
                 self.target = msg.upd_object
+                # Перехват считается по оценке трассы фильтром ПБУ, если она передана.
+                # Оценка получена на шаге ПБУ и приходит через МФР с задержкой - экстраполируется
+                aim = self.target
+                if msg.estimate is not None:
+                    aim = msg.estimate.at(solve_time)
                 try:
-                    V, t = self._calculate_trajectory_params(self.target)
+                    V, t = self._calculate_trajectory_params(aim)
                     new_trajectory = Trajectory(
                         velocity=tuple(V),
                         start_pos=tuple(self.pos),
-                        start_time=to_seconds(self._manager.time.get_time())
+                        start_time=solve_time
                     )
                     self._set_trajectory(new_trajectory)
                 except (InterceptionError, ValueError):
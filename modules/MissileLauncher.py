@@ -31,7 +31,7 @@ class MissileLauncher(BaseModel):
         self.missiles: List[Missile] = []  # Список доступных ракет
         self.launched_missiles: List[Missile] = []  # Список запущенных ракет
         self.air_env = air_env
-        logger.info(f"Пусковая установка (ID: {self.id}) инициализирована на позиции {self.pos}")
+        logger.info("Пусковая установка (ID: %s) инициализирована на позиции %s", self.id, self.pos)
 
     def add_missile(self, missile: Missile) -> bool:
         """
@@ -42,9 +42,9 @@ class MissileLauncher(BaseModel):
         """
         if len(self.missiles) < self.max_missiles:
             self.missiles.append(missile)
-            logger.info(f"Ракета ID: {missile.id} добавлена в пусковую установку (ID: {self.id})")
+            logger.info("Ракета ID: %s добавлена в пусковую установку (ID: %s)", missile.id, self.id)
             return True
-        logger.info(f"Невозможно добавить ракету ID: {missile.id}. Пусковая установка заполнена или ракета уже запущена.")
+        logger.info("Невозможно добавить ракету ID: %s. Пусковая установка заполнена или ракета уже запущена.", missile.id)
         return False
 
     def count_missiles(self) -> int:
@@ -55,16 +55,18 @@ class MissileLauncher(BaseModel):
         """
         return len(self.missiles)
 
-    def launch_missile(self, target: Target, target_id: Optional[int] = None, radar_id: Optional[int] = None) -> Optional[Missile]:
+    def launch_missile(self, target: Target, target_id: Optional[int] = None, radar_id: Optional[int] = None,
+                       target_position: Optional[np.ndarray] = None) -> Optional[Missile]:
         """
         Запуск ракеты по указанной цели
 
-        :param target_pos: Координаты цели для поражения
+        :param target: Цель для поражения
         :param target_id: ID цели (если известен)
+        :param target_position: Измеренные МФР координаты цели, по ним рассчитывается пуск
         :return: Запущенная ракета или None, если запуск невозможен
         """
         if not self.missiles:
-            logger.info(f"Пусковая установка (ID: {self.id}) не имеет доступных ракет для запуска")
+            logger.info("Пусковая установка (ID: %s) не имеет доступных ракет для запуска", self.id)
             return None
 
         missile = self.missiles.pop()
@@ -75,6 +77,7 @@ class MissileLauncher(BaseModel):
             receiver_id=missile.id,
             sender_id=self.id,
             target=target,
+            target_position=target_position,
         )
         self._manager.add_message(launch_msg)
         missile.step()
@@ -85,25 +88,26 @@ class MissileLauncher(BaseModel):
         """
         current_time = self._manager.time.get_time()
         dt = self._manager.time.get_dt()
-        logger.info(f"Шаг симуляции пусковой установки (ID: {self.id}) в t={current_time}. Доступно ракет: {self.count_missiles()}")
+        logger.info("Шаг симуляции пусковой установки (ID: %s) в t=%s. Доступно ракет: %d", self.id, current_time, len(self.missiles))
 
         # Обработка сообщений
         messages = self._manager.give_messages_by_id(self.id, step_time=current_time-dt)
         # messages += self._manager.give_messages_by_type(msg_type=MessageType.LAUNCH_SUCCESSFUL, step_time=current_time-dt)
         # messages += self._manager.give_messages_by_type(msg_type=MessageType.LAUNCH_CANCELLED, step_time=current_time-dt)
-        logger.info(f"ПУ сообщения {messages}")
+        logger.info("ПУ сообщения %s", messages)
         for msg in messages:
             if isinstance(msg, CPPLaunchMissileRequestMessage):
-                logger.info(f"Получена команда на запуск ракеты к цели ID: {msg.target}")
+                logger.info("Получена команда на запуск ракеты к цели ID: %s", msg.target)
                 self.launch_missile(
                     target=msg.target,
                     # target_id=msg.target_id,
-                    radar_id=msg.radar_id
+                    radar_id=msg.radar_id,
+                    target_position=msg.target_position
                 )
             elif isinstance(msg, MissileSuccessfulLaunchMessage):
                 missile = msg.missile
                 self.launched_missiles.append(missile)
-                logger.info(f"Ракета ID: {missile.id} успешно запущена с пусковой установки (ID: {self.id})")
+                logger.info("Ракета ID: %s успешно запущена с пусковой установки (ID: %s)", missile.id, self.id)
 
                 # Отправляем сообщение о запуске ракеты
                 launched_msg = LaunchedMissileMessage(
@@ -125,7 +129,7 @@ class MissileLauncher(BaseModel):
             elif isinstance(msg, MissileLaunchCancelledMessage):
                 missile = msg.missile
                 self.missiles.append(missile)
-                logger.info(f"Ракета ID: {missile.id} не запущена с пусковой установки (ID: {self.id}), добавляем в список доступных ракет")
+                logger.info("Ракета ID: %s не запущена с пусковой установки (ID: %s), добавляем в список доступных ракет", missile.id, self.id)
             elif isinstance(msg, MissileCountRequestMessage):
                 # Отправляем ответ с количеством ракет
                 count_msg = MissileCountResponseMessage(
@@ -135,7 +139,7 @@ class MissileLauncher(BaseModel):
                     count=self.count_missiles()
                 )
                 self._manager.add_message(count_msg)
-                logger.info(f"Отправлен ответ с количеством ракет: {self.count_missiles()}")
+                logger.info("Отправлен ответ с количеством ракет: %d", count_msg.count)
 
     def update_launched_missiles(self, dt: float) -> None:
         """
@@ -148,7 +152,7 @@ class MissileLauncher(BaseModel):
             if missile.is_active:
                 hit, active = missile.update(dt, current_time)
                 if hit:
-                    logger.info(f"Ракета ID: {missile.id} поразила цель!")
+                    logger.info("Ракета ID: %s поразила цель!", missile.id)
                 if not active:
                     self.launched_missiles.remove(missile)
 
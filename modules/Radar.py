@@ -1,5 +1,6 @@
 import numpy as np
 from .utils import Target
+from .TargetStore import object_positions
 from .Manager import Manager
 from .constants import *
 from .BaseModel import BaseModel
@@ -9,6 +10,35 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+
+def sector_visible(positions: np.ndarray, sector: Tuple) -> np.ndarray:
+    """
+    Индексы объектов (строк positions), попадающих в сектор обзора МФР.
+    Функция модуля, а не метод: вызывается и в процессах-обработчиках (modules.SharedAirspace)
+
+    :param positions: координаты объектов, shape (N, 3)
+    :param sector: (позиция МФР, дальность, азимут, ширина по азимуту, угол места, ширина по углу места)
+    """
+    if len(positions) == 0:
+        return np.empty(0, dtype=np.intp)
+    pos, max_distance, current_azimuth, azimuth_range, current_elevation, elevation_range = sector
+
+    # Расстояния и углы считаются сразу для всех объектов по массиву координат
+    delta = positions - pos
+    distance = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        azimuth = np.degrees(np.arctan2(delta[:, 1], delta[:, 0])) % 360
+        elevation = np.degrees(np.arcsin(delta[:, 2] / distance)) % 180
+
+    # Проверяем, попадает ли объект в текущий сектор
+    visible = (
+        (distance <= max_distance)
+        & (current_azimuth <= azimuth) & (azimuth <= current_azimuth + azimuth_range)
+        & (current_elevation <= elevation) & (elevation <= current_elevation + elevation_range)
+    )
+    return np.flatnonzero(visible)
+
+
 class SectorRadar(BaseModel):
     def __init__(
         self,
@@ -40,37 +70,24 @@ class SectorRadar(BaseModel):
         # Текущие углы сканирования
         self.current_azimuth = azimuth_start
         self.current_elevation = elevation_start
+        self._prepared = None  # (объекты, координаты, индексы видимых) из prepare()
 
     def find_visible_objects(self, objects: List[AirObject]) -> List[AirObject]:
         """
         Поиск объектов, видимых радаром в текущем секторе.
         """
-        visible_objects = []
-
-        # print('current_elevation = ', self.current_elevation)
-        # print('current_azimuth =', self.current_azimuth)
-
-        for obj in objects:
-            # Вычисляем расстояние до объекта
-            coords = obj.pos
-            distance = np.linalg.norm(coords - self.pos)
-            if distance > self.max_distance:
-                continue
+        if len(objects) == 0:
+            return []
+        return [objects[i] for i in self.visible_indices(object_positions(objects)).tolist()]
 
-            # Вычисляем углы азимута и наклона до объекта
-            delta = coords - self.pos
-            azimuth = np.degrees(np.arctan2(delta[1], delta[0])) % 360
-            elevation = np.degrees(np.arcsin(delta[2] / distance)) % 180
-            # print(f'object {obj.id}, elevation = {elevation}, azimuth = {azimuth}')
+    def visible_indices(self, positions: np.ndarray) -> np.ndarray:
+        """Индексы объектов (строк positions), попадающих в текущий сектор"""
+        return sector_visible(positions, self.sector())
 
-            # Проверяем, попадает ли объект в текущий сектор
-            if (
-                self.current_azimuth <= azimuth <= self.current_azimuth + self.azimuth_range
-                and self.current_elevation <= elevation <= self.current_elevation + self.elevation_range
-            ):
-                visible_objects.append(obj)
-
-        return visible_objects
+    def sector(self) -> Tuple:
+        """Параметры текущего сектора обзора для sector_visible()"""
+        return (self.pos, self.max_distance, self.current_azimuth, self.azimuth_range,
+                self.current_elevation, self.elevation_range)
 
     def move_to_next_sector(self):
         """
@@ -135,11 +152,41 @@ class SectorRadar(BaseModel):
         if new_elevation_speed is not None:
             self.elevation_speed = new_elevation_speed
 
-    def smooth_objects(self, objects):
+    def smooth_objects(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Измеренные координаты: истинные координаты с шумом измерения.
+        Состояние объектов не изменяется (шум не попадает в ВО и к другим МФР)
+
+        :param positions: истинные координаты видимых объектов, shape (N, 3)
+        :return: новый массив (только для чтения) измеренных координат
+        """
         error = 5
-        for object in objects:
-            n_prostr = len(object.pos) 
-            object.pos += np.random.normal(0, error, n_prostr)
+        measured = positions + np.random.normal(0, error, positions.shape)
+        measured.flags.writeable = False
+        return measured
+
+    def prepare(self):
+        """
+        Геометрия шага (координаты объектов и видимые в секторе) без сообщений
+        и случайных чисел - может выполняться параллельно с другими МФР (Manager.workers)
+        """
+        objects = self.active_objects()
+        positions = object_positions(objects)
+        self.set_detections(objects, positions, self.visible_indices(positions))
+
+    def active_objects(self) -> List[AirObject]:
+        """Объекты ВО текущего шага (сообщение AirEnv)"""
+        return self._manager.give_messages_by_type(MessageType.ACTIVE_OBJECTS)[0].active_objects
+
+    def set_detections(self, objects: List[AirObject], positions: np.ndarray, visible: np.ndarray) -> None:
+        """
+        Результат подготовки шага, посчитанный вне МФР (modules.SharedAirspace)
+
+        :param objects: объекты ВО шага
+        :param positions: их координаты, shape (N, 3)
+        :param visible: индексы объектов в текущем секторе
+        """
+        self._prepared = (objects, positions, visible)
 
     def step(self):
         """
@@ -148,7 +195,7 @@ class SectorRadar(BaseModel):
         current_time = self._manager.time.get_time()
         dt = self._manager.time.get_dt()
 
-        objects = self._manager.give_messages_by_type(MessageType.ACTIVE_OBJECTS)[0].active_objects
+        objects = self.active_objects()
         # if len(objects) == 0:
         #     raise "ОШИБКА РАДАРА: ВО отправило пустое сообщение"
 
@@ -160,23 +207,31 @@ class SectorRadar(BaseModel):
         )
         self._manager.add_message(all_objects_msg)
 
-        visible_objects = self.find_visible_objects(objects)
-        self.smooth_objects(visible_objects)
-        logger.info(f"Видимые объекты:")
-        for obj in visible_objects:
-            logger.info(obj)
+        if self._prepared is not None and self._prepared[0] is objects:
+            _, positions, visible = self._prepared
+        else:
+            positions = object_positions(objects)
+            visible = self.visible_indices(positions)
+        self._prepared = None
+        visible_objects = [objects[i] for i in visible.tolist()]
+        measured_positions = self.smooth_objects(positions[visible])
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Видимые объекты:")
+            for obj, position in zip(visible_objects, measured_positions):
+                logger.info("%r, измерено: %s", obj, position)
         visible_objects_msg = FoundObjectsMessage(
             time=current_time, 
             sender_id=self.id, 
             receiver_id=CCP_ID, 
-            visible_objects=visible_objects
+            visible_objects=visible_objects,
+            positions=measured_positions
         )
         self._manager.add_message(visible_objects_msg)
 
 
 
         # ПРИЕМ ТАРГЕТОВ, КОТОРЫЕ НУЖНО ОБНОВИТЬ, ОТ ПБУ
-        messages_to_missile = self._manager.give_messages_by_type(MessageType.UPDATE_TARGET, step_time=current_time-dt)
+        messages_to_missile = self._manager.give_messages_by_type(MessageType.CCP_UPDATE_TARGET, self.id, step_time=current_time-dt)
         # ОТПРАВКА СООБЩЕНИЙ РАКЕТАМ
         for message in messages_to_missile:
             id_missile = message.missile_id
@@ -185,7 +240,8 @@ class SectorRadar(BaseModel):
                 time=current_time, 
                 sender_id=self.id, 
                 receiver_id=id_missile, 
-                upd_object=target
+                upd_object=target,
+                estimate=message.estimate
             )
             self._manager.add_message(upd_msg)
 
@@ -210,9 +266,9 @@ class SectorRadar(BaseModel):
         """
         num_steps = int(self.azimuth_range / self.azimuth_speed * self.elevation_range / self.elevation_speed)
         for step in range(num_steps):
-            logger.info(f"Шаг {step + 1}:")
+            logger.info("Шаг %d:", step + 1)
             ### tbd ! ПОЛУЧЕНИЕ ИНФОРМАЦИИ ОБ ОБЪЕКТАХ !
             visible_objects = self.find_visible_objects(objects)
-            logger.info(f"Видимые объекты: {visible_objects}")
+            logger.info("Видимые объекты: %s", visible_objects)
             ### tbd ! ПЕРЕДАЧА ИНФОРМАЦИИ О НАЙДЕННЫХ ОБЪЕКТАХ !
             self.move_to_next_sector()
@@ -0,0 +1,360 @@
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .BaseModel import BaseModel
+from .Manager import Manager
+from .constants import MessageType, RECORDER_ID
+from .TargetStore import ActiveObjects
+from .utils import Target, TARGET_TYPES
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# Коды типов: индексы TARGET_TYPES, последним идет ЗУР
+MISSILE_TYPE_CODE = len(TARGET_TYPES)
+TYPE_NAMES = [target_type.name for target_type in TARGET_TYPES] + ['MISSILE']
+
+STATUS_ACTIVE = 0
+STATUS_DESTROYED = 1  # цель поражена на этом шаге
+STATUS_DETONATED = 2  # ЗУР подорвалась на этом шаге
+STATUS_NAMES = ['ACTIVE', 'DESTROYED', 'DETONATED']
+
+NO_TARGET = -1
+
+# Одна запись - один объект ВО на одном шаге. Записи идут в порядке шагов
+RECORD_DTYPE = np.dtype([
+    ('time', np.int64),  # время шага, мс
+    ('id', np.int64),
+    ('type', np.uint8),  # индекс в TYPE_NAMES
+    ('status', np.uint8),  # индекс в STATUS_NAMES
+    ('visible', np.bool_),  # объект обнаружен хотя бы одним МФР на этом шаге
+    ('target_id', np.int64),  # цель ЗУР (NO_TARGET для целей)
+    ('pos', np.float64, (3,)),
+])
+
+# Индекс шагов: записи шага i занимают [offset, offset + count) в файле записи
+INDEX_DTYPE = np.dtype([
+    ('time', np.int64),
+    ('offset', np.int64),
+    ('count', np.int64),
+])
+
+
+def metadata_path(path: str) -> str:
+    """Путь к файлу метаданных записи"""
+    return path + '.json'
+
+
+def index_path(path: str) -> str:
+    """Путь к индексу шагов записи"""
+    return path + '.idx'
+
+
+class Recorder(BaseModel):
+    """
+    Модуль записи хода моделирования.
+    На каждом шаге складывает состояние объектов ВО (id, тип, координаты,
+    видимость для МФР, статус) в заранее выделенный буфер структурированных записей.
+    Заполненный буфер сбрасывается в файл через отображение в память, поэтому
+    потребление памяти не зависит от длительности прогона
+    """
+
+    transient = True  # открытые файлы не входят в контрольные точки (modules.Checkpoint)
+
+    def __init__(self, manager: Manager, path: str, id: int = RECORDER_ID, chunk_size: int = 65536) -> None:
+        """
+        :param manager: менеджер моделей
+        :param path: путь к файлу записи (рядом создаются path.json с метаданными и path.idx с индексом шагов)
+        :param id: ID модуля
+        :param chunk_size: размер буфера в записях
+        """
+        super().__init__(manager, id, None)
+        if chunk_size <= 0:
+            raise ValueError("Размер буфера записи должен быть положительным")
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'wb+')
+        self._index_file = open(index_path(path), 'wb')
+
+        self._buffer = np.empty(chunk_size, dtype=RECORD_DTYPE)
+        self._fill = 0  # записей в буфере
+        self._count = 0  # записей в файле
+        self._steps = 0
+        self._start_time: Optional[int] = None
+        self._end_time: Optional[int] = None
+        self._missile_targets: Dict[int, int] = {}  # id ЗУР -> id цели
+        self._launches: List[Dict[str, int]] = []
+        self._last_frame: Optional[np.ndarray] = None
+        self._write_metadata(complete=False)
+
+    def step(self) -> None:
+        """
+        Запись состояния ВО на текущем шаге
+        """
+        current_time = self._manager.time.get_time()
+
+        for msg in self._manager.give_messages_by_type(MessageType.LAUNCHED_MISSILE):
+            self._missile_targets[msg.missile.id] = msg.target_id
+            self._launches.append({
+                'time': int(current_time),
+                'launcher_id': int(msg.sender_id),
+                'missile_id': int(msg.missile.id),
+                'target_id': int(msg.target_id),
+            })
+
+        active_msgs = self._manager.give_messages_by_type(MessageType.ACTIVE_OBJECTS)
+        if not active_msgs:
+            return
+        objects = active_msgs[0].active_objects
+        ids, types, positions = self._object_columns(objects)
+
+        entry = np.array([(current_time, self.records_count, len(ids))], dtype=INDEX_DTYPE)
+        self._index_file.write(entry.tobytes())
+        block, direct = self._reserve(len(ids))
+        block['time'] = current_time
+        block['id'] = ids
+        block['type'] = types
+        block['pos'] = positions
+        block['status'] = STATUS_ACTIVE
+        block['target_id'] = NO_TARGET
+
+        visible_ids = {obj.id
+                       for msg in self._manager.give_messages_by_type(MessageType.FOUND_OBJECTS)
+                       for obj in msg.visible_objects}
+        block['visible'] = np.isin(ids, np.fromiter(visible_ids, dtype=np.int64, count=len(visible_ids)))
+
+        missile_idx = np.flatnonzero(types == MISSILE_TYPE_CODE)
+        for idx in missile_idx.tolist():
+            missile_id = int(ids[idx])
+            if missile_id not in self._missile_targets:
+                # ЗУР запущена до подключения записи (продолжение с контрольной точки)
+                target = getattr(objects[idx], 'target', None)
+                if target is not None:
+                    self._missile_targets[missile_id] = target.id
+            block['target_id'][idx] = self._missile_targets.get(missile_id, NO_TARGET)
+
+        for msg in self._manager.give_messages_by_type(MessageType.MISSILE_DETONATE):
+            block['status'][ids == msg.missile_id] = STATUS_DETONATED
+            if msg.target_id is not None:
+                block['status'][ids == msg.target_id] = STATUS_DESTROYED
+
+        if direct:
+            self._write(block)
+        self._last_frame = block
+
+        if self._start_time is None:
+            self._start_time = current_time
+        self._end_time = current_time
+        self._steps += 1
+
+    def _object_columns(self, objects) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """id, коды типов и координаты объектов ВО"""
+        if isinstance(objects, ActiveObjects):
+            return objects.ids, objects.type_codes(MISSILE_TYPE_CODE), objects.positions
+        ids = np.array([obj.id for obj in objects], dtype=np.int64)
+        types = np.array([TARGET_TYPES.index(obj.type) if isinstance(obj, Target) else MISSILE_TYPE_CODE
+                          for obj in objects], dtype=np.int64)
+        positions = np.array([obj.pos for obj in objects], dtype=np.float64).reshape(-1, 3)
+        return ids, types, positions
+
+    def _reserve(self, n: int) -> Tuple[np.ndarray, bool]:
+        """
+        Место под n записей: срез буфера или, если шаг не помещается
+        в буфер целиком, отдельный массив, который пишется в файл напрямую
+        """
+        if n > len(self._buffer):
+            self.flush()
+            return np.empty(n, dtype=RECORD_DTYPE), True
+        if self._fill + n > len(self._buffer):
+            self.flush()
+        block = self._buffer[self._fill:self._fill + n]
+        self._fill += n
+        return block, False
+
+    def _write(self, records: np.ndarray) -> None:
+        """Дописывает записи в конец файла через отображение в память"""
+        if len(records) == 0:
+            return
+        offset = self._count * RECORD_DTYPE.itemsize
+        self._file.truncate(offset + records.nbytes)
+        mapped = np.memmap(self._file, dtype=RECORD_DTYPE, mode='r+', offset=offset, shape=(len(records),))
+        mapped[:] = records
+        mapped.flush()
+        del mapped
+        self._count += len(records)
+
+    def flush(self) -> None:
+        """Сбрасывает буфер в файл и обновляет метаданные"""
+        if self._file is None or self._fill == 0:
+            return
+        self._write(self._buffer[:self._fill])
+        self._fill = 0
+        self._index_file.flush()
+        self._write_metadata(complete=False)
+        logger.debug("Запись %s: в файле %d записей", self.path, self._count)
+
+    def close(self) -> None:
+        """Завершает запись: сбрасывает буфер и помечает запись как полную"""
+        if self._file is None:
+            return
+        self.flush()
+        self._write_metadata(complete=True)
+        self._file.close()
+        self._index_file.close()
+        self._file = None
+        logger.info("Запись моделирования сохранена в %s (%d записей, %d шагов)",
+                    self.path, self._count, self._steps)
+
+    def __enter__(self) -> "Recorder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def last_frame(self) -> Optional[np.ndarray]:
+        """Записи последнего шага; это срез буфера, действительный до следующего шага"""
+        return self._last_frame
+
+    @property
+    def records_count(self) -> int:
+        return self._count + self._fill
+
+    def _write_metadata(self, complete: bool) -> None:
+        """Атомарно перезаписывает файл метаданных"""
+        metadata = {
+            'version': FORMAT_VERSION,
+            'dtype': np.lib.format.dtype_to_descr(RECORD_DTYPE),
+            'records': self._count,
+            'steps': self._steps,
+            'time_step': self._manager.time.get_dt(),
+            'start_time': self._start_time,
+            'end_time': self._end_time,
+            'type_names': TYPE_NAMES,
+            'status_names': STATUS_NAMES,
+            'launches': self._launches,
+            'complete': complete,
+        }
+        path = metadata_path(self.path)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(metadata, file, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+class RecordedRun:
+    """
+    Запись моделирования, открытая только для чтения.
+    Записи и индекс шагов отображаются в память и подгружаются с диска
+    по мере обращения, поэтому переход к любому шагу не требует чтения файла целиком
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: путь к файлу записи
+        :raises ValueError: если формат записи не поддерживается
+        """
+        self.path = path
+        with open(metadata_path(path), 'r', encoding='utf-8') as file:
+            self.metadata: Dict[str, Any] = json.load(file)
+        if self.metadata.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия записи {self.metadata.get('version')} в {path}")
+
+        count = self.metadata['records']
+        if count:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', shape=(count,))
+        else:
+            self.records = np.empty(0, dtype=RECORD_DTYPE)
+        self.index = self._load_index()
+
+    def _load_index(self) -> np.ndarray:
+        """
+        Индекс шагов из path.idx. Для незавершенной записи отбрасываются шаги,
+        записи которых еще не были сброшены в файл; если индекса нет,
+        он строится по столбцу времени
+        """
+        path = index_path(self.path)
+        entries = os.path.getsize(path) // INDEX_DTYPE.itemsize if os.path.exists(path) else 0
+        if entries:
+            index = np.memmap(path, dtype=INDEX_DTYPE, mode='r', shape=(entries,))
+            flushed = np.searchsorted(index['offset'] + index['count'], len(self.records), side='right')
+            return index[:flushed]
+        if os.path.exists(path) or len(self.records) == 0:
+            return np.empty(0, dtype=INDEX_DTYPE)
+
+        times, offsets, counts = np.unique(self.records['time'], return_index=True, return_counts=True)
+        index = np.empty(len(times), dtype=INDEX_DTYPE)
+        index['time'], index['offset'], index['count'] = times, offsets, counts
+        return index
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def steps_count(self) -> int:
+        return len(self.index)
+
+    def frame(self, step: int) -> np.ndarray:
+        """Записи шага с порядковым номером step (срез отображенного файла, O(1))"""
+        entry = self.index[step]
+        return self.records[entry['offset']:entry['offset'] + entry['count']]
+
+    def step_of(self, time: int) -> int:
+        """
+        Порядковый номер шага со временем time или ближайшего предыдущего.
+        При постоянном шаге номер вычисляется напрямую, иначе - бинарным поиском
+        """
+        times = self.index['time']
+        if len(times) == 0:
+            raise ValueError("Запись не содержит шагов")
+        step = int((time - times[0]) // self.metadata['time_step']) if self.metadata.get('time_step') else -1
+        if not (0 <= step < len(times) and times[step] == time):
+            step = int(np.searchsorted(times, time, side='right')) - 1
+        return min(max(step, 0), len(times) - 1)
+
+    @property
+    def complete(self) -> bool:
+        """Запись была корректно закрыта (иначе содержит данные до последнего сброса)"""
+        return bool(self.metadata.get('complete'))
+
+    @property
+    def launches(self) -> List[Dict[str, int]]:
+        """Пуски ЗУР: время, id ПУ, id ЗУР, id цели"""
+        return self.metadata['launches']
+
+    def times(self) -> np.ndarray:
+        """Времена записанных шагов, мс"""
+        return np.asarray(self.index['time'])
+
+    def at(self, time: int) -> np.ndarray:
+        """Записи шага со временем time (пустой срез, если такого шага нет)"""
+        if len(self.index) == 0:
+            return self.records[:0]
+        step = self.step_of(time)
+        if self.index['time'][step] != time:
+            return self.records[:0]
+        return self.frame(step)
+
+    def trajectory(self, obj_id: int) -> np.ndarray:
+        """Все записи объекта в порядке времени"""
+        return self.records[self.records['id'] == obj_id]
+
+    def type_name(self, code: int) -> str:
+        return self.metadata['type_names'][code]
+
+    def close(self) -> None:
+        self.records = np.empty(0, dtype=RECORD_DTYPE)
+        self.index = np.empty(0, dtype=INDEX_DTYPE)
+
+    def __enter__(self) -> "RecordedRun":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,78 @@
+import logging
+from typing import Optional
+
+import numpy as np
+
+from .Recorder import RecordedRun, MISSILE_TYPE_CODE
+
+logger = logging.getLogger(__name__)
+
+
+class Replay:
+    """
+    Воспроизведение записанного прогона без повторного моделирования.
+    Хранит только текущую позицию: кадр шага читается из отображенного файла
+    через индекс шагов, поэтому переход к любому шагу выполняется за O(1)
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: путь к файлу записи (см. modules.Recorder)
+        """
+        self.run = RecordedRun(path)
+        self.position = 0
+        logger.info("Открыта запись %s: %d шагов", path, len(self))
+
+    def __len__(self) -> int:
+        return self.run.steps_count
+
+    @property
+    def at_end(self) -> bool:
+        return self.position >= len(self) - 1
+
+    @property
+    def time(self) -> Optional[int]:
+        """Время текущего шага, мс"""
+        if len(self) == 0:
+            return None
+        return int(self.run.index['time'][self.position])
+
+    def frame(self) -> np.ndarray:
+        """Записи объектов на текущем шаге"""
+        return self.run.frame(self.position)
+
+    def seek(self, step: int) -> np.ndarray:
+        """
+        Переход к шагу с порядковым номером step (с ограничением по границам записи)
+
+        :return: кадр нового шага
+        """
+        if len(self) == 0:
+            raise ValueError("Запись не содержит шагов")
+        self.position = min(max(int(step), 0), len(self) - 1)
+        return self.frame()
+
+    def seek_time(self, time: int) -> np.ndarray:
+        """Переход к шагу со временем time или ближайшему предыдущему"""
+        return self.seek(self.run.step_of(time))
+
+    def advance(self, steps: int = 1) -> Optional[np.ndarray]:
+        """
+        Сдвиг на steps шагов вперед (или назад при отрицательном значении)
+
+        :return: кадр нового шага или None, если запись закончилась
+        """
+        if len(self) == 0 or (steps > 0 and self.at_end):
+            return None
+        return self.seek(self.position + steps)
+
+    @staticmethod
+    def is_missile(record) -> bool:
+        return int(record['type']) == MISSILE_TYPE_CODE
+
+    def type_name(self, record) -> str:
+        """Имя типа объекта записи (TargetType.name или 'MISSILE')"""
+        return self.run.type_name(int(record['type']))
+
+    def close(self) -> None:
+        self.run.close()
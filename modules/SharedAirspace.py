@@ -0,0 +1,172 @@
+"""
+Общая память воздушной обстановки для МФР в отдельных процессах.
+
+Координаты объектов ВО шага публикуются в блоке multiprocessing.shared_memory
+с двойной буферизацией: шаг с версией v пишется в буфер v % 2, версия буфера
+выставляется после записи координат, поэтому читатель может проверить, что
+буфер не перезаписан. Процессы-обработчики подключаются к блоку один раз
+и получают на шаге только параметры секторов, а возвращают индексы
+обнаруженных объектов - объем обмена пропорционален числу обнаружений,
+а не числу объектов ВО
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .Radar import SectorRadar, sector_visible
+from .TargetStore import object_positions
+
+logger = logging.getLogger(__name__)
+
+HEADER_SIZE = 2 * 2 * 8  # для каждого из двух буферов: версия и число объектов (int64)
+NOT_PUBLISHED = -1
+
+
+class SharedAirspace:
+    """Двойной буфер координат объектов ВО в общей памяти"""
+
+    def __init__(self, capacity: int, name: Optional[str] = None) -> None:
+        """
+        :param capacity: максимальное число объектов в буфере
+        :param name: имя существующего блока для подключения (None - создать новый)
+        """
+        if capacity <= 0:
+            raise ValueError("Емкость общей памяти ВО должна быть положительной")
+        self.capacity = capacity
+        self._owner = name is None
+        size = HEADER_SIZE + 2 * capacity * 3 * 8
+        self._shm = shared_memory.SharedMemory(name=name, create=self._owner, size=size if self._owner else 0)
+        self._header = np.ndarray((2, 2), dtype=np.int64, buffer=self._shm.buf)  # [буфер, (версия, число)]
+        self._positions = np.ndarray((2, capacity, 3), dtype=np.float64, buffer=self._shm.buf, offset=HEADER_SIZE)
+        if self._owner:
+            self._header[:, 0] = NOT_PUBLISHED
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def publish(self, version: int, positions: np.ndarray) -> None:
+        """Записывает координаты шага с версией version в очередной буфер"""
+        count = len(positions)
+        if count > self.capacity:
+            raise ValueError(f"Объектов ВО больше емкости общей памяти: {count} > {self.capacity}")
+        slot = version % 2
+        self._header[slot, 0] = NOT_PUBLISHED
+        self._positions[slot, :count] = positions
+        self._header[slot, 1] = count
+        self._header[slot, 0] = version
+
+    def read(self, version: int) -> np.ndarray:
+        """
+        Координаты шага version (представление буфера без копирования)
+
+        :raises ValueError: если буфер уже содержит другой шаг
+        """
+        slot = version % 2
+        if self._header[slot, 0] != version:
+            raise ValueError(f"Шаг {version} отсутствует в общей памяти ВО")
+        return self._positions[slot, :self._header[slot, 1]]
+
+    def is_current(self, version: int) -> bool:
+        """Буфер шага version не перезаписан (проверка после чтения)"""
+        return self._header[version % 2, 0] == version
+
+    def close(self) -> None:
+        # Представления буфера должны быть освобождены до закрытия блока
+        self._header = None
+        self._positions = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+# Подключения процесса-обработчика: {имя блока: SharedAirspace}
+_attached: Dict[str, SharedAirspace] = {}
+
+
+def _detect(name: str, capacity: int, version: int, sectors: List[Tuple]) -> List[np.ndarray]:
+    """Обнаружение в процессе-обработчике: индексы видимых объектов для каждого сектора"""
+    airspace = _attached.get(name)
+    if airspace is None:
+        # Блок пересоздается при росте числа объектов - старые подключения закрываются
+        for old in _attached.values():
+            old.close()
+        _attached.clear()
+        airspace = _attached[name] = SharedAirspace(capacity, name=name)
+
+    positions = airspace.read(version)
+    detections = [sector_visible(positions, sector).astype(np.int32) for sector in sectors]
+    if not airspace.is_current(version):
+        raise RuntimeError(f"Шаг {version} перезаписан во время обнаружения")
+    return detections
+
+
+class RadarProcessPool:
+    """
+    Подготовка МФР фазы в пуле процессов (Manager.prepare_pool): координаты ВО
+    публикуются в SharedAirspace один раз на шаг, процессы считают обнаружения
+    по группам МФР, результаты передаются МФР через SectorRadar.set_detections()
+    """
+
+    def __init__(self, processes: Optional[int] = None, capacity: int = 1024, start_method: str = 'spawn') -> None:
+        """
+        :param processes: число процессов (по умолчанию - число процессоров)
+        :param capacity: начальная емкость общей памяти (растет по мере необходимости)
+        :param start_method: способ запуска процессов multiprocessing
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.owner_pid = os.getpid()
+        self._capacity = capacity
+        self._executor = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context(start_method))
+        self._airspace: Optional[SharedAirspace] = None
+        self._version = 0
+
+    def prepare(self, modules: List) -> None:
+        """prepare() модулей фазы: МФР - в процессах, остальные - в текущем процессе"""
+        radars = [module for module in modules if isinstance(module, SectorRadar)]
+        for module in modules:
+            if not isinstance(module, SectorRadar):
+                module.prepare()
+        if not radars:
+            return
+
+        objects = radars[0].active_objects()
+        positions = object_positions(objects)
+        airspace = self._ensure_capacity(len(positions))
+        self._version += 1
+        airspace.publish(self._version, positions)
+
+        groups = [radars[i::self.processes] for i in range(min(self.processes, len(radars)))]
+        futures = [self._executor.submit(_detect, airspace.name, airspace.capacity, self._version,
+                                         [radar.sector() for radar in group])
+                   for group in groups]
+        for group, future in zip(groups, futures):
+            for radar, visible in zip(group, future.result()):
+                radar.set_detections(objects, positions, visible)
+
+    def _ensure_capacity(self, count: int) -> SharedAirspace:
+        if self._airspace is None or count > self._airspace.capacity:
+            capacity = max(self._capacity, count)
+            if self._airspace is not None:
+                self._airspace.close()
+                capacity = max(capacity, 2 * self._airspace.capacity)
+            self._airspace = SharedAirspace(capacity)
+            logger.info("Общая память ВО %s на %d объектов", self._airspace.name, capacity)
+        return self._airspace
+
+    def close(self) -> None:
+        self._executor.shutdown()
+        if self._airspace is not None:
+            self._airspace.close()
+            self._airspace = None
+
+    def __enter__(self) -> "RadarProcessPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
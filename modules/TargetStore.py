@@ -0,0 +1,272 @@
+from collections.abc import Sequence
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+from .AirObject import AirObject, Trajectory
+from .BaseModel import BaseModel
+from .utils import Target, TargetType, TARGET_TYPES
+
+
+def _frozen(array: np.ndarray) -> np.ndarray:
+    """Помечает массив шага как доступный только для чтения"""
+    array.flags.writeable = False
+    return array
+
+
+class TargetStore:
+    """
+    Компактное хранилище целей ВО: столбцы NumPy вместо отдельных объектов Target.
+    Координаты всех целей пересчитываются одной векторной операцией на шаг,
+    объект Target (TargetView) создается только при обращении к конкретной строке.
+
+    Массивы координат шага после публикации не изменяются (доступны только для чтения):
+    step() создает новые массивы, запись координат отдельной цели копирует массив.
+    Поэтому сообщения прошлых шагов ссылаются на координаты своего шага без копирования
+    """
+
+    def __init__(self, manager) -> None:
+        self._manager = manager
+        self.ids = np.empty(0, dtype=np.int64)
+        self.types = np.empty(0, dtype=np.uint8)
+        self.start_pos = np.empty((0, 3), dtype=np.float64)
+        self.velocities = np.empty((0, 3), dtype=np.float64)
+        self.start_times = np.empty(0, dtype=np.float64)
+        self.speeds = np.empty(0, dtype=np.float64)
+        self.alive = np.empty(0, dtype=bool)
+
+        self.positions = np.empty((0, 3), dtype=np.float64)
+        self.prev_positions = np.empty((0, 3), dtype=np.float64)
+        self.prev_valid = np.empty(0, dtype=bool)
+        self.time: Optional[float] = None  # время последнего пересчета координат, с
+
+        self._rows: Dict[int, int] = {}  # id цели -> строка
+        self._views: Dict[int, "TargetView"] = {}  # строка -> созданный объект
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, ids, types, positions, velocities, start_times=None) -> None:
+        """
+        Добавляет пачку целей
+
+        :param ids: id целей, shape (N,)
+        :param types: коды типов (индексы TARGET_TYPES) или TargetType, shape (N,)
+        :param positions: координаты в момент старта, shape (N, 3)
+        :param velocities: векторы скорости, shape (N, 3)
+        :param start_times: время появления целей в ВО в секундах (по умолчанию 0)
+        """
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        n = len(ids)
+        if isinstance(types, (list, tuple)) and types and isinstance(types[0], TargetType):
+            types = [TARGET_TYPES.index(target_type) for target_type in types]
+        types = np.broadcast_to(np.asarray(types, dtype=np.uint8), (n,))
+        positions = np.asarray(positions, dtype=np.float64).reshape(n, 3)
+        velocities = np.asarray(velocities, dtype=np.float64).reshape(n, 3)
+        start_times = np.broadcast_to(
+            np.asarray(0.0 if start_times is None else start_times, dtype=np.float64), (n,))
+
+        duplicates = [int(target_id) for target_id in ids if int(target_id) in self._rows]
+        if duplicates or len(np.unique(ids)) != n:
+            raise ValueError(f"Цели с такими id уже есть в воздушной обстановке: {duplicates or 'повтор в пачке'}")
+
+        first_row = len(self.ids)
+        self.ids = np.concatenate([self.ids, ids])
+        self.types = np.concatenate([self.types, types])
+        self.start_pos = np.concatenate([self.start_pos, positions])
+        self.velocities = np.concatenate([self.velocities, velocities])
+        self.start_times = np.concatenate([self.start_times, start_times])
+        self.speeds = np.concatenate([self.speeds, np.sqrt(np.einsum('ij,ij->i', velocities, velocities))])
+        self.alive = np.concatenate([self.alive, np.ones(n, dtype=bool)])
+        self.positions = np.concatenate([self.positions, positions])
+        self.prev_positions = np.concatenate([self.prev_positions, positions])
+        self.prev_valid = np.concatenate([self.prev_valid, np.zeros(n, dtype=bool)])
+        self._rows.update(zip(ids.tolist(), range(first_row, first_row + n)))
+
+    def remove(self, ids) -> None:
+        """Исключает цели из ВО (например, после поражения)"""
+        for target_id in ids:
+            row = self._rows.get(target_id)
+            if row is not None:
+                self.alive[row] = False
+
+    def step(self, time: float) -> None:
+        """
+        Пересчитывает координаты всех целей на момент time (секунды).
+        Массив координат создается заново, поэтому ранее выданные срезы
+        сохраняют значения своего шага
+        """
+        self.prev_positions = self.positions
+        self.prev_valid = _frozen(self.start_times != time)
+        self.positions = _frozen(self.start_pos + self.velocities * (time - self.start_times)[:, None])
+        self.time = time
+
+    def set_position(self, row: int, position: np.ndarray, previous: bool = False) -> None:
+        """
+        Записывает координаты цели с копированием массива шага: опубликованные
+        снимки (ActiveObjects прошлых сообщений) остаются неизменными
+        """
+        positions = (self.prev_positions if previous else self.positions).copy()
+        positions[row] = position
+        if previous:
+            self.prev_positions = _frozen(positions)
+        else:
+            self.positions = _frozen(positions)
+
+    def active_rows(self) -> np.ndarray:
+        """Строки целей, которые находятся в ВО на текущий момент"""
+        if self.time is None:
+            return np.flatnonzero(self.alive)
+        return np.flatnonzero(self.alive & (self.start_times <= self.time))
+
+    def row_of(self, target_id: int) -> Optional[int]:
+        return self._rows.get(target_id)
+
+    def view(self, row: int) -> "TargetView":
+        """Объект цели для строки (создается при первом обращении и переиспользуется)"""
+        view = self._views.get(row)
+        if view is None:
+            view = TargetView(self._manager, self, row)
+            self._views[row] = view
+        return view
+
+
+class TargetView(Target):
+    """
+    Легковесный объект цели поверх строки TargetStore: координаты, скорость
+    и тип читаются из хранилища, шаг выполняет само хранилище
+    """
+
+    def __init__(self, manager, store: TargetStore, row: int) -> None:
+        BaseModel.__init__(self, manager, int(store.ids[row]), None)
+        self._store = store
+        self._row = row
+
+    @property
+    def type(self) -> TargetType:
+        return TARGET_TYPES[self._store.types[self._row]]
+
+    @property
+    def pos(self) -> np.ndarray:
+        return self._store.positions[self._row]
+
+    @pos.setter
+    def pos(self, new_pos: np.ndarray) -> None:
+        self._store.set_position(self._row, new_pos)
+
+    @property
+    def prev_pos(self) -> Optional[np.ndarray]:
+        if not self._store.prev_valid[self._row]:
+            return None
+        return self._store.prev_positions[self._row]
+
+    @prev_pos.setter
+    def prev_pos(self, new_prev_pos: Optional[np.ndarray]) -> None:
+        prev_valid = self._store.prev_valid.copy()
+        prev_valid[self._row] = new_prev_pos is not None
+        if new_prev_pos is not None:
+            self._store.set_position(self._row, new_prev_pos, previous=True)
+        self._store.prev_valid = _frozen(prev_valid)
+
+    @property
+    def speed_mod(self) -> float:
+        return float(self._store.speeds[self._row])
+
+    @property
+    def velocity(self) -> np.ndarray:
+        speed = self._store.speeds[self._row]
+        velocity = self._store.velocities[self._row]
+        return velocity / speed if speed > 0 else np.zeros(3)
+
+    @property
+    def trajectory(self) -> Trajectory:
+        return Trajectory(
+            velocity=self._store.velocities[self._row],
+            start_pos=self._store.start_pos[self._row],
+            start_time=float(self._store.start_times[self._row])
+        )
+
+    def step(self) -> None:
+        pass
+
+
+class ActiveObjects(Sequence):
+    """
+    Список активных объектов ВО на шаге: строки хранилища целей и отдельные
+    объекты (ракеты, цели, добавленные через add_target). Объекты создаются
+    только при индексации, для векторных расчетов есть ids и positions.
+
+    ids, positions и rows() - неизменяемый снимок шага, на котором создан список:
+    запоминаются ссылки на массивы хранилища этого шага (без копирования).
+    Индексация возвращает сами объекты ВО - их состояние соответствует текущему шагу
+    """
+
+    def __init__(self, store: TargetStore, rows: np.ndarray, objects: List[AirObject]) -> None:
+        self._store = store
+        self._rows = rows
+        self._objects = objects
+        # Снимок шага: массивы хранилища не изменяются после публикации,
+        # координаты ракет - новые массивы на каждом шаге (AirObject.step)
+        self._ids = store.ids
+        self._types = store.types
+        self._positions = store.positions
+        self._object_ids = [obj.id for obj in objects]
+        self._object_positions = [obj.pos for obj in objects]
+
+    def __len__(self) -> int:
+        return len(self._rows) + len(self._objects)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < len(self._rows):
+            return self._store.view(int(self._rows[index]))
+        return self._objects[index - len(self._rows)]
+
+    def __iter__(self) -> Iterator[AirObject]:
+        for row in self._rows.tolist():
+            yield self._store.view(row)
+        yield from self._objects
+
+    @property
+    def ids(self) -> np.ndarray:
+        return np.concatenate([self._ids[self._rows], np.array(self._object_ids, dtype=np.int64)])
+
+    @property
+    def positions(self) -> np.ndarray:
+        """Координаты всех объектов на шаге списка (копия), shape (N, 3)"""
+        object_positions = np.array(self._object_positions, dtype=np.float64).reshape(-1, 3)
+        return np.concatenate([self._positions[self._rows], object_positions])
+
+    def type_codes(self, missile_code: int) -> np.ndarray:
+        """Коды типов объектов (индексы TARGET_TYPES), для ракет - missile_code"""
+        object_codes = [TARGET_TYPES.index(obj.type) if isinstance(obj, Target) else missile_code
+                        for obj in self._objects]
+        return np.concatenate([self._types[self._rows].astype(np.int64),
+                               np.array(object_codes, dtype=np.int64)])
+
+    def select(self, indices) -> List[AirObject]:
+        """Объекты по индексам (создаются только выбранные)"""
+        return [self[int(i)] for i in indices]
+
+    def rows(self) -> Iterator[Tuple[int, object, np.ndarray]]:
+        """(id, тип, координаты) каждого объекта без создания объектов целей; тип ракеты - 'ЗУР'"""
+        for row in self._rows.tolist():
+            yield int(self._ids[row]), TARGET_TYPES[self._types[row]], self._positions[row]
+        for obj, position in zip(self._objects, self._object_positions):
+            yield obj.id, obj.type if isinstance(obj, Target) else 'ЗУР', position
+
+
+def object_rows(objects) -> Iterator[Tuple[int, object, np.ndarray]]:
+    """(id, тип, координаты) для ActiveObjects или обычного списка объектов"""
+    if isinstance(objects, ActiveObjects):
+        return objects.rows()
+    return ((obj.id, obj.type if isinstance(obj, Target) else 'ЗУР', obj.pos) for obj in objects)
+
+
+def object_positions(objects) -> np.ndarray:
+    """Координаты объектов в виде массива (N, 3)"""
+    if isinstance(objects, ActiveObjects):
+        return objects.positions
+    return np.array([obj.pos for obj in objects], dtype=np.float64).reshape(-1, 3)
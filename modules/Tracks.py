@@ -0,0 +1,275 @@
+"""
+Трассы ПБУ: прогноз на текущий шаг и оценка фильтром Калмана.
+
+Состояние всех трасс (целей и ЗУР) собирается в массивы один раз за шаг (advance),
+после чего завязка трасс (CombatControlPoint.link_object) выполняется одной
+векторной проверкой по всем трассам.
+
+Координаты и скорости трасс оцениваются банком фильтров Калмана с моделью
+постоянной скорости (KalmanBank): состояния и ковариации всех трасс хранятся
+в общих массивах, прогноз выполняется для всех трасс в advance, а измерения МФР
+шага накапливаются (measure) и применяются одним пакетным обновлением (update).
+Наведение ЗУР получает отфильтрованную оценку (TrackState), а не зашумленные
+измерения МФР
+"""
+import logging
+from typing import Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .constants import POSSIBLE_TARGET_RADIUS
+
+logger = logging.getLogger(__name__)
+
+TARGET_TRACK = 0
+MISSILE_TRACK = 1
+
+MEASUREMENT_ERROR = 5.0  # СКО измерения координат МФР, м (см. SectorRadar.smooth_objects)
+PROCESS_NOISE = 10.0  # СКО неучтенного ускорения цели, м/с^2
+VELOCITY_ERROR = 1000.0  # СКО скорости новой трассы, м/с: скорость неизвестна до второго измерения
+
+
+class TrackState(NamedTuple):
+    """
+    Оценка трассы на момент time. Поля pos, velocity (единичный вектор) и speed_mod
+    совпадают с AirObject, поэтому оценку можно передавать в расчет перехвата вместо цели
+    """
+    id: int
+    pos: np.ndarray
+    velocity: np.ndarray
+    speed_mod: float
+    covariance: np.ndarray  # ковариация ошибки координат, 3x3
+    time: float  # время оценки, с
+
+    def at(self, time: float) -> "TrackState":
+        """Оценка, экстраполированная с постоянной скоростью на время time (с)"""
+        return self._replace(pos=self.pos + self.velocity * (self.speed_mod * (time - self.time)), time=time)
+
+
+class KalmanBank:
+    """
+    Банк фильтров Калмана с постоянной скоростью.
+    Строка массивов - одна трасса: состояние [x, y, z, vx, vy, vz] и ковариация 6x6
+    """
+
+    def __init__(self, capacity: int = 64, measurement_error: float = MEASUREMENT_ERROR,
+                 process_noise: float = PROCESS_NOISE, velocity_error: float = VELOCITY_ERROR) -> None:
+        """
+        :param capacity: начальное число строк (растет по мере необходимости)
+        :param measurement_error: СКО измерения координат, м
+        :param process_noise: спектральная плотность неучтенного ускорения, м/с^2
+        :param velocity_error: СКО скорости новой трассы, м/с
+        """
+        if capacity <= 0:
+            raise ValueError("Емкость банка фильтров должна быть положительной")
+        self.measurement_error = measurement_error
+        self.process_noise = process_noise
+        self.velocity_error = velocity_error
+        self._rows: Dict[Hashable, int] = {}
+        self._free: List[int] = list(range(capacity - 1, -1, -1))  # свободные строки, pop() - меньшая
+        self.state = np.zeros((capacity, 6))
+        self.covariance = np.zeros((capacity, 6, 6))
+        self.time = np.zeros(capacity)
+        self._used = np.zeros(capacity, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rows
+
+    def keys(self):
+        return self._rows.keys()
+
+    def add(self, key: Hashable, pos: np.ndarray, time: float) -> None:
+        """
+        Начинает (или начинает заново) фильтрацию трассы с измерения pos.
+        Скорость оценивается только по измерениям: начальная оценка нулевая с СКО velocity_error
+        """
+        row = self._rows.get(key)
+        if row is None:
+            row = self._free.pop() if self._free else self._grow()
+            self._rows[key] = row
+            self._used[row] = True
+        self.state[row, :3] = pos
+        self.state[row, 3:] = 0
+        self.covariance[row] = np.diag([self.measurement_error ** 2] * 3 + [self.velocity_error ** 2] * 3)
+        self.time[row] = time
+
+    def remove(self, key: Hashable) -> None:
+        row = self._rows.pop(key, None)
+        if row is not None:
+            self._used[row] = False
+            self._free.append(row)
+
+    def _grow(self) -> int:
+        capacity = len(self.time)
+        self.state = np.concatenate([self.state, np.zeros((capacity, 6))])
+        self.covariance = np.concatenate([self.covariance, np.zeros((capacity, 6, 6))])
+        self.time = np.concatenate([self.time, np.zeros(capacity)])
+        self._used = np.concatenate([self._used, np.zeros(capacity, dtype=bool)])
+        self._free = list(range(2 * capacity - 1, capacity, -1)) + self._free
+        return capacity
+
+    def predict(self, time: float) -> None:
+        """Прогноз всех трасс на время time (с)"""
+        rows = np.flatnonzero(self._used)
+        if not len(rows):
+            return
+        dt = (time - self.time[rows])[:, None, None]
+        state = self.state[rows]
+        state[:, :3] += dt[:, :, 0] * state[:, 3:]
+        # F P F^T по блокам 3x3 для F = [[I, dt I], [0, I]]
+        cov = self.covariance[rows]
+        pp, pv, vv = cov[:, :3, :3], cov[:, :3, 3:], cov[:, 3:, 3:]
+        pp_new = pp + dt * (pv + pv.transpose(0, 2, 1)) + dt ** 2 * vv
+        pv_new = pv + dt * vv
+        # Шум процесса - непрерывное белое ускорение
+        eye = np.eye(3)
+        q = self.process_noise ** 2
+        cov[:, :3, :3] = pp_new + q * dt ** 3 / 3 * eye
+        cov[:, :3, 3:] = pv_new + q * dt ** 2 / 2 * eye
+        cov[:, 3:, :3] = cov[:, :3, 3:].transpose(0, 2, 1)
+        cov[:, 3:, 3:] = vv + q * dt * eye
+        self.state[rows] = state
+        self.covariance[rows] = cov
+        self.time[rows] = time
+
+    def update(self, keys: List[Hashable], positions: np.ndarray) -> None:
+        """
+        Пакетное обновление трасс keys измерениями координат positions, shape (N, 3).
+        Трассы должны быть спрогнозированы на время измерения (predict)
+        """
+        if not keys:
+            return
+        rows = np.fromiter((self._rows[key] for key in keys), dtype=np.intp, count=len(keys))
+        state = self.state[rows]
+        cov = self.covariance[rows]
+        innovation = np.asarray(positions, dtype=np.float64).reshape(-1, 3) - state[:, :3]
+        innovation_cov = cov[:, :3, :3] + self.measurement_error ** 2 * np.eye(3)
+        # K^T = S^-1 H P (S и P симметричны)
+        gain = np.linalg.solve(innovation_cov, cov[:, :3, :]).transpose(0, 2, 1)
+        state += np.einsum('nij,nj->ni', gain, innovation)
+        cov -= gain @ cov[:, :3, :]
+        self.state[rows] = state
+        self.covariance[rows] = (cov + cov.transpose(0, 2, 1)) / 2
+
+    def get(self, key: Hashable) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Состояние и ковариация трассы (копии) или None"""
+        row = self._rows.get(key)
+        if row is None:
+            return None
+        return self.state[row].copy(), self.covariance[row].copy()
+
+
+class TrackCache:
+    """Трассы ПБУ: массивы для завязки, пересчитываемые раз в шаг, и банк фильтров Калмана"""
+
+    def __init__(self) -> None:
+        self.time: Optional[float] = None
+        self.filters = KalmanBank()
+        self._pending: Dict[Tuple[int, int], np.ndarray] = {}
+        self._index: Dict[Tuple[int, int], int] = {}
+        self._kinds = np.empty(0, dtype=np.int8)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._gate_pos = np.empty((0, 3))
+        self._upd_time = np.empty(0)
+        self._active = np.empty(0, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def advance(self, time: float, targets: Dict, missiles: Dict) -> None:
+        """
+        Переход к шагу time (с): массивы трасс для завязки и прогноз фильтров.
+        Фильтры удаленных трасс удаляются, для трасс без фильтра (например, запущенных ЗУР)
+        фильтр начинается с их последнего положения без оценки скорости
+
+        :param targets: трассы целей ПБУ {id: TargetCCP}
+        :param missiles: трассы ЗУР ПБУ {id: MissileCCP}
+        """
+        rows = []
+        for target_id, target_ccp in targets.items():
+            target = target_ccp.target
+            prev_pos = target.prev_pos if target.prev_pos is not None else target.pos
+            rows.append((TARGET_TRACK, target_id, prev_pos, target_ccp.pos, target_ccp.upd_time))
+        for missile_id, missile_ccp in missiles.items():
+            missile = missile_ccp.missile
+            prev_pos = missile.prev_pos if missile.prev_pos is not None else missile.pos
+            rows.append((MISSILE_TRACK, missile_id, prev_pos, missile.pos, missile_ccp.upd_time))
+
+        self.time = time
+        self._pending.clear()
+        self._index = {(kind, track_id): i for i, (kind, track_id, *_) in enumerate(rows)}
+        count = len(rows)
+        self._kinds = np.fromiter((row[0] for row in rows), dtype=np.int8, count=count)
+        self._ids = np.fromiter((row[1] for row in rows), dtype=np.int64, count=count)
+        # Завязка по кольцу вокруг предыдущего положения объекта (как в link_object)
+        self._gate_pos = np.array([row[2] for row in rows], dtype=np.float64).reshape(-1, 3)
+        self._upd_time = np.fromiter((row[4] for row in rows), dtype=np.float64, count=count)
+        # Трассы, обновленные на этом шаге, в завязке не участвуют
+        self._active = self._upd_time != time
+
+        for key in [key for key in self.filters.keys() if key not in self._index]:
+            self.filters.remove(key)
+        for kind, track_id, _, pos, upd_time in rows:
+            if (kind, track_id) not in self.filters:
+                self.filters.add((kind, track_id), pos, upd_time)
+        self.filters.predict(time)
+
+    def associate(self, detected_pos: np.ndarray, speed: float, sim_step: float) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Ближайшая трасса, в кольцо допустимых расстояний которой попадает обнаружение.
+        При равных расстояниях предпочтение - трассам целей и более ранним трассам
+
+        :param detected_pos: измеренные координаты
+        :param speed: скорость обнаруженного объекта, м/с
+        :param sim_step: шаг моделирования, с
+        :return: (вид трассы, id) или (None, None)
+        """
+        if not self._active.any():
+            return None, None
+        elapsed = self.time - self._upd_time
+        min_range = np.maximum(0, speed * (elapsed - POSSIBLE_TARGET_RADIUS * sim_step))
+        max_range = np.maximum(0, speed * (elapsed + POSSIBLE_TARGET_RADIUS * sim_step))
+        delta = self._gate_pos - detected_pos
+        distance = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+        gated = self._active & (min_range <= distance) & (distance <= max_range)
+        if not gated.any():
+            return None, None
+        best = int(np.argmin(np.where(gated, distance, np.inf)))
+        return int(self._kinds[best]), int(self._ids[best])
+
+    def touch(self, kind: int, track_id: int) -> None:
+        """Трасса обновлена на текущем шаге - исключается из дальнейшей завязки"""
+        index = self._index.get((kind, track_id))
+        if index is not None:
+            self._active[index] = False
+
+    def start(self, kind: int, track_id: int, pos: np.ndarray) -> None:
+        """Начинает фильтр новой трассы (или заново - для трассы с тем же id) с измерения pos"""
+        if self.time is None:
+            return  # до первого шага фильтр начнется в advance
+        self._pending.pop((kind, track_id), None)
+        self.filters.add((kind, track_id), pos, self.time)
+
+    def measure(self, kind: int, track_id: int, pos: np.ndarray) -> None:
+        """Измерение трассы на текущем шаге; применяется в update()"""
+        self._pending[(kind, track_id)] = pos
+
+    def update(self) -> None:
+        """Пакетное обновление фильтров измерениями шага"""
+        keys = [key for key in self._pending if key in self.filters]
+        if keys:
+            self.filters.update(keys, np.array([self._pending[key] for key in keys], dtype=np.float64))
+        self._pending.clear()
+
+    def state(self, kind: int, track_id: int) -> Optional[TrackState]:
+        """Оценка трассы фильтром на текущий шаг (None, если фильтра трассы нет)"""
+        estimate = self.filters.get((kind, track_id))
+        if estimate is None:
+            return None
+        state, covariance = estimate
+        speed = float(np.linalg.norm(state[3:]))
+        velocity = state[3:] / speed if speed > 0 else np.zeros(3)
+        return TrackState(track_id, state[:3], velocity, speed, covariance[:3, :3], self.time)
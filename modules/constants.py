@@ -36,3 +36,4 @@ TARGET_TYPE_DRAWER = 1
 CCP_ID = 0
 DRAWER_ID = 1
 MANAGER_ID = 2
+RECORDER_ID = -1  # служебный модуль, не пересекается с id объектов сценария
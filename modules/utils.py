@@ -1,4 +1,6 @@
+from dataclasses import dataclass
 from enum import Enum
+from typing import Any, Dict, List
 from .AirObject import AirObject
 import numpy as np
 from .Manager import Manager
@@ -44,16 +46,62 @@ class Target(AirObject):
         
         :return: строка, содержащая информацию о цели
         """
-        position_str = f"[{', '.join(f'{coord:.2f}' for coord in self.pos)}]"
-        
+        position_str = _format_vector(self.pos)
+
         # Получаем скорость из траектории, если она существует
-        if hasattr(self, 'trajectory') and self.trajectory is not None:
-            velocity = self.trajectory.velocity
-            velocity_str = f"[{', '.join(f'{vel:.2f}' for vel in velocity)}]"
+        if getattr(self, 'trajectory', None) is not None:
+            velocity_str = _format_vector(self.trajectory.velocity)
         else:
             velocity_str = "[unknown]"
-            
-        return f"Target(id={self.id}, type={self.__type.name}, pos={position_str}, vel={velocity_str}, prev_pos={self.prev_pos})"
+
+        return "Target(id=%s, type=%s, pos=%s, vel=%s, prev_pos=%s)" % (
+            self.id, self.type.name, position_str, velocity_str, self.prev_pos)
+
+
+def _format_vector(vector) -> str:
+    """Форматирует вектор координат с точностью до сотых одной операцией"""
+    return "[" + ", ".join(["%.2f"] * len(vector)) % tuple(vector) + "]"
+
+TARGET_TYPES = list(TargetType)  # код типа цели в таблицах - индекс в этом списке
+
+
+@dataclass
+class TargetTable:
+    """
+    Таблица целей в виде столбцов NumPy (структура массивов) вместо списка словарей конфига
+
+    :param ids: id целей, shape (N,)
+    :param types: коды типов целей (индексы TARGET_TYPES), shape (N,)
+    :param positions: начальные координаты, shape (N, 3)
+    :param velocities: векторы скорости, shape (N, 3)
+    """
+    ids: np.ndarray
+    types: np.ndarray
+    positions: np.ndarray
+    velocities: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> "TargetTable":
+        """Собирает таблицу из списка целей в формате конфига"""
+        codes = {target_type.name: code for code, target_type in enumerate(TARGET_TYPES)}
+        return cls(
+            ids=np.array([record['id'] for record in records], dtype=np.int64),
+            types=np.array([codes[record['type']] for record in records], dtype=np.uint8),
+            positions=np.array([record['position'] for record in records], dtype=np.float64).reshape(-1, 3),
+            velocities=np.array([record['velocity'] for record in records], dtype=np.float64).reshape(-1, 3),
+        )
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Обратное преобразование в список целей формата конфига"""
+        return [
+            {'id': int(target_id), 'type': TARGET_TYPES[code].name, 'position': position, 'velocity': velocity}
+            for target_id, code, position, velocity
+            in zip(self.ids, self.types, self.positions.tolist(), self.velocities.tolist())
+        ]
+
 
 def to_seconds(time: int) -> float:
         """Преобразование времени в секунды"""
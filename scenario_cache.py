@@ -0,0 +1,159 @@
+"""
+Быстрая загрузка сценариев: C-загрузчик YAML и кэш скомпилированных сценариев.
+
+Скомпилированный сценарий - это проверенный конфиг, в котором список целей заменен
+на TargetTable (столбцы NumPy). Он сохраняется в .npz рядом с конфигом в каталоге
+.scenario_cache под именем, равным SHA-256 содержимого файла, поэтому любое изменение
+конфига автоматически дает промах кэша, а повторный запуск не разбирает YAML вовсе.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import zipfile
+from typing import Any, Dict, Optional
+
+import numpy as np
+import yaml
+
+from modules.utils import TargetTable, TargetType
+
+try:
+    from yaml import CSafeLoader as YamlLoader  # libyaml, на порядок быстрее чистого Python
+except ImportError:  # PyYAML собран без libyaml
+    from yaml import SafeLoader as YamlLoader
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_NAME = '.scenario_cache'
+CACHE_VERSION = 1
+
+REQUIRED_SECTIONS = ('simulation', 'air_environment')
+REQUIRED_KEYS = {
+    'simulation': ('time_step', 'duration'),
+    'air_environment': ('id', 'position'),
+}
+TARGET_KEYS = ('id', 'type', 'position', 'velocity')
+
+
+def validate_config(config: Dict[str, Any]) -> None:
+    """
+    Проверяет структуру конфига сценария
+
+    :raises ValueError: при отсутствии обязательных полей, неизвестном типе цели,
+        неверной размерности координат или повторяющихся id
+    """
+    if not isinstance(config, dict):
+        raise ValueError("Конфиг сценария должен быть словарем")
+    for section in REQUIRED_SECTIONS:
+        if section not in config:
+            raise ValueError(f"В конфиге нет секции '{section}'")
+        for key in REQUIRED_KEYS[section]:
+            if key not in config[section]:
+                raise ValueError(f"В секции '{section}' нет поля '{key}'")
+
+    targets = config['air_environment'].get('targets') or []
+    if isinstance(targets, TargetTable):
+        return
+    type_names = {target_type.name for target_type in TargetType}
+    for target in targets:
+        missing = [key for key in TARGET_KEYS if key not in target]
+        if missing:
+            raise ValueError(f"У цели {target.get('id')} нет полей {missing}")
+        if target['type'] not in type_names:
+            raise ValueError(f"Неизвестный тип цели {target['type']} (id {target['id']})")
+        if len(target['position']) != 3 or len(target['velocity']) != 3:
+            raise ValueError(f"У цели {target['id']} координаты и скорость должны быть трехмерными")
+
+    ids = [target['id'] for target in targets]
+    ids += [radar['id'] for radar in config.get('radars', [])]
+    ids += [launcher['id'] for launcher in config.get('missile_launchers', [])]
+    if len(ids) != len(set(ids)):
+        raise ValueError("В конфиге есть повторяющиеся id объектов")
+
+
+def compile_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Проверяет конфиг и заменяет список целей на TargetTable.
+    Исходный словарь не изменяется
+    """
+    validate_config(config)
+    targets = config['air_environment'].get('targets') or []
+    if not isinstance(targets, TargetTable):
+        targets = TargetTable.from_records(targets)
+    compiled = dict(config)
+    compiled['air_environment'] = dict(config['air_environment'], targets=targets)
+    return compiled
+
+
+def save_compiled(path: str, compiled: Dict[str, Any]) -> None:
+    """Атомарно сохраняет скомпилированный сценарий в .npz"""
+    table: TargetTable = compiled['air_environment']['targets']
+    rest = dict(compiled)
+    rest['air_environment'] = {key: value for key, value in compiled['air_environment'].items() if key != 'targets'}
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            np.savez(
+                file,
+                version=np.array(CACHE_VERSION),
+                config=np.array(json.dumps(rest, ensure_ascii=False)),
+                ids=table.ids,
+                types=table.types,
+                positions=table.positions,
+                velocities=table.velocities,
+            )
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_compiled(path: str) -> Optional[Dict[str, Any]]:
+    """Читает скомпилированный сценарий; None, если файл другой версии формата"""
+    # Файл открывается здесь: при поврежденном архиве np.load не закрывает открытый им файл
+    with open(path, 'rb') as file, np.load(file, allow_pickle=False) as data:
+        if int(data['version']) != CACHE_VERSION:
+            return None
+        compiled = json.loads(str(data['config']))
+        compiled['air_environment']['targets'] = TargetTable(
+            ids=data['ids'], types=data['types'], positions=data['positions'], velocities=data['velocities']
+        )
+    return compiled
+
+
+def load_scenario(config_path: str, use_cache: bool = True, cache_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Загружает и компилирует сценарий, используя кэш по хешу содержимого файла
+
+    :param config_path: путь к YAML-конфигу
+    :param use_cache: читать и писать кэш скомпилированных сценариев
+    :param cache_dir: каталог кэша (по умолчанию .scenario_cache рядом с конфигом)
+    """
+    with open(config_path, 'rb') as file:
+        raw = file.read()
+
+    cache_path = None
+    if use_cache:
+        cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(config_path)), CACHE_DIR_NAME)
+        cache_path = os.path.join(cache_dir, hashlib.sha256(raw).hexdigest() + '.npz')
+        if os.path.exists(cache_path):
+            try:
+                compiled = load_compiled(cache_path)
+            except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile) as e:
+                logger.warning("Кэш сценария %s поврежден и будет пересобран: %s", cache_path, e)
+                compiled = None
+            if compiled is not None:
+                logger.info("Сценарий %s загружен из кэша %s", config_path, cache_path)
+                return compiled
+
+    compiled = compile_config(yaml.load(raw, Loader=YamlLoader))
+    if cache_path is not None:
+        try:
+            save_compiled(cache_path, compiled)
+        except OSError as e:
+            logger.warning("Не удалось сохранить кэш сценария %s: %s", cache_path, e)
+    return compiled
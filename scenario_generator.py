@@ -0,0 +1,288 @@
+"""
+Генератор крупных синтетических сценариев (массированных налетов) для нагрузочных конфигов.
+
+Результат имеет ту же схему, что читает main.create_objects_from_config. Генерация
+детерминирована по зерну: одинаковые параметры и seed дают побайтно одинаковый файл.
+
+    python scenario_generator.py --targets 5000 --pattern mixed --radars 8 --launchers 12 -o raid.yaml
+"""
+import argparse
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import yaml
+
+PATTERNS = ('formation', 'stream', 'swarm', 'mixed')
+
+TARGET_ID_BASE = 100_000
+RADAR_ID_BASE = 10
+LAUNCHER_ID_BASE = 1_000
+
+PLANE_SPEED = (150.0, 300.0)  # м/с
+HELICOPTER_SPEED = (40.0, 80.0)  # м/с
+RAID_DISTANCE = (25_000.0, 45_000.0)  # удаление точки входа налета от центра, м
+WRITE_CHUNK = 10_000  # целей на одну запись в файл
+
+
+def _direction(azimuth: np.ndarray) -> np.ndarray:
+    return np.stack([np.cos(azimuth), np.sin(azimuth)], axis=-1)
+
+
+def _formation(n: int, rng: np.random.Generator, group_size: int = 4):
+    """
+    Группы по group_size целей клином; внутри группы общая скорость.
+    Группы идут волнами: в волне ~sqrt(групп) по фронту через 1.5 км, волны через 3 км
+    """
+    n_groups = -(-n // group_size)
+    per_wave = int(np.ceil(np.sqrt(n_groups)))
+    axis = rng.uniform(0, 2 * np.pi)
+    distance = rng.uniform(*RAID_DISTANCE)
+    wave, place = np.divmod(np.arange(n_groups), per_wave)
+    front = (place - (per_wave - 1) / 2) * 1_500.0
+    depth = wave * 3_000.0 + rng.uniform(0, 500, n_groups)
+
+    inward, lateral = -_direction(np.array(axis)), _direction(np.array(axis + np.pi / 2))
+    centers = distance * -inward + front[:, None] * lateral + depth[:, None] * -inward
+
+    # Клин: ведущий впереди, ведомые уступом назад и в стороны через 300 м
+    slot = np.arange(group_size)
+    side = np.where(slot % 2 == 1, 1.0, -1.0) * ((slot + 1) // 2)
+    slot_offsets = side[:, None] * 300.0 * lateral + np.abs(side)[:, None] * 300.0 * -inward
+
+    xy = (centers[:, None, :] + slot_offsets[None, :, :]).reshape(-1, 2)[:n]
+    group = np.repeat(np.arange(n_groups), group_size)[:n]
+    speed = rng.uniform(*PLANE_SPEED, n_groups)[group]
+    height = rng.uniform(1_000, 9_000, n_groups)[group]
+    velocity_xy = speed[:, None] * inward
+    types = np.zeros(n, dtype=np.int8)
+    return xy, height, velocity_xy, types
+
+
+def _stream(n: int, rng: np.random.Generator, spacing: float = 500.0, lane_size: int = 200):
+    """
+    Колонна целей друг за другом по одному маршруту с интервалом spacing;
+    длинные колонны делятся на параллельные коридоры по lane_size целей через 2 км
+    """
+    axis = rng.uniform(0, 2 * np.pi)
+    distance = rng.uniform(*RAID_DISTANCE)
+    inward, lateral = -_direction(np.array(axis)), _direction(np.array(axis + np.pi / 2))
+
+    n_lanes = -(-n // lane_size)
+    lane, place = np.divmod(np.arange(n), lane_size)
+    along = distance + place * spacing
+    across = (lane - (n_lanes - 1) / 2) * 2_000.0 + rng.normal(0, 150.0, n)
+    xy = along[:, None] * -inward + across[:, None] * lateral
+    speed = rng.uniform(*PLANE_SPEED)
+    height = np.full(n, rng.uniform(500, 6_000)) + rng.normal(0, 50.0, n)
+    velocity_xy = np.broadcast_to(speed * inward, (n, 2)).copy()
+    types = np.zeros(n, dtype=np.int8)
+    return xy, height, velocity_xy, types
+
+
+def _swarm(n: int, rng: np.random.Generator, sigma: float = 3_000.0):
+    """Рой: разброс вокруг центра, у каждой цели своя скорость на общую точку прицеливания"""
+    axis = rng.uniform(0, 2 * np.pi)
+    center = rng.uniform(*RAID_DISTANCE) * _direction(np.array(axis))
+    xy = center + rng.normal(0, sigma, (n, 2))
+    aim = rng.normal(0, 1_000.0, (n, 2))
+
+    types = (rng.random(n) < 0.3).astype(np.int8)  # треть роя - вертолеты
+    speed = np.where(types == 1, rng.uniform(*HELICOPTER_SPEED, n), rng.uniform(*PLANE_SPEED, n))
+    heading = aim - xy
+    heading /= np.linalg.norm(heading, axis=1, keepdims=True)
+    velocity_xy = heading * speed[:, None]
+    height = np.where(types == 1, rng.uniform(100, 1_500, n), rng.uniform(1_000, 8_000, n))
+    return xy, height, velocity_xy, types
+
+
+_PATTERN_BUILDERS = {'formation': _formation, 'stream': _stream, 'swarm': _swarm}
+_TYPE_NAMES = np.array(['AIR_PLANE', 'HELICOPTER'])
+
+
+def generate_targets(n_targets: int, pattern: str, rng: np.random.Generator) -> List[Dict[str, Any]]:
+    """
+    Генерирует список целей в формате конфига
+
+    :param n_targets: количество целей
+    :param pattern: formation, stream, swarm или mixed (поровну трех типов)
+    :param rng: генератор случайных чисел
+    """
+    if pattern not in PATTERNS:
+        raise ValueError(f"Неизвестный шаблон налета: {pattern}")
+    if pattern == 'mixed':
+        parts = np.array_split(np.arange(n_targets), 3)
+        builders = [_formation, _stream, _swarm]
+    else:
+        parts = [np.arange(n_targets)]
+        builders = [_PATTERN_BUILDERS[pattern]]
+
+    chunks = [builder(len(part), rng) for builder, part in zip(builders, parts) if len(part)]
+    if not chunks:
+        return []
+    xy, height, velocity_xy, types = (np.concatenate(column) for column in zip(*chunks))
+
+    positions = np.column_stack([xy, height]).round(1)
+    velocities = np.column_stack([velocity_xy, np.zeros(len(xy))]).round(1)
+    ids = TARGET_ID_BASE + np.arange(len(xy))
+    type_names = _TYPE_NAMES[types]
+
+    return [
+        {'id': int(ids[i]), 'type': str(type_names[i]),
+         'position': positions[i].tolist(), 'velocity': velocities[i].tolist()}
+        for i in range(len(ids))
+    ]
+
+
+def generate_radars(n_radars: int, layers: int = 2) -> List[Dict[str, Any]]:
+    """
+    Эшелонированное радиолокационное поле: первый эшелон - дальние радары у центра,
+    следующие - радары меньшей дальности на кольцах через 8 км
+    """
+    radars = []
+    layer_sizes = [len(part) for part in np.array_split(np.arange(n_radars), max(1, min(layers, n_radars)))]
+    radar_id = RADAR_ID_BASE
+    for layer, size in enumerate(layer_sizes):
+        ring = 8_000.0 * layer
+        for k in range(size):
+            phi = 2 * np.pi * k / size
+            radius = ring if layer else (0.0 if size == 1 else 1_000.0)
+            radars.append({
+                'id': radar_id,
+                'position': [round(float(radius * np.cos(phi)), 1), round(float(radius * np.sin(phi)), 1), 20.0],
+                'azimuth_start': 0.0,
+                'elevation_start': 0.0,
+                'max_distance': 60_000.0 if layer == 0 else 30_000.0,
+                'azimuth_range': 30.0,
+                'elevation_range': 90.0,
+                'azimuth_speed': 30.0,
+                'elevation_speed': 0.0,
+                'scan_mode': 'horizontal',
+            })
+            radar_id += 1
+    return radars
+
+
+def generate_launchers(n_launchers: int, batteries: Optional[int] = None,
+                       missiles_per_launcher: int = 4) -> List[Dict[str, Any]]:
+    """
+    Пусковые установки, сгруппированные в батареи на кольце 3 км;
+    внутри батареи ПУ стоят через 200 м, id ракет - id ПУ * 1000 + номер
+    """
+    batteries = batteries or max(1, -(-n_launchers // 4))
+    launchers = []
+    launcher_id = LAUNCHER_ID_BASE
+    for battery, members in enumerate(np.array_split(np.arange(n_launchers), batteries)):
+        phi = 2 * np.pi * battery / batteries
+        center = np.array([3_000.0 * np.cos(phi), 3_000.0 * np.sin(phi)]) if batteries > 1 else np.zeros(2)
+        for k in range(len(members)):
+            position = center + 200.0 * np.array([k % 2, k // 2])
+            launchers.append({
+                'id': launcher_id,
+                'position': [round(float(position[0]), 1), round(float(position[1]), 1), 0.0],
+                'max_missiles': missiles_per_launcher,
+                'missiles': [
+                    {'id': launcher_id * 1_000 + j, 'velocity': 1_000, 'explosion_radius': 150, 'life_time': 60}
+                    for j in range(1, missiles_per_launcher + 1)
+                ],
+            })
+            launcher_id += 1
+    return launchers
+
+
+def generate_scenario(n_targets: int, pattern: str = 'mixed', n_radars: int = 4, n_launchers: int = 4,
+                      radar_layers: int = 2, batteries: Optional[int] = None, missiles_per_launcher: int = 4,
+                      time_step: int = 200, duration: int = 40_000, seed: int = 0) -> Dict[str, Any]:
+    """
+    Генерирует полный конфиг сценария
+
+    :param n_targets: количество целей
+    :param pattern: шаблон налета (formation, stream, swarm, mixed)
+    :param n_radars: количество радаров
+    :param n_launchers: количество пусковых установок
+    :param radar_layers: количество эшелонов радиолокационного поля
+    :param batteries: количество батарей ПУ (по умолчанию - по 4 ПУ в батарее)
+    :param missiles_per_launcher: ракет на одной ПУ
+    :param time_step: шаг моделирования, мс
+    :param duration: длительность моделирования, мс
+    :param seed: зерно генератора
+    """
+    rng = np.random.default_rng(seed)
+    radars = generate_radars(n_radars, radar_layers)
+    launchers = generate_launchers(n_launchers, batteries, missiles_per_launcher)
+    return {
+        'simulation': {'time_step': time_step, 'duration': duration},
+        'air_environment': {
+            'id': 1,
+            'position': [0.0, 0.0, 0.0],
+            'targets': generate_targets(n_targets, pattern, rng),
+        },
+        'combat_control_point': {
+            'id': 0,
+            'missile_launcher_ids': [launcher['id'] for launcher in launchers],
+            'radar_ids': [radar['id'] for radar in radars],
+        },
+        'missile_launchers': launchers,
+        'radars': radars,
+    }
+
+
+def _target_lines(targets: Iterable[Dict[str, Any]]) -> Iterable[str]:
+    # Каждая цель - одна строка в потоковом стиле YAML: без эмиттера PyYAML и без
+    # построения дерева узлов, поэтому запись линейна по числу целей
+    template = '  - {id: %d, type: %s, position: [%r, %r, %r], velocity: [%r, %r, %r]}\n'
+    for target in targets:
+        yield template % (target['id'], target['type'], *target['position'], *target['velocity'])
+
+
+def write_scenario(config: Dict[str, Any], path: str) -> None:
+    """
+    Записывает сценарий в YAML. Список целей пишется построчно кусками по WRITE_CHUNK,
+    остальные секции - через yaml.safe_dump
+    """
+    air_env = config['air_environment']
+    header = {'simulation': config['simulation']}
+    rest = {key: value for key, value in config.items() if key not in ('simulation', 'air_environment')}
+    targets = air_env.get('targets', [])
+
+    with open(path, 'w', encoding='utf-8') as file:
+        yaml.safe_dump(header, file, sort_keys=False)
+        file.write('air_environment:\n')
+        file.write(f"  id: {air_env['id']}\n")
+        file.write(f"  position: {list(map(float, air_env['position']))}\n")
+        if not targets:
+            file.write('  targets: []\n')
+        else:
+            file.write('  targets:\n')
+            lines = _target_lines(targets)
+            while True:
+                chunk = [line for _, line in zip(range(WRITE_CHUNK), lines)]
+                if not chunk:
+                    break
+                file.writelines(chunk)
+        yaml.safe_dump(rest, file, sort_keys=False, default_flow_style=None)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Генератор синтетических сценариев налета')
+    parser.add_argument('--targets', type=int, default=1_000)
+    parser.add_argument('--pattern', choices=PATTERNS, default='mixed')
+    parser.add_argument('--radars', type=int, default=4)
+    parser.add_argument('--radar-layers', type=int, default=2)
+    parser.add_argument('--launchers', type=int, default=4)
+    parser.add_argument('--batteries', type=int)
+    parser.add_argument('--missiles-per-launcher', type=int, default=4)
+    parser.add_argument('--time-step', type=int, default=200)
+    parser.add_argument('--duration', type=int, default=40_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', default='generated_scenario.yaml')
+    args = parser.parse_args(argv)
+
+    config = generate_scenario(
+        args.targets, args.pattern, args.radars, args.launchers, args.radar_layers, args.batteries,
+        args.missiles_per_launcher, args.time_step, args.duration, args.seed
+    )
+    write_scenario(config, args.output)
+
+
+if __name__ == '__main__':
+    main()
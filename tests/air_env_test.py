@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from modules.AirEnv import AirEnv
+from modules.AirObject import Trajectory
+from modules.Manager import Manager
+from modules.constants import MessageType
+from modules.utils import TARGET_TYPES, Target, TargetTable, TargetType
+
+RECORDS = [
+    {'id': 100, 'type': 'AIR_PLANE', 'position': [0.0, 0.0, 1000.0], 'velocity': [200.0, 0.0, 0.0]},
+    {'id': 101, 'type': 'HELICOPTER', 'position': [500.0, 0.0, 300.0], 'velocity': [0.0, 50.0, 0.0]},
+    {'id': 102, 'type': 'ANOTHER', 'position': [-100.0, 20.0, 2000.0], 'velocity': [-10.0, 0.0, 5.0]},
+]
+
+
+def make_air_env():
+    manager = Manager()
+    manager.time.set_dt(200)
+    air_env = AirEnv(manager, 1, np.zeros(3))
+    manager.add_module(air_env)
+    return manager, air_env
+
+
+def active_objects(manager, step_time):
+    return manager.give_messages_by_type(MessageType.ACTIVE_OBJECTS, step_time=step_time)[0].active_objects
+
+
+class TestTargetTable:
+
+    def test_records_round_trip(self):
+        table = TargetTable.from_records(RECORDS)
+        assert len(table) == 3
+        assert table.types.tolist() == [TARGET_TYPES.index(TargetType[record['type']]) for record in RECORDS]
+        assert table.positions.shape == table.velocities.shape == (3, 3)
+        assert table.to_records() == RECORDS
+
+    def test_empty_table(self):
+        table = TargetTable.from_records([])
+        assert len(table) == 0 and table.positions.shape == (0, 3)
+
+
+class TestAddTargets:
+
+    def test_targets_move_with_their_velocities(self):
+        manager, air_env = make_air_env()
+        table = TargetTable.from_records(RECORDS)
+        air_env.add_targets(table.ids, table.types, table.positions, table.velocities)
+        manager.run_simulation(3 * 200)
+
+        objects = active_objects(manager, 400)
+        assert objects.ids.tolist() == [100, 101, 102]
+        assert np.allclose(objects.positions, table.positions + table.velocities * 0.4)
+        assert [obj.type for obj in objects] == [TargetType.AIR_PLANE, TargetType.HELICOPTER, TargetType.ANOTHER]
+        assert objects[0].speed_mod == pytest.approx(200.0)
+
+    def test_matches_individual_targets(self):
+        bulk_manager, bulk_env = make_air_env()
+        single_manager, single_env = make_air_env()
+        table = TargetTable.from_records(RECORDS)
+        bulk_env.add_targets(table.ids, list(map(TARGET_TYPES.__getitem__, table.types)),
+                             table.positions, table.velocities)
+        for record in RECORDS:
+            single_env.add_target(Target(
+                single_manager, record['id'], np.array(record['position']),
+                Trajectory(velocity=np.array(record['velocity']), start_pos=np.array(record['position'])),
+                TargetType[record['type']]
+            ))
+        bulk_manager.run_simulation(5 * 200)
+        single_manager.run_simulation(5 * 200)
+
+        for step_time in range(0, 5 * 200, 200):
+            bulk, single = active_objects(bulk_manager, step_time), active_objects(single_manager, step_time)
+            assert bulk.ids.tolist() == single.ids.tolist()
+            assert np.allclose(bulk.positions, single.positions)
+
+    def test_targets_appear_at_start_time(self):
+        manager, air_env = make_air_env()
+        table = TargetTable.from_records(RECORDS)
+        air_env.add_targets(table.ids, table.types, table.positions, table.velocities, start_times=[0.0, 0.4, 0.4])
+        manager.run_simulation(3 * 200)
+
+        assert active_objects(manager, 200).ids.tolist() == [100]
+        objects = active_objects(manager, 400)
+        assert objects.ids.tolist() == [100, 101, 102]
+        assert np.allclose(objects.positions[1:], table.positions[1:])
+
+    def test_duplicate_ids_are_rejected(self):
+        _, air_env = make_air_env()
+        table = TargetTable.from_records(RECORDS)
+        air_env.add_targets(table.ids, table.types, table.positions, table.velocities)
+        with pytest.raises(ValueError):
+            air_env.add_targets([101], [0], [[0.0, 0.0, 0.0]], [[1.0, 0.0, 0.0]])
+        with pytest.raises(ValueError):
+            air_env.add_targets([200, 200], [0, 0], np.zeros((2, 3)), np.ones((2, 3)))
+        assert len(air_env.target_store) == 3
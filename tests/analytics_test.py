@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pytest
+
+from main import prepare_simulation_from_config
+from modules.Analytics import (analyze_runs, compare_layouts, launcher_table, missile_table, run_summary,
+                               target_table)
+from modules.Recorder import RecordedRun, MISSILE_TYPE_CODE
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.yaml')
+
+
+@pytest.fixture(scope='module')
+def record_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('analytics') / 'run.rec')
+    np.random.seed(1)
+    manager, recorder, end_time = prepare_simulation_from_config(CONFIG_PATH, use_cache=False, record_path=path)
+    manager.run_simulation(end_time)
+    recorder.close()
+    return path
+
+
+class TestAnalytics:
+
+    def test_tables_match_direct_computation(self, record_path):
+        with RecordedRun(record_path) as run:
+            targets = target_table(run)
+            missiles = missile_table(run)
+            assert len(missiles) == len(run.launches) > 0
+            for target in targets:
+                records = run.trajectory(target['id'])
+                assert target['first_detected'] == records['time'][records['visible']].min()
+                assert target['leaker'] == np.isnan(target['destroyed'])
+            for missile in missiles:
+                flight = run.trajectory(missile['id'])
+                target = run.trajectory(missile['target_id'])
+                _, in_flight, in_target = np.intersect1d(flight['time'], target['time'], return_indices=True)
+                expected = np.linalg.norm(flight['pos'][in_flight] - target['pos'][in_target], axis=1).min()
+                assert missile['miss_distance'] == pytest.approx(expected)
+                assert missile['time_of_flight'] == missile['detonated'] - missile['launch']
+
+            launchers = launcher_table(missiles, capacities={3: 4, 7: 2})
+            assert launchers['id'].tolist() == [3, 7]
+            assert launchers['launches'].tolist() == [len(missiles), 0]
+            assert launchers['utilisation'][0] == len(missiles) / 4
+            assert launchers['hits'].sum() == missiles['hit'].sum()
+
+            summary = run_summary(run)[0]
+            assert summary['targets'] == np.unique(run.records['id'][run.records['type'] != MISSILE_TYPE_CODE]).size
+            assert summary['leakers'] + summary['destroyed'] == summary['targets']
+
+    def test_layout_comparison(self, record_path):
+        summaries = analyze_runs([record_path] * 3)
+        assert len(summaries) == 3
+        summaries['leak_rate'] = [0.0, 0.5, 1.0]
+        summaries['miss_distance'][2] = np.nan
+        table = compare_layouts(summaries, ['A', 'B', 'A'])
+        assert table['layout'].tolist() == ['A', 'B']
+        assert table['runs'].tolist() == [2, 1]
+        assert table['leak_rate'].tolist() == [0.5, 0.5]
+        assert table['miss_distance'][0] == summaries['miss_distance'][0]
+        with pytest.raises(ValueError):
+            compare_layouts(summaries, ['A'])
@@ -0,0 +1,65 @@
+import asyncio
+import random
+
+import pytest
+
+from modules.AsyncManager import AsyncManager
+from modules.Manager import Manager
+from modules.Messages import MissilePosMessage
+from modules.constants import MessageType
+
+
+class TestAsyncManager:
+
+    def test_async_run_matches_sync(self, recorded_run):
+        seen = []
+
+        async def run_async(manager, end_time):
+            queue = manager.subscribe(MessageType.FOUND_OBJECTS, barrier=True)
+
+            async def consume():
+                while True:
+                    msg = await queue.get()
+                    await asyncio.sleep(0)
+                    seen.append((manager.time.get_time(), msg.send_time))
+                    queue.task_done()
+
+            consumer = asyncio.create_task(consume())
+            await manager.run_simulation_async(end_time)
+            consumer.cancel()
+
+        sync, _ = recorded_run('sync', manager_class=Manager)
+        asynchronous, _ = recorded_run('async', manager_class=AsyncManager,
+                                       run=lambda manager, end_time: asyncio.run(run_async(manager, end_time)))
+        assert len(sync) > 0
+        assert asynchronous.tobytes() == sync.tobytes()
+        # Барьер: сообщения шага обработаны до перехода времени
+        assert seen and all(now == sent for now, sent in seen)
+
+    def test_inputs_are_added_in_registration_order(self):
+        async def run():
+            manager = AsyncManager()
+
+            def feed(sender_id):
+                async def source(step_time):
+                    await asyncio.sleep(random.random() / 1000)
+                    return [MissilePosMessage(sender_id=sender_id)]
+                return source
+
+            for sender_id in (1, 2, 3):
+                manager.add_input(feed(sender_id))
+            waiter = asyncio.create_task(manager.wait_for(MessageType.MISSILE_POS))
+            await asyncio.sleep(0)
+            await manager.run_simulation_async(3 * manager.time.get_dt())
+            return manager, await waiter
+
+        manager, first = asyncio.run(run())
+        assert first.sender_id == 1
+        for messages in manager.messages.values():
+            assert [msg.sender_id for msg in messages] == [1, 2, 3]
+
+    def test_sync_step_rejects_async_setup(self):
+        manager = AsyncManager()
+        manager.add_input(lambda step_time: None)
+        with pytest.raises(ValueError):
+            manager.step()
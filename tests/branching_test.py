@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from modules.Branching import run_branches, _run_sequential
+from .recorder_test import make_manager
+
+
+def remove_target(target_id):
+    def apply(manager):
+        manager.modules[0].target_store.remove([target_id])
+    return apply
+
+
+def fail(manager):
+    raise RuntimeError("ошибка в ветке")
+
+
+def targets_left(manager):
+    return manager.time.get_time(), len(manager.modules[0].target_store.active_rows())
+
+
+BRANCHES = {'base': lambda manager: None, 'without_100': remove_target(100), 'broken': fail}
+
+
+class TestBranching:
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason="нужен os.fork")
+    def test_forked_branches(self):
+        manager = make_manager(n_targets=3)
+        manager.run_simulation(1000)
+        results = run_branches(manager, BRANCHES, 2000, outcome=targets_left, max_workers=2)
+
+        assert results['base'].outcome == (2000, 3)
+        assert results['without_100'].outcome == (2000, 2)
+        assert results['broken'].outcome is None
+        assert 'ошибка в ветке' in results['broken'].error
+        # Родитель не изменился
+        assert manager.time.get_time() == 1000
+        assert len(manager.modules[0].target_store.active_rows()) == 3
+
+    def test_sequential_fallback(self):
+        manager = make_manager(n_targets=3)
+        manager.run_simulation(1000)
+        results = _run_sequential(manager, BRANCHES, 2000, targets_left)
+
+        assert results['base'].outcome == (2000, 3)
+        assert results['without_100'].outcome == (2000, 2)
+        assert results['broken'].error is not None
+        assert manager.time.get_time() == 1000
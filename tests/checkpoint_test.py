@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from main import prepare_simulation_from_config
+from modules.Checkpoint import Checkpointer, save_checkpoint, load_checkpoint
+from modules.Recorder import Recorder, RecordedRun
+
+pytestmark = pytest.mark.scenario(n_radars=2, duration=6000, seed=1)
+
+
+def continue_recorded(manager, path, end_time):
+    recorder = Recorder(manager, path)
+    manager.add_module(recorder)
+    manager.run_simulation(end_time)
+    recorder.close()
+    with RecordedRun(path) as run:
+        return np.array(run.records)
+
+
+class TestCheckpoint:
+
+    def test_restore_is_bit_identical(self, config_path, tmp_path):
+        np.random.seed(0)
+        manager, recorder, end_time = prepare_simulation_from_config(
+            config_path, use_cache=False, record_path=str(tmp_path / 'full.rec')
+        )
+        checkpointer = Checkpointer(manager, str(tmp_path / 'checkpoints'), every_steps=10)
+        checkpointer.run_simulation(2000)
+        checkpoint = checkpointer.last_path
+        manager.run_simulation(end_time)
+        recorder.close()
+        with RecordedRun(str(tmp_path / 'full.rec')) as run:
+            expected = np.array(run.records[run.records['time'] >= 2000])
+
+        # Две независимые ветки от одной контрольной точки
+        for branch in range(2):
+            restored = load_checkpoint(checkpoint)
+            assert restored.time.get_time() == 2000
+            assert not any(isinstance(module, Recorder) for module in restored.modules)
+            records = continue_recorded(restored, str(tmp_path / f'branch{branch}.rec'), end_time)
+            assert records.tobytes() == expected.tobytes()
+
+    def test_rejects_foreign_file(self, tmp_path):
+        path = tmp_path / 'not_a_checkpoint.ckpt'
+        path.write_bytes(b'0' * 64)
+        with pytest.raises(ValueError):
+            load_checkpoint(str(path))
+
+    def test_roundtrip_keeps_messages(self, config_path, tmp_path):
+        manager, _, _ = prepare_simulation_from_config(config_path, use_cache=False)
+        manager.run_simulation(1000)
+        path = str(tmp_path / 'state.ckpt')
+        save_checkpoint(manager, path)
+        restored = load_checkpoint(path)
+        assert sorted(restored.messages) == sorted(manager.messages)
+        assert [repr(msg) for msg in restored.give_messages(800)] == [repr(msg) for msg in manager.give_messages(800)]
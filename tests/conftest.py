@@ -0,0 +1,63 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Тесты импортируют модули приложения по именам верхнего уровня (modules.X, main), как main.py и UI:
+# корень репозитория добавляется в sys.path и при запуске pytest не из корня
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from main import prepare_simulation_from_config  # noqa: E402
+from modules.Recorder import RecordedRun  # noqa: E402
+from scenario_generator import generate_scenario, write_scenario  # noqa: E402
+
+# Параметры generate_scenario по умолчанию; переопределяются маркером scenario
+DEFAULT_SCENARIO = dict(n_targets=20, n_radars=3, n_launchers=2, duration=3000, seed=4)
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'scenario(**params): параметры сценария для фикстуры config_path')
+
+
+@pytest.fixture
+def config_path(request, tmp_path):
+    """
+    Путь к сгенерированному сценарию. Параметры generate_scenario задаются маркером
+    модуля, класса или теста: pytestmark = pytest.mark.scenario(n_targets=30, seed=1)
+    """
+    params = dict(DEFAULT_SCENARIO)
+    for marker in reversed(list(request.node.iter_markers('scenario'))):
+        params.update(marker.kwargs)
+    path = str(tmp_path / 'scenario.yaml')
+    write_scenario(generate_scenario(params.pop('n_targets'), **params), path)
+    return path
+
+
+@pytest.fixture
+def recorded_run(config_path, tmp_path):
+    """
+    Прогон сценария config_path с записью: recorded_run(name, run=None, **kwargs) -> (записи, менеджер).
+    kwargs передаются в prepare_simulation_from_config (workers, radar_processes, manager_class, ...),
+    run(manager, end_time) заменяет manager.run_simulation(end_time). Шумы МФР - с одного зерна
+    """
+    def run_recorded(name, run=None, **kwargs):
+        np.random.seed(0)
+        path = str(tmp_path / f'{name}.rec')
+        manager, recorder, end_time = prepare_simulation_from_config(
+            config_path, use_cache=False, record_path=path, **kwargs
+        )
+        try:
+            if run is None:
+                manager.run_simulation(end_time)
+            else:
+                run(manager, end_time)
+        finally:
+            manager.close()
+            recorder.close()
+        with RecordedRun(path) as recorded:
+            return np.array(recorded.records), manager
+
+    return run_recorded
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from main import prepare_simulation_from_config
+from modules.EventLog import EventLog, EventLogReader, EVENT_DTYPE, NO_RECEIVER
+from modules.constants import MessageType
+
+
+@pytest.fixture
+def logged_run(config_path, tmp_path):
+    np.random.seed(0)
+    manager, _, end_time = prepare_simulation_from_config(config_path, use_cache=False)
+    log_path = str(tmp_path / 'events.log')
+    # Маленькие блоки: журнал из нескольких блоков
+    manager.event_log = EventLog(log_path, block_events=100)
+    manager.run_simulation(end_time)
+    manager.event_log.close()
+    return manager, log_path
+
+
+class TestEventLog:
+
+    def test_records_match_manager_messages(self, logged_run):
+        manager, log_path = logged_run
+        messages = [msg for step_time in sorted(manager.messages) for msg in manager.give_messages(step_time)]
+        with EventLogReader(log_path) as reader:
+            records = reader.records()
+            assert records.dtype == EVENT_DTYPE
+            assert len(records) == len(messages) > 100
+            assert [reader.message_type(code) for code in records['type']] == [msg.type for msg in messages]
+            assert records['step'].tolist() == [msg.send_time for msg in messages]
+            assert records['sender'].tolist() == [msg.sender_id for msg in messages]
+            assert records['receiver'].tolist() == [NO_RECEIVER if msg.receiver_id is None else msg.receiver_id
+                                                   for msg in messages]
+
+    def test_messages_decode_payloads(self, logged_run):
+        manager, log_path = logged_run
+        with EventLogReader(log_path) as reader:
+            logged = [msg for msg in reader if msg.type == MessageType.ACTIVE_OBJECTS]
+        original = manager.give_messages_by_type(MessageType.ACTIVE_OBJECTS, step_time=logged[-1].send_time)[0]
+        assert np.array_equal(logged[-1].active_objects.ids, original.active_objects.ids)
+        assert np.array_equal(logged[-1].active_objects.positions, original.active_objects.positions)
+
+    def test_uncompressed_log_and_bad_file(self, tmp_path):
+        path = str(tmp_path / 'raw.log')
+        with EventLog(path, compress=False) as log:
+            log.write_step(0, [])
+        with EventLogReader(path) as reader:
+            assert not reader.compressed
+            assert len(reader.records()) == 0
+
+        bad_path = tmp_path / 'bad.log'
+        bad_path.write_bytes(b'not an event log')
+        with pytest.raises(ValueError):
+            EventLogReader(str(bad_path))
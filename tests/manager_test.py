@@ -0,0 +1,45 @@
+import pytest
+
+from modules.Manager import Manager
+from modules.Messages import MissileCountRequestMessage, MissileCountResponseMessage, MissilePosMessage
+from modules.constants import MessageType
+
+pytestmark = pytest.mark.scenario(n_targets=30, n_radars=4, duration=4000, seed=1)
+
+
+def message_count(manager):
+    return sum(len(messages) for messages in manager.messages.values())
+
+
+class TestParallelPhases:
+
+    def test_parallel_run_matches_serial(self, recorded_run):
+        serial, serial_manager = recorded_run('serial', workers=None)
+        parallel, parallel_manager = recorded_run('parallel', workers=4)
+        assert message_count(parallel_manager) == message_count(serial_manager)
+        assert parallel.tobytes() == serial.tobytes()
+
+
+class TestRouting:
+
+    def test_messages_are_routed_by_type_and_receiver(self):
+        manager = Manager(history_steps=2)
+        manager.add_message(MissileCountResponseMessage(sender_id=4, receiver_id=0, count=3))
+        manager.add_message(MissileCountResponseMessage(sender_id=5, receiver_id=7, count=1))
+        manager.add_message(MissilePosMessage(sender_id=1001))
+        manager.add_message(MissileCountRequestMessage(sender_id=0, receiver_id=4))
+
+        # Порядок - по убыванию важности, при равной важности - в порядке добавления
+        assert [msg.type for msg in manager.give_messages()][:2] == [MessageType.MISSILE_COUNT_REQUEST,
+                                                                     MessageType.MISSILE_COUNT_RESPONSE]
+        responses = manager.give_messages_by_type(MessageType.MISSILE_COUNT_RESPONSE)
+        assert [msg.sender_id for msg in responses] == [4, 5]
+        assert [msg.sender_id for msg in manager.give_messages_by_type(MessageType.MISSILE_COUNT_RESPONSE, 0)] == [4]
+        assert [msg.type for msg in manager.give_messages_by_id(4)] == [MessageType.MISSILE_COUNT_REQUEST]
+        assert [msg.sender_id for msg in manager.give_messages_by_id(None)] == [1001]
+
+        manager.time.update_time()
+        manager.time.update_time()
+        manager.evict_messages(manager.time.get_time())
+        assert manager.give_messages_by_type(MessageType.MISSILE_COUNT_RESPONSE, step_time=0) == []
+        assert manager.give_messages_by_id(4, step_time=0) == []
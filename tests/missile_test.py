@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from modules.AirObject import Trajectory
+from modules.Manager import Manager
+from modules.Messages import UpdateTargetPosition
+from modules.Missile import Missile
+from modules.Tracks import TrackState
+from modules.utils import Target, TargetType, to_seconds
+
+DT = 200
+
+
+def make_engagement():
+    manager = Manager()
+    manager.time.set_dt(DT)
+    start_pos = np.array([20000.0, 0.0, 5000.0])
+    target = Target(manager, 100, start_pos, Trajectory(velocity=(-100.0, 50.0, 0.0), start_pos=tuple(start_pos)),
+                    TargetType.AIR_PLANE)
+    missile = Missile(manager, 1001, (0.0, 0.0, 0.0), velocity_module=1000.0)
+    return manager, target, missile
+
+
+class TestMissileRetarget:
+
+    def test_retargeted_every_step_keeps_flying(self):
+        manager, target, missile = make_engagement()
+        positions = []
+        for step in range(10):
+            manager.time.set_time(step * DT)
+            target.step()
+            if step == 0:
+                missile._launch(target, launcher_id=1)
+            else:
+                missile.step()
+            positions.append(np.array(missile.pos, dtype=float))
+            # Перенацеливание на каждом шаге: ЗУР читает его на следующем шаге
+            manager.add_message(UpdateTargetPosition(sender_id=10, upd_object=target, receiver_id=missile.id))
+
+        assert missile.status == 'active'
+        travelled = np.linalg.norm(np.diff(positions, axis=0), axis=1)
+        assert travelled == pytest.approx(np.full(9, missile.speed_mod * to_seconds(DT)))
+
+    def test_retarget_follows_estimate(self):
+        manager, target, missile = make_engagement()
+        manager.time.set_time(0)
+        target.step()
+        missile._launch(target, launcher_id=1)
+        # Неподвижная оценка в стороне от истинной цели
+        estimate = TrackState(id=100, pos=np.array([15000.0, 5000.0, 3000.0]), velocity=np.zeros(3),
+                              speed_mod=0.0, covariance=np.eye(3), time=0.0)
+        manager.add_message(UpdateTargetPosition(sender_id=10, upd_object=target, receiver_id=missile.id,
+                                                 estimate=estimate))
+
+        manager.time.set_time(DT)
+        target.step()
+        missile.step()
+        # Курс ЗУР - на оценку, а не на истинное положение цели
+        direction = missile.pos / np.linalg.norm(missile.pos)
+        assert direction == pytest.approx(estimate.pos / np.linalg.norm(estimate.pos))
+
+
+class TestMissileLaunch:
+
+    def test_launch_aims_at_measured_position(self):
+        manager, target, missile = make_engagement()
+        manager.time.set_time(0)
+        target.step()
+        # Измерение МФР в стороне от истинного положения цели
+        measured = target.pos + np.array([-2000.0, 3000.0, -1000.0])
+        missile._launch(target, launcher_id=1, target_position=measured)
+
+        assert missile.status == 'active' and missile.target is target
+        manager.time.set_time(DT)
+        missile.step()
+        direction = missile.pos / np.linalg.norm(missile.pos)
+        assert direction == pytest.approx(measured / np.linalg.norm(measured))
@@ -1,13 +1,13 @@
 import pytest
 from unittest.mock import MagicMock
 import numpy as np
-from ..modules.MissileLauncher import MissileLauncher
-from ..modules.Missile import Missile
-from ..modules.utils import Target, TargetType
-from ..modules.constants import CCP_ID
-from ..modules.AirObject import Trajectory
-from ..modules.Manager import Manager
-from ..modules.Messages import CPPLaunchMissileRequestMessage, MissileCountRequestMessage, MissileCountResponseMessage
+from modules.MissileLauncher import MissileLauncher
+from modules.Missile import Missile
+from modules.utils import Target, TargetType
+from modules.constants import CCP_ID
+from modules.AirObject import Trajectory
+from modules.Manager import Manager
+from modules.Messages import CPPLaunchMissileRequestMessage, MissileCountRequestMessage, MissileCountResponseMessage
 import numpy as np
 
 class TestMissileLauncher:
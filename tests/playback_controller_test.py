@@ -0,0 +1,71 @@
+import pytest
+
+from UI.PlaybackController import PlaybackController
+from modules.Recorder import Recorder
+from modules.Replay import Replay
+from .recorder_test import make_manager
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def replay(tmp_path):
+    manager = make_manager(n_targets=2)
+    path = str(tmp_path / 'run.rec')
+    recorder = Recorder(manager, path)
+    manager.add_module(recorder)
+    manager.run_simulation(50 * 200)
+    recorder.close()
+    replay = Replay(path)
+    yield replay
+    replay.close()
+
+
+class TestPlaybackController:
+
+    def test_position_follows_clock(self, replay):
+        clock = FakeClock()
+        playback = PlaybackController(replay, speed=10, clock=clock)
+        playback.play()
+
+        assert playback.tick() is None
+        clock.now = 0.1  # 1000 мс моделирования
+        frame = playback.tick()
+        assert replay.position == 5
+        assert frame[0]['time'] == 1000
+        assert playback.skipped == 4
+
+        playback.speed = 1
+        clock.now = 0.5
+        playback.tick()
+        assert replay.time == 1400
+
+    def test_stops_at_end(self, replay):
+        clock = FakeClock()
+        playback = PlaybackController(replay, speed=50, clock=clock)
+        playback.play()
+        clock.now = 100.0
+        assert playback.tick() is not None
+        assert replay.at_end
+        assert not playback.playing
+
+    def test_seek_rebases_clock(self, replay):
+        clock = FakeClock()
+        playback = PlaybackController(replay, clock=clock)
+        playback.play()
+        clock.now = 3.0
+        playback.seek(10)
+        clock.now = 3.2
+        playback.tick()
+        assert replay.position == 11
+
+    def test_invalid_speed(self, replay):
+        with pytest.raises(ValueError):
+            PlaybackController(replay, speed=0)
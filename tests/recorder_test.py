@@ -0,0 +1,161 @@
+import asyncio
+import os
+
+import numpy as np
+import pytest
+
+from modules.AirEnv import AirEnv
+from modules.AsyncManager import AsyncManager
+from modules.Manager import Manager
+from modules.Messages import MissileDetonateMessage, MissilePosMessage
+from modules.Recorder import Recorder, RecordedRun, STATUS_ACTIVE, STATUS_DESTROYED, metadata_path, index_path
+from modules.Replay import Replay
+from modules.constants import MessageType
+
+
+def make_manager(n_targets=5, history_steps=None, manager_class=Manager):
+    manager = manager_class(history_steps=history_steps)
+    manager.time.set_dt(200)
+    air_env = AirEnv(manager, 1, np.zeros(3))
+    manager.add_module(air_env)
+    ids = np.arange(100, 100 + n_targets)
+    positions = np.column_stack([ids * 10.0, np.zeros(n_targets), np.full(n_targets, 1000.0)])
+    velocities = np.tile([100.0, 0.0, 0.0], (n_targets, 1))
+    air_env.add_targets(ids, np.zeros(n_targets, dtype=np.uint8), positions, velocities)
+    return manager
+
+
+class PositionSender:
+    """Модуль, отправляющий MissilePosMessage на каждом шаге (sender_id = 1000 + номер шага)"""
+    id = 2
+
+    def __init__(self, manager):
+        self._manager = manager
+
+    def step(self):
+        step = self._manager.time.get_time() // self._manager.time.get_dt()
+        self._manager.add_message(MissilePosMessage(sender_id=1000 + step))
+
+
+class TestRecorder:
+
+    def test_records_every_step_across_chunks(self, tmp_path):
+        manager = make_manager(n_targets=5)
+        path = str(tmp_path / 'run.rec')
+        recorder = Recorder(manager, path, chunk_size=7)
+        manager.add_module(recorder)
+        manager.run_simulation(10 * 200)
+        recorder.close()
+
+        with RecordedRun(path) as run:
+            assert run.complete
+            assert len(run) == 50
+            assert list(run.times()) == list(range(0, 2000, 200))
+            step = run.at(1000)
+            assert list(step['id']) == [100, 101, 102, 103, 104]
+            assert np.allclose(step['pos'][:, 0], np.arange(100, 105) * 10.0 + 100.0)
+            assert np.all(step['status'] == STATUS_ACTIVE)
+            assert len(run.trajectory(102)) == 10
+
+    def test_partial_run_is_readable(self, tmp_path):
+        manager = make_manager(n_targets=3)
+        path = str(tmp_path / 'run.rec')
+        recorder = Recorder(manager, path, chunk_size=3)
+        manager.add_module(recorder)
+        manager.run_simulation(4 * 200)
+
+        run = RecordedRun(path)
+        assert not run.complete
+        assert len(run) == 9  # последний шаг еще в буфере
+        recorder.close()
+        assert RecordedRun(path).complete
+
+    def test_destroyed_target_status(self, tmp_path):
+        manager = make_manager(n_targets=2)
+        path = str(tmp_path / 'run.rec')
+        recorder = Recorder(manager, path)
+        manager.add_module(recorder)
+        manager.run_simulation(200)
+        manager.add_message(MissileDetonateMessage(sender_id=10, target_id=101))
+        manager.run_simulation(3 * 200)
+        recorder.close()
+
+        run = RecordedRun(path)
+        assert list(run.at(200)['status']) == [STATUS_ACTIVE, STATUS_DESTROYED]
+        assert list(run.at(400)['id']) == [100]
+
+    def test_unsupported_version(self, tmp_path):
+        manager = make_manager(n_targets=1)
+        path = str(tmp_path / 'run.rec')
+        Recorder(manager, path).close()
+        with open(metadata_path(path), 'w', encoding='utf-8') as file:
+            file.write('{"version": 0}')
+        with pytest.raises(ValueError):
+            RecordedRun(path)
+
+
+class TestReplay:
+
+    @pytest.fixture
+    def record_path(self, tmp_path):
+        manager = make_manager(n_targets=4)
+        path = str(tmp_path / 'run.rec')
+        with Recorder(manager, path, chunk_size=5) as recorder:
+            manager.add_module(recorder)
+            manager.run_simulation(20 * 200)
+        return path
+
+    def test_seek_and_advance(self, record_path):
+        replay = Replay(record_path)
+        assert len(replay) == 20
+        assert replay.seek(7)['time'][0] == 1400
+        assert replay.advance(2)['time'][0] == 1800
+        assert replay.seek(100)['time'][0] == 3800
+        assert replay.at_end
+        assert replay.advance() is None
+        assert replay.seek_time(1300)['time'][0] == 1200
+
+    def test_index_rebuilt_without_sidecar(self, record_path):
+        with_index = RecordedRun(record_path)
+        expected = np.array(with_index.index)
+        os.remove(index_path(record_path))
+        assert np.array_equal(RecordedRun(record_path).index, expected)
+
+    def test_unflushed_steps_are_not_indexed(self, tmp_path):
+        manager = make_manager(n_targets=4)
+        path = str(tmp_path / 'run.rec')
+        recorder = Recorder(manager, path, chunk_size=10)
+        manager.add_module(recorder)
+        manager.run_simulation(5 * 200)
+        recorder._index_file.flush()
+
+        run = RecordedRun(path)
+        assert run.steps_count == 4  # пятый шаг еще в буфере
+        assert len(run.frame(3)) == 4
+        recorder.close()
+
+
+class TestManagerHistory:
+
+    def test_old_steps_are_evicted(self):
+        manager = make_manager(history_steps=2)
+        manager.run_simulation(10 * 200)
+        assert sorted(manager.messages) == [1600, 1800]
+
+    def test_history_must_cover_previous_step(self):
+        with pytest.raises(ValueError):
+            Manager(history_steps=1)
+
+    def test_subscriber_keeps_evicted_messages(self):
+        manager = make_manager(history_steps=2, manager_class=AsyncManager)
+        manager.add_module(PositionSender(manager))
+        queue = manager.subscribe(MessageType.MISSILE_POS)
+        asyncio.run(manager.run_simulation_async(10 * 200))
+
+        # Шаги 0-1400 вытеснены из истории, их сообщения еще лежат в очереди подписчика,
+        # а сообщения следующих шагов создавались уже после вытеснения
+        assert sorted(manager.messages) == [1600, 1800]
+        received = [queue.get_nowait() for _ in range(queue.qsize())]
+        assert [(msg.send_time, msg.missile_id) for msg in received] == \
+            [(step * 200, 1000 + step) for step in range(10)]
+        assert len({id(msg) for msg in received}) == 10
@@ -0,0 +1,35 @@
+import json
+
+from benchmarks.scenario_benchmark import SCENARIOS, _previous_results, run_scenario, synthetic_config
+
+
+class TestScenarioBenchmark:
+
+    def test_synthetic_config_is_reproducible(self):
+        first = synthetic_config(50, 2, 3, seed=5)
+        assert synthetic_config(50, 2, 3, seed=5) == first
+        assert synthetic_config(50, 2, 3, seed=6) != first
+        assert len(first['air_environment']['targets']) == 50
+        assert len(first['radars']) == 2 and len(first['missile_launchers']) == 3
+
+    def test_run_scenario_reports_metrics(self):
+        result = run_scenario('t10_r1_l1', steps=5)
+        n_targets, n_radars, n_launchers, _ = SCENARIOS['t10_r1_l1']
+        assert result['status'] == 'ok' and result['steps'] == 5
+        assert (result['targets'], result['radars'], result['launchers']) == (n_targets, n_radars, n_launchers)
+        assert result['steps_per_s'] > 0 and result['peak_rss_kb'] > 0
+        assert {'AirEnv', 'SectorRadar', 'CombatControlPoint'} <= set(result['module_s'])
+
+    def test_previous_results_keep_last_successful_run(self, tmp_path):
+        path = tmp_path / 'results.jsonl'
+        records = [
+            {'commit': 'aaa', 'results': [{'scenario': 'x', 'status': 'ok', 'steps_per_s': 10.0}]},
+            {'commit': 'bbb', 'results': [{'scenario': 'x', 'status': 'ok', 'steps_per_s': 12.0},
+                                          {'scenario': 'y', 'status': 'ok', 'steps_per_s': 3.0}]},
+            {'commit': 'ccc', 'results': [{'scenario': 'x', 'status': 'timeout'}]},
+        ]
+        path.write_text('\n'.join(json.dumps(record) for record in records) + '\n\n', encoding='utf-8')
+        previous = _previous_results(str(path))
+        assert previous['x']['steps_per_s'] == 12.0 and previous['x']['commit'] == 'bbb'
+        assert previous['y']['commit'] == 'bbb'
+        assert _previous_results(str(tmp_path / 'missing.jsonl')) == {}
@@ -0,0 +1,105 @@
+import hashlib
+import os
+
+import numpy as np
+import pytest
+import yaml
+
+from scenario_cache import YamlLoader, compile_config, load_compiled, load_scenario, save_compiled
+from modules.utils import TargetTable
+
+pytestmark = pytest.mark.scenario(n_targets=50, n_radars=2)
+
+
+def cache_files(cache_dir):
+    return sorted(os.listdir(cache_dir)) if os.path.exists(cache_dir) else []
+
+
+def assert_same_scenario(compiled, expected):
+    targets, expected_targets = compiled['air_environment']['targets'], expected['air_environment']['targets']
+    for column in ('ids', 'types', 'positions', 'velocities'):
+        assert np.array_equal(getattr(targets, column), getattr(expected_targets, column))
+    assert {key: value for key, value in compiled['air_environment'].items() if key != 'targets'} == \
+        {key: value for key, value in expected['air_environment'].items() if key != 'targets'}
+    assert {key: value for key, value in compiled.items() if key != 'air_environment'} == \
+        {key: value for key, value in expected.items() if key != 'air_environment'}
+
+
+class TestScenarioCache:
+
+    def test_loader_matches_safe_loader(self, config_path):
+        with open(config_path, 'rb') as file:
+            raw = file.read()
+        assert yaml.load(raw, Loader=YamlLoader) == yaml.load(raw, Loader=yaml.SafeLoader)
+
+    def test_cache_key_is_content_hash(self, config_path, tmp_path):
+        cache_dir = str(tmp_path / 'cache')
+        load_scenario(config_path, cache_dir=cache_dir)
+        with open(config_path, 'rb') as file:
+            digest = hashlib.sha256(file.read()).hexdigest()
+        assert cache_files(cache_dir) == [digest + '.npz']
+
+        # Тот же конфиг под другим именем попадает в ту же запись кэша
+        copy_path = tmp_path / 'copy.yaml'
+        with open(config_path, 'rb') as file:
+            copy_path.write_bytes(file.read())
+        load_scenario(str(copy_path), cache_dir=cache_dir)
+        assert cache_files(cache_dir) == [digest + '.npz']
+
+    def test_npz_round_trip(self, config_path, tmp_path):
+        with open(config_path, 'rb') as file:
+            compiled = compile_config(yaml.load(file, Loader=YamlLoader))
+        path = str(tmp_path / 'scenario.npz')
+        save_compiled(path, compiled)
+        loaded = load_compiled(path)
+        assert isinstance(loaded['air_environment']['targets'], TargetTable)
+        assert_same_scenario(loaded, compiled)
+
+    def test_cached_load_matches_fresh_load(self, config_path, tmp_path):
+        cache_dir = str(tmp_path / 'cache')
+        fresh = load_scenario(config_path, use_cache=False)
+        load_scenario(config_path, cache_dir=cache_dir)
+        assert_same_scenario(load_scenario(config_path, cache_dir=cache_dir), fresh)
+
+    def test_config_edit_invalidates_cache(self, config_path, tmp_path):
+        cache_dir = str(tmp_path / 'cache')
+        before = load_scenario(config_path, cache_dir=cache_dir)
+        with open(config_path, encoding='utf-8') as file:
+            text = file.read()
+        with open(config_path, 'w', encoding='utf-8') as file:
+            file.write(text.replace('duration: 3000', 'duration: 5000'))
+
+        after = load_scenario(config_path, cache_dir=cache_dir)
+        assert before['simulation']['duration'] == 3000 and after['simulation']['duration'] == 5000
+        assert len(cache_files(cache_dir)) == 2
+
+    def test_corrupted_cache_is_rebuilt(self, config_path, tmp_path):
+        cache_dir = str(tmp_path / 'cache')
+        expected = load_scenario(config_path, cache_dir=cache_dir)
+        cache_path = os.path.join(cache_dir, cache_files(cache_dir)[0])
+        with open(cache_path, 'wb') as file:
+            file.write(b'not a npz file')
+        assert_same_scenario(load_scenario(config_path, cache_dir=cache_dir), expected)
+        assert load_compiled(cache_path) is not None
+
+    def test_truncated_cache_is_rebuilt(self, config_path, tmp_path):
+        cache_dir = str(tmp_path / 'cache')
+        expected = load_scenario(config_path, cache_dir=cache_dir)
+        cache_path = os.path.join(cache_dir, cache_files(cache_dir)[0])
+        with open(cache_path, 'rb') as file:
+            data = file.read()
+        # Оборванная запись: начало архива на месте, центрального каталога нет
+        with open(cache_path, 'wb') as file:
+            file.write(data[:len(data) // 2])
+        assert_same_scenario(load_scenario(config_path, cache_dir=cache_dir), expected)
+        assert load_compiled(cache_path) is not None
+
+    def test_invalid_config(self, config_path):
+        with open(config_path, encoding='utf-8') as file:
+            config = yaml.load(file, Loader=YamlLoader)
+        config['air_environment']['targets'][1]['id'] = config['air_environment']['targets'][0]['id']
+        with pytest.raises(ValueError):
+            compile_config(config)
+        del config['simulation']['time_step']
+        with pytest.raises(ValueError):
+            compile_config(config)
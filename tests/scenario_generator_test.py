@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+import yaml
+
+from scenario_generator import PATTERNS, TARGET_ID_BASE, generate_scenario, generate_targets, write_scenario
+
+
+class TestScenarioGenerator:
+
+    @pytest.mark.parametrize('pattern', PATTERNS)
+    def test_same_seed_gives_same_targets(self, pattern):
+        first = generate_targets(101, pattern, np.random.default_rng(7))
+        assert generate_targets(101, pattern, np.random.default_rng(7)) == first
+        assert generate_targets(101, pattern, np.random.default_rng(8)) != first
+        assert [target['id'] for target in first] == list(range(TARGET_ID_BASE, TARGET_ID_BASE + 101))
+
+    def test_written_file_is_byte_identical(self, tmp_path):
+        paths = [tmp_path / 'first.yaml', tmp_path / 'second.yaml']
+        for path in paths:
+            write_scenario(generate_scenario(500, n_radars=3, n_launchers=5, seed=11), str(path))
+        assert paths[0].read_bytes() == paths[1].read_bytes()
+
+    def test_written_file_matches_config(self, tmp_path):
+        config = generate_scenario(300, pattern='swarm', n_radars=5, n_launchers=6, seed=2)
+        path = tmp_path / 'scenario.yaml'
+        write_scenario(config, str(path))
+        with open(path, encoding='utf-8') as file:
+            assert yaml.safe_load(file) == config
+
+    def test_empty_raid(self, tmp_path):
+        config = generate_scenario(0, n_radars=1, n_launchers=1)
+        path = tmp_path / 'scenario.yaml'
+        write_scenario(config, str(path))
+        with open(path, encoding='utf-8') as file:
+            assert yaml.safe_load(file)['air_environment']['targets'] == []
+
+    def test_unknown_pattern(self):
+        with pytest.raises(ValueError):
+            generate_targets(10, 'circle', np.random.default_rng(0))
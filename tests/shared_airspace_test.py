@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from modules.SharedAirspace import SharedAirspace
+
+pytestmark = pytest.mark.scenario(n_targets=30, n_radars=4, seed=2)
+
+
+class TestSharedAirspace:
+
+    def test_read_checks_version(self):
+        airspace = SharedAirspace(4)
+        try:
+            airspace.publish(1, np.ones((2, 3)))
+            airspace.publish(2, np.zeros((3, 3)))
+            assert airspace.read(1).tolist() == [[1.0] * 3] * 2
+            assert airspace.read(2).shape == (3, 3)
+
+            airspace.publish(3, np.full((1, 3), 3.0))
+            assert not airspace.is_current(1)
+            with pytest.raises(ValueError):
+                airspace.read(1)
+            with pytest.raises(ValueError):
+                airspace.publish(4, np.zeros((5, 3)))
+        finally:
+            airspace.close()
+
+    def test_process_pool_run_matches_serial(self, recorded_run):
+        serial, _ = recorded_run('serial', radar_processes=None)
+        pooled, _ = recorded_run('pooled', radar_processes=2)
+        assert len(serial) > 0
+        assert pooled.tobytes() == serial.tobytes()
@@ -0,0 +1,49 @@
+import time
+
+import pytest
+
+from UI.SimulationWorker import SimulationWorker
+from modules.Recorder import RecordedRun
+
+pytestmark = pytest.mark.scenario(n_radars=2, duration=4000, seed=1)
+
+
+class TestSimulationWorker:
+
+    def test_streams_all_frames(self, config_path, tmp_path):
+        record_path = str(tmp_path / 'run.rec')
+        worker = SimulationWorker(config_path, record_path, use_cache=False)
+        worker.start()
+
+        frames = []
+        while True:
+            frame = worker.frames.get(timeout=10)
+            if frame is None:
+                break
+            frames.append(frame)
+        worker.join(timeout=10)
+
+        assert worker.error is None
+        assert [frame.step for frame in frames] == list(range(20))
+        assert [frame.time for frame in frames] == list(range(0, 4000, 200))
+        run = RecordedRun(record_path)
+        assert run.complete and run.steps_count == 20
+        assert (run.frame(5) == frames[5].records).all()
+
+    def test_backpressure_and_cancel(self, config_path, tmp_path):
+        worker = SimulationWorker(config_path, str(tmp_path / 'run.rec'), max_frames=2, use_cache=False)
+        worker.start()
+        deadline = time.monotonic() + 10
+        while not worker.frames.full() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert worker.frames.full() and worker.is_alive()
+        assert worker.steps_done <= 3  # два кадра в очереди и один ожидает места
+
+        worker.cancel()
+        # Признак конца приходит и после отмены: интерфейс не ждет поток, а разбирает очередь
+        frames = [worker.frames.get(timeout=10)]
+        while frames[-1] is not None:
+            frames.append(worker.frames.get(timeout=10))
+        worker.join(timeout=10)
+        assert not worker.is_alive() and worker.error is None
+        assert RecordedRun(str(tmp_path / 'run.rec')).complete
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from modules.Radar import SectorRadar
+from modules.constants import MessageType
+from .recorder_test import make_manager
+
+
+def active_objects(manager, step_time):
+    return manager.give_messages_by_type(MessageType.ACTIVE_OBJECTS, step_time=step_time)[0].active_objects
+
+
+class TestSnapshots:
+
+    def test_old_step_keeps_its_positions(self):
+        manager = make_manager(n_targets=3)
+        manager.run_simulation(2 * 200)
+        first = active_objects(manager, 0)
+        second = active_objects(manager, 200)
+
+        assert np.allclose(first.positions[:, 0], [1000.0, 1010.0, 1020.0])
+        assert np.allclose(second.positions[:, 0], [1020.0, 1030.0, 1040.0])
+        assert [row[2][0] for row in first.rows()] == pytest.approx([1000.0, 1010.0, 1020.0])
+
+    def test_published_positions_are_read_only(self):
+        manager = make_manager(n_targets=2)
+        manager.run_simulation(200)
+        store = manager.modules[0].target_store
+        snapshot = active_objects(manager, 0)
+        with pytest.raises(ValueError):
+            store.positions[0] += 1.0
+
+        # Запись через объект цели копирует массив шага
+        target = snapshot[0]
+        target.pos = np.array([1.0, 2.0, 3.0])
+        assert np.allclose(target.pos, [1.0, 2.0, 3.0])
+        assert np.allclose(snapshot.positions[0], [1000.0, 0.0, 1000.0])
+
+    def test_radar_noise_does_not_leak_into_truth(self):
+        np.random.seed(0)
+        manager = make_manager(n_targets=3)
+        radar = SectorRadar(manager, 2, np.zeros(3), azimuth_start=0, elevation_start=0, max_distance=100000,
+                            azimuth_range=360, elevation_range=90, azimuth_speed=0, elevation_speed=0)
+        manager.add_module(radar)
+        manager.run_simulation(200)
+
+        found = manager.give_messages_by_type(MessageType.FOUND_OBJECTS, step_time=0)[0]
+        truth = active_objects(manager, 0).positions
+        assert len(found.visible_objects) == 3
+        assert not np.allclose(found.positions, truth)
+        assert np.allclose(manager.modules[0].target_store.positions[:, 0], [1000.0, 1010.0, 1020.0])
+        assert [obj.id for obj, _ in found.measurements()] == [100, 101, 102]
@@ -0,0 +1,154 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from main import prepare_simulation_from_config
+from modules.Tracks import KalmanBank, TrackCache, MEASUREMENT_ERROR, TARGET_TRACK, MISSILE_TRACK
+from modules.constants import MessageType, POSSIBLE_TARGET_RADIUS
+from modules.utils import to_seconds
+
+SIM_STEP = 0.05
+
+
+def make_tracks(rng, count, time):
+    targets, missiles = {}, {}
+    for track_id in range(count):
+        obj = SimpleNamespace(pos=rng.uniform(-1e4, 1e4, 3), prev_pos=rng.uniform(-1e4, 1e4, 3),
+                              velocity=np.array([1.0, 0.0, 0.0]), speed_mod=rng.uniform(100, 600))
+        upd_time = time - SIM_STEP * rng.integers(0, 4)
+        if track_id % 3:
+            targets[track_id] = SimpleNamespace(target=obj, pos=obj.pos, upd_time=upd_time)
+        else:
+            missiles[track_id] = SimpleNamespace(missile=obj, upd_time=upd_time)
+    return targets, missiles
+
+
+def brute_force(targets, missiles, time, detected_pos, speed):
+    """Завязка как в исходном CombatControlPoint.link_object"""
+    best, best_diff = (None, None), float('inf')
+    tracks = [(TARGET_TRACK, i, ccp.target.prev_pos, ccp.upd_time) for i, ccp in targets.items()]
+    tracks += [(MISSILE_TRACK, i, ccp.missile.prev_pos, ccp.upd_time) for i, ccp in missiles.items()]
+    for kind, track_id, prev_pos, upd_time in tracks:
+        if upd_time == time:
+            continue
+        d_t = time - upd_time
+        diff = np.linalg.norm(prev_pos - detected_pos)
+        min_range = max(0, speed * (d_t - POSSIBLE_TARGET_RADIUS * SIM_STEP))
+        max_range = max(0, speed * (d_t + POSSIBLE_TARGET_RADIUS * SIM_STEP))
+        if diff < best_diff and min_range <= diff <= max_range:
+            best, best_diff = (kind, track_id), diff
+    return best
+
+
+class TestTrackCache:
+
+    def test_associate_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        time = 10.0
+        targets, missiles = make_tracks(rng, 60, time)
+        cache = TrackCache()
+        cache.advance(time, targets, missiles)
+        for ccp in list(targets.values()) + list(missiles.values()):
+            obj = getattr(ccp, 'target', None) or ccp.missile
+            detected_pos = obj.prev_pos + rng.normal(0, 20, 3)
+            assert cache.associate(detected_pos, obj.speed_mod, SIM_STEP) == \
+                brute_force(targets, missiles, time, detected_pos, obj.speed_mod)
+
+    def test_touch_excludes_track(self):
+        prev_pos = np.zeros(3)
+        obj = SimpleNamespace(pos=prev_pos, prev_pos=prev_pos, velocity=np.array([1.0, 0.0, 0.0]), speed_mod=100.0)
+        cache = TrackCache()
+        cache.advance(1.0, {7: SimpleNamespace(target=obj, pos=prev_pos, upd_time=0.95)}, {})
+        detected_pos = np.array([5.0, 0.0, 0.0])
+        assert cache.associate(detected_pos, 100.0, SIM_STEP) == (TARGET_TRACK, 7)
+        cache.touch(TARGET_TRACK, 7)
+        assert cache.associate(detected_pos, 100.0, SIM_STEP) == (None, None)
+
+    def test_new_track_has_no_velocity_estimate(self):
+        pos = np.array([100.0, 0.0, 0.0])
+        obj = SimpleNamespace(pos=pos, prev_pos=pos, velocity=np.array([0.0, 1.0, 0.0]), speed_mod=200.0)
+        cache = TrackCache()
+        cache.advance(2.0, {3: SimpleNamespace(target=obj, pos=pos, upd_time=1.5)}, {})
+        # Истинная скорость объекта фильтру не передается
+        state = cache.state(TARGET_TRACK, 3)
+        assert np.array_equal(state.pos, pos)
+        assert state.speed_mod == 0.0
+        assert state.covariance.shape == (3, 3) and state.time == 2.0
+        assert cache.state(MISSILE_TRACK, 3) is None
+
+    def test_filter_converges_from_measured_positions(self):
+        rng = np.random.default_rng(2)
+        count, sim_step = 20, 0.2
+        start = rng.uniform(-1e4, 1e4, (count, 3))
+        velocity = rng.normal(0, 300, (count, 3))
+        # Объекты трасс без скорости: оценка строится только по измеренным координатам
+        targets = {i: SimpleNamespace(target=SimpleNamespace(pos=start[i], prev_pos=None, velocity=np.zeros(3),
+                                                             speed_mod=0.0),
+                                      pos=start[i], upd_time=0.0) for i in range(count)}
+        cache = TrackCache()
+        for step in range(60):
+            time = step * sim_step
+            cache.advance(time, targets, {})
+            measured = start + velocity * time + rng.normal(0, MEASUREMENT_ERROR, (count, 3))
+            for i in range(count):
+                cache.measure(TARGET_TRACK, i, measured[i])
+            cache.update()
+
+        states = [cache.state(TARGET_TRACK, i) for i in range(count)]
+        estimated_velocity = np.array([state.velocity * state.speed_mod for state in states])
+        estimated_pos = np.array([state.pos for state in states])
+        assert np.linalg.norm(estimated_velocity - velocity, axis=1).mean() < 10
+        assert np.linalg.norm(estimated_pos - (start + velocity * time), axis=1).mean() < MEASUREMENT_ERROR
+        # Экстраполяция оценки на время доставки ЗУР
+        ahead = states[0].at(time + sim_step)
+        assert np.allclose(ahead.pos, states[0].pos + estimated_velocity[0] * sim_step)
+
+
+class TestKalmanBank:
+
+    def test_filter_reduces_measurement_error(self):
+        rng = np.random.default_rng(1)
+        count = 200
+        pos = rng.uniform(-1e4, 1e4, (count, 3))
+        velocity = rng.normal(0, 200, (count, 3))
+        bank = KalmanBank(capacity=16)
+        for i in range(count):
+            bank.add(i, pos[i] + rng.normal(0, MEASUREMENT_ERROR, 3), 0.0)
+        for step in range(1, 101):
+            time = step * SIM_STEP
+            bank.predict(time)
+            bank.update(list(range(count)), pos + velocity * time + rng.normal(0, MEASUREMENT_ERROR, (count, 3)))
+        estimates = np.array([bank.get(i)[0] for i in range(count)])
+        pos_error = np.linalg.norm(estimates[:, :3] - (pos + velocity * time), axis=1)
+        # Среднее расстояние для шума измерения ~ 1.6 * MEASUREMENT_ERROR
+        assert pos_error.mean() < MEASUREMENT_ERROR
+        assert np.linalg.norm(estimates[:, 3:] - velocity, axis=1).mean() < 20
+
+    def test_rows_are_reused(self):
+        bank = KalmanBank(capacity=2)
+        for key in range(5):
+            bank.add(key, np.zeros(3), 0.0)
+        bank.remove(1)
+        bank.add(10, np.ones(3), 0.0)
+        assert len(bank) == 5 and 1 not in bank
+        assert np.array_equal(bank.get(10)[0][:3], np.ones(3))
+        assert np.array_equal(bank.get(0)[0][:3], np.zeros(3))
+
+
+@pytest.mark.scenario(duration=5000)
+class TestGuidance:
+
+    def test_missiles_receive_filtered_estimates(self, config_path):
+        np.random.seed(0)
+        manager, _, end_time = prepare_simulation_from_config(config_path, use_cache=False)
+        errors = []
+        while manager.time.get_time() < end_time:
+            step_time = manager.time.get_time()
+            manager.step()
+            for msg in manager.give_messages_by_type(MessageType.UPDATE_TARGET, step_time=step_time):
+                assert msg.estimate is not None
+                # Цель в сообщении - объект ВО, его координаты - на текущий шаг
+                errors.append(np.linalg.norm(msg.estimate.at(to_seconds(step_time)).pos - msg.upd_object.pos))
+        assert errors
+        assert np.mean(errors) < 2 * MEASUREMENT_ERROR